@@ -0,0 +1,104 @@
+"""
+Currency conversion against an offline FX rate table.
+
+``data/fx_rates.json`` is a versioned snapshot of exchange rates quoted as
+units of each currency per unit of the base currency. No live rate source is
+queried: the table is loaded with the rest of the reference data and kept in
+memory as one array indexed by currency code, so converting a batch is one
+lookup of per-row factors and one multiplication per column.
+"""
+import math
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_BASE_CURRENCY = "USD"
+
+
+class FXRateTable:
+    """
+    Exchange rates for a set of currencies against one base currency
+    """
+
+    __slots__ = ("version", "as_of", "base", "currencies", "_index", "_rates")
+
+    def __init__(
+        self,
+        rates: Mapping[str, float],
+        base: str = DEFAULT_BASE_CURRENCY,
+        version: str = "",
+        as_of: Optional[str] = None
+    ):
+        base = base.upper()
+        quoted = {code.upper(): float(rate) for code, rate in rates.items()}
+        quoted.setdefault(base, 1.0)
+        if quoted[base] != 1.0:
+            raise ValueError(f"Base currency {base} must have a rate of 1")
+        for code, rate in quoted.items():
+            if not (math.isfinite(rate) and rate > 0):
+                raise ValueError(f"Invalid FX rate for {code}: {rate}")
+
+        self.version = version
+        self.as_of = as_of
+        self.base = base
+        self.currencies = tuple(sorted(quoted))
+        self._index = {code: i for i, code in enumerate(self.currencies)}
+        self._rates = np.array([quoted[code] for code in self.currencies], dtype=float)
+        self._rates.flags.writeable = False
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "FXRateTable":
+        """
+        Build a table from the parsed ``fx_rates.json`` layout
+        """
+        return cls(
+            data.get("rates", {}),
+            base=data.get("base", DEFAULT_BASE_CURRENCY),
+            version=str(data.get("version", "")),
+            as_of=data.get("as_of")
+        )
+
+    def supports(self, currency_code: str) -> bool:
+        return currency_code.upper() in self._index
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """
+        Units of ``to_currency`` per unit of ``from_currency``
+        """
+        return float(self.rates([from_currency], [to_currency])[0])
+
+    def rates(self, from_currencies: Sequence[str], to_currencies: Sequence[str]) -> np.ndarray:
+        """
+        Conversion factor per row; raises ValueError for unsupported currencies
+        """
+        return self._rates[self._indices(to_currencies)] / self._rates[self._indices(from_currencies)]
+
+    def convert(
+        self,
+        amounts: Any,
+        from_currencies: Sequence[str],
+        to_currencies: Sequence[str]
+    ) -> np.ndarray:
+        """
+        Convert an array whose first axis has one row per currency pair,
+        e.g. a (requests, months) projection column
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        factors = self.rates(from_currencies, to_currencies)
+        return amounts * factors.reshape((-1,) + (1,) * (amounts.ndim - 1))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "as_of": self.as_of,
+            "base": self.base,
+            "rates": dict(zip(self.currencies, self._rates.tolist())),
+        }
+
+    def _indices(self, currency_codes: Sequence[str]) -> np.ndarray:
+        try:
+            return np.fromiter(
+                (self._index[code.upper()] for code in currency_codes), dtype=np.intp, count=len(currency_codes)
+            )
+        except KeyError as e:
+            raise ValueError(f"Unsupported currency: {e.args[0]}")
@@ -0,0 +1,242 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from models.roi_models import (
+    GoalSeekMetric, GoalSeekRequest, GoalSeekResponse, ROICalculationRequest
+)
+from calculations.plans import DEFAULT_PAYMENT_PROCESSING_RATE, CalculationPlan
+from calculations.roi_calculator import ROICalculator, _optional
+
+# Solvable inputs and their default search range. Lower bounds stay above
+# zero where the calculator treats zero as "use the scenario default";
+# a None upper bound scales with the base value.
+GOAL_SEEK_VARIABLES = {
+    "monthly_revenue": (0.01, None),
+    "operating_expenses": (0.01, None),
+    "marketing_spend": (0.01, None),
+    "fulfillment_costs": (0.01, None),
+    "employee_costs": (0.0, None),
+    "initial_investment": (0.0, None),
+    "gross_margin": (0.0001, 1.0),
+    "payment_processing_rate": (0.000001, 0.1),
+    "growth_rate": (-0.99, 1.0),
+}
+
+# Inputs that only feed unit economics (CLV) and never move ROI, NPV or payback
+UNIT_ECONOMICS_INPUTS = (
+    "customer_acquisition_cost", "average_order_value", "customer_lifetime_value", "churn_rate"
+)
+
+GRID_POINTS = 128
+MAX_ITERATIONS = 100
+
+
+def illinois_root(
+    f: Callable[[float], float],
+    a: float,
+    b: float,
+    f_a: float,
+    f_b: float,
+    x_tolerance: float,
+    f_tolerance: float,
+    max_iterations: int = MAX_ITERATIONS
+) -> Tuple[float, float, bool, int]:
+    """
+    Find a root of ``f`` inside the sign-change bracket [a, b] with the
+    Illinois variant of regula falsi. Returns (root, f(root), converged, iterations).
+    """
+    if abs(f_a) <= f_tolerance:
+        return a, f_a, True, 0
+    if abs(f_b) <= f_tolerance:
+        return b, f_b, True, 0
+
+    for iteration in range(1, max_iterations + 1):
+        c = b - f_b * (b - a) / (f_b - f_a)
+        f_c = f(c)
+
+        if f_c * f_b < 0:
+            a, f_a = b, f_b
+        else:
+            # Halve the retained end's value so the bracket keeps shrinking from both sides
+            f_a /= 2
+        b, f_b = c, f_c
+
+        if abs(f_c) <= f_tolerance or abs(b - a) <= x_tolerance * (1 + abs(c)):
+            return c, f_c, True, iteration
+
+    return b, f_b, False, max_iterations
+
+
+class GoalSeeker:
+    """
+    Solve for the input value that makes a metric hit a target
+    """
+
+    def __init__(self, calculator: ROICalculator):
+        self.calculator = calculator
+
+    def run(
+        self,
+        goal_request: GoalSeekRequest,
+        plan: CalculationPlan
+    ) -> GoalSeekResponse:
+        """
+        Scan the search range in one batch to bracket the target, then refine
+        the bracket nearest the base value with scalar evaluations
+        """
+        request = goal_request.base_calculation
+        variable = goal_request.variable
+        metric = goal_request.target_metric.value
+        self._validate(goal_request)
+
+        base_input = self.calculator._prepare_input_data(request, plan.scenario)
+        base_value = self._base_value(variable, request, base_input)
+        low, high = self._search_bounds(goal_request, base_value)
+
+        def evaluate(values: np.ndarray) -> np.ndarray:
+            rows = [
+                self.calculator._prepare_input_override(request, plan.scenario, variable, float(value), base_input)
+                for value in values
+            ]
+            metrics = self.calculator.calculate_metric_arrays(rows, [request.timeframe_months] * len(rows))
+            return self._objective_values(metrics[metric], metric, request.timeframe_months)
+
+        target = goal_request.target_value
+        grid = self._grid(low, high, base_value)
+        grid_values = evaluate(np.append(grid, base_value))
+        base_metric_value = grid_values[-1]
+        grid_values = grid_values[:-1]
+        residuals = grid_values - target
+
+        bracket = self._nearest_bracket(grid, residuals, base_value)
+        achievable_range = {"min": float(grid_values.min()), "max": float(grid_values.max())}
+
+        solved_value = achieved_value = None
+        converged = False
+        iterations = 0
+        if bracket is not None:
+            i, j = bracket
+            f_tolerance = goal_request.tolerance * (1 + abs(target))
+            solved_value, residual, converged, iterations = illinois_root(
+                lambda x: float(evaluate(np.array([x]))[0] - target),
+                grid[i], grid[j], residuals[i], residuals[j],
+                goal_request.tolerance, f_tolerance
+            )
+            achieved_value = residual + target
+
+        return GoalSeekResponse(
+            variable=variable,
+            target_metric=goal_request.target_metric,
+            target_value=target,
+            reachable=bracket is not None,
+            converged=converged,
+            solved_value=solved_value,
+            achieved_value=self._reported_metric(achieved_value, metric, request.timeframe_months),
+            base_value=base_value,
+            base_metric_value=self._reported_metric(base_metric_value, metric, request.timeframe_months),
+            change_percent=(
+                (solved_value - base_value) / abs(base_value) * 100
+                if solved_value is not None and base_value != 0 else None
+            ),
+            search_bounds=[low, high],
+            achievable_range=achievable_range,
+            iterations=iterations,
+            currency_code=plan.currency_code
+        )
+
+    def _validate(self, goal_request: GoalSeekRequest) -> None:
+        """
+        Reject variables and targets the model cannot solve
+        """
+        variable = goal_request.variable
+        if variable in UNIT_ECONOMICS_INPUTS:
+            raise ValueError(
+                f"'{variable}' only affects customer lifetime value and does not change "
+                f"{goal_request.target_metric.value} in this model"
+            )
+        if variable not in GOAL_SEEK_VARIABLES:
+            raise ValueError(
+                f"Cannot solve for '{variable}'; supported variables: {', '.join(GOAL_SEEK_VARIABLES)}"
+            )
+
+        request = goal_request.base_calculation
+        if goal_request.target_metric == GoalSeekMetric.PAYBACK_PERIOD_MONTHS:
+            if request.initial_investment <= 0 and variable != "initial_investment":
+                raise ValueError("Payback period targets require an initial investment")
+            if not 0 < goal_request.target_value <= request.timeframe_months:
+                raise ValueError("Payback target must be within the analysis timeframe")
+
+    def _base_value(self, variable: str, request: ROICalculationRequest, base_input: Dict[str, Any]) -> float:
+        if variable == "payment_processing_rate":
+            return request.payment_processing_rate or DEFAULT_PAYMENT_PROCESSING_RATE
+        return float(base_input[variable])
+
+    def _search_bounds(self, goal_request: GoalSeekRequest, base_value: float) -> Tuple[float, float]:
+        """
+        Search range from the request, falling back to the variable's defaults
+        """
+        default_low, default_high = GOAL_SEEK_VARIABLES[goal_request.variable]
+        if default_high is None:
+            default_high = max(abs(base_value) * 1000, 1e6)
+
+        low = default_low if goal_request.lower_bound is None else max(goal_request.lower_bound, default_low)
+        high = default_high if goal_request.upper_bound is None else goal_request.upper_bound
+        if GOAL_SEEK_VARIABLES[goal_request.variable][1] is not None:
+            high = min(high, GOAL_SEEK_VARIABLES[goal_request.variable][1])
+
+        if not low < high:
+            raise ValueError(f"Invalid search range [{low}, {high}] for '{goal_request.variable}'")
+        return float(low), float(high)
+
+    def _grid(self, low: float, high: float, base_value: float) -> np.ndarray:
+        """
+        Scan points that are dense near the lower bound and the base value
+        """
+        span = high - low
+        points = np.concatenate((
+            [low, high],
+            np.linspace(low, high, GRID_POINTS // 4),
+            low + np.geomspace(span * 1e-7, span, GRID_POINTS // 2),
+            np.clip(base_value * np.linspace(0.5, 1.5, GRID_POINTS // 4), low, high),
+        ))
+        return np.unique(points)
+
+    def _objective_values(self, values: np.ndarray, metric: str, timeframe_months: int) -> np.ndarray:
+        """
+        Map metric values onto a continuous objective. Payback not reached
+        within the timeframe is treated as one month past its end.
+        """
+        if metric == GoalSeekMetric.PAYBACK_PERIOD_MONTHS.value:
+            return np.where(np.isnan(values), timeframe_months + 1, values)
+        return values
+
+    def _reported_metric(self, value: Optional[float], metric: str, timeframe_months: int) -> Optional[float]:
+        if value is None:
+            return None
+        if metric == GoalSeekMetric.PAYBACK_PERIOD_MONTHS.value and value > timeframe_months:
+            return None
+        return _optional(value)
+
+    def _nearest_bracket(
+        self,
+        grid: np.ndarray,
+        residuals: np.ndarray,
+        base_value: float
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Adjacent grid points whose residuals straddle zero, closest to the base value
+        """
+        finite = np.isfinite(residuals)
+        sign = np.sign(residuals)
+        candidates = np.flatnonzero(
+            finite[:-1] & finite[1:] & ((sign[:-1] * sign[1:] < 0) | (sign[:-1] == 0))
+        )
+        if finite[-1] and sign[-1] == 0:
+            candidates = np.append(candidates, len(grid) - 2)
+        if candidates.size == 0:
+            return None
+
+        midpoints = (grid[candidates] + grid[candidates + 1]) / 2
+        best = int(candidates[np.argmin(np.abs(midpoints - base_value))])
+        return best, best + 1
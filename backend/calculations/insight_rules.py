@@ -0,0 +1,314 @@
+"""
+Rule table for the insights, recommendations and risk factors attached to
+ROI results.
+
+Rules are declared once, in output order, and compiled into an
+``InsightEngine`` per locale:
+
+- Threshold rules hold conditions on result columns (``roi_percentage``,
+  ``gross_margin``, ...). They are evaluated as array comparisons over a
+  whole batch, and only the messages that fire are formatted.
+- Plan rules have no conditions and depend only on the calculation plan
+  (country tax, inflation and currency risks, business model). Their
+  messages are rendered once per plan and reused by every request.
+
+Message text lives in ``MESSAGES``, keyed by locale and rule id; a locale
+only needs the ids it translates and falls back to English for the rest.
+"""
+import operator
+import string
+import weakref
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from calculations.plans import CalculationPlan, PlanFeature
+
+INSIGHTS = "insights"
+RECOMMENDATIONS = "recommendations"
+RISK_FACTORS = "risk_factors"
+SECTIONS = (INSIGHTS, RECOMMENDATIONS, RISK_FACTORS)
+
+DEFAULT_LOCALE = "en"
+
+# Prepared inputs the rules read, alongside the metric columns
+RULE_INPUTS = (
+    "gross_margin", "growth_rate", "churn_rate", "clv", "cac", "initial_investment", "monthly_revenue"
+)
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class Condition(NamedTuple):
+    column: str
+    op: str
+    value: float
+
+
+class InsightRule(NamedTuple):
+    """
+    One message and when it applies: all ``conditions`` hold for the result,
+    or, for rules without conditions, the plan has ``feature`` (always, if None)
+    """
+
+    id: str
+    section: str
+    conditions: Tuple[Condition, ...] = ()
+    feature: Optional[PlanFeature] = None
+
+
+def _when(*conditions: Tuple[str, str, float]) -> Tuple[Condition, ...]:
+    return tuple(Condition(*condition) for condition in conditions)
+
+
+RULES: Tuple[InsightRule, ...] = (
+    # Insights
+    InsightRule("roi_excellent", INSIGHTS, _when(("roi_percentage", ">", 100))),
+    InsightRule("roi_strong", INSIGHTS, _when(("roi_percentage", ">", 50), ("roi_percentage", "<=", 100))),
+    InsightRule("roi_moderate", INSIGHTS, _when(("roi_percentage", ">", 20), ("roi_percentage", "<=", 50))),
+    InsightRule("roi_low", INSIGHTS, _when(("roi_percentage", "<=", 20))),
+    InsightRule("payback_fast", INSIGHTS, _when(("payback_period_months", ">", 0), ("payback_period_months", "<", 6))),
+    InsightRule("payback_reasonable", INSIGHTS, _when(("payback_period_months", ">=", 6), ("payback_period_months", "<", 12))),
+    InsightRule("payback_extended", INSIGHTS, _when(("payback_period_months", ">=", 12))),
+    InsightRule("margin_high", INSIGHTS, _when(("gross_margin", ">", 0.7))),
+    InsightRule("margin_low", INSIGHTS, _when(("gross_margin", "<", 0.3))),
+    InsightRule("growth_high", INSIGHTS, _when(("growth_rate", ">", 0.1))),
+    InsightRule("growth_negative", INSIGHTS, _when(("growth_rate", "<", 0))),
+    InsightRule("country_tax", INSIGHTS),
+
+    # Recommendations
+    InsightRule("roi_below_target", RECOMMENDATIONS, _when(("roi_percentage", "<", 20))),
+    InsightRule("pricing_review", RECOMMENDATIONS, _when(("roi_percentage", "<", 20))),
+    InsightRule("improve_margin", RECOMMENDATIONS, _when(("gross_margin", "<", 0.5))),
+    InsightRule("accelerate_growth", RECOMMENDATIONS, _when(("growth_rate", "<", 0.05))),
+    InsightRule("clv_cac_low", RECOMMENDATIONS, _when(("clv_cac_ratio", "<", 3))),
+    InsightRule("clv_cac_high", RECOMMENDATIONS, _when(("clv_cac_ratio", ">", 5))),
+    InsightRule("slow_payback", RECOMMENDATIONS, _when(("payback_period_months", ">", 18))),
+    InsightRule("subscription_churn", RECOMMENDATIONS, feature=PlanFeature.SUBSCRIPTION),
+    InsightRule("ecommerce_conversion", RECOMMENDATIONS, feature=PlanFeature.ECOMMERCE),
+
+    # Risk factors
+    InsightRule("capital_intensity", RISK_FACTORS, _when(("investment_revenue_months", ">", 24))),
+    InsightRule("thin_margin", RISK_FACTORS, _when(("gross_margin", "<", 0.3))),
+    InsightRule("aggressive_growth", RISK_FACTORS, _when(("growth_rate", ">", 0.2))),
+    InsightRule("high_churn", RISK_FACTORS, _when(("churn_rate", ">", 0.1))),
+    InsightRule("high_inflation", RISK_FACTORS, feature=PlanFeature.HIGH_INFLATION),
+    InsightRule("currency_volatility", RISK_FACTORS, feature=PlanFeature.CURRENCY_RISK),
+)
+
+MESSAGES: Dict[str, Dict[str, str]] = {
+    "en": {
+        "roi_excellent": "Excellent ROI of {roi_percentage:.1f}% indicates a highly profitable investment.",
+        "roi_strong": "Strong ROI of {roi_percentage:.1f}% shows good investment potential.",
+        "roi_moderate": "Moderate ROI of {roi_percentage:.1f}% suggests acceptable returns.",
+        "roi_low": "Low ROI of {roi_percentage:.1f}% may indicate room for optimization.",
+        "payback_fast": "Fast payback period of {payback_period_months:.1f} months indicates quick capital recovery.",
+        "payback_reasonable": "Reasonable payback period of {payback_period_months:.1f} months.",
+        "payback_extended": "Extended payback period of {payback_period_months:.1f} months requires patience.",
+        "margin_high": "High gross margin suggests strong pricing power and efficient operations.",
+        "margin_low": "Low gross margin indicates potential for cost optimization or pricing adjustments.",
+        "growth_high": "High growth rate projections amplify long-term returns significantly.",
+        "growth_negative": "Negative growth projections pose risks to long-term profitability.",
+        "country_tax": (
+            "Operating in {country_name} with {corporate_tax_percent:.1f}% corporate tax rate "
+            "affects after-tax returns."
+        ),
+        "roi_below_target": "Consider reducing operating expenses or increasing revenue to improve ROI.",
+        "pricing_review": "Evaluate pricing strategy to maximize profit margins.",
+        "improve_margin": "Focus on improving gross margins through cost reduction or premium pricing.",
+        "accelerate_growth": "Invest in marketing and product development to accelerate growth.",
+        "clv_cac_low": "Improve customer lifetime value or reduce acquisition costs to achieve 3:1 CLV:CAC ratio.",
+        "clv_cac_high": "Consider increasing marketing spend to accelerate growth with strong unit economics.",
+        "slow_payback": "Focus on faster customer acquisition and revenue recognition to improve cash flow.",
+        "subscription_churn": "Focus on reducing churn rate to maximize subscription value.",
+        "ecommerce_conversion": "Optimize conversion rates and average order value for better unit economics.",
+        "capital_intensity": "High initial investment relative to revenue creates capital intensity risk.",
+        "thin_margin": "Low gross margins provide little buffer for cost increases.",
+        "aggressive_growth": "Aggressive growth assumptions may not materialize in competitive markets.",
+        "high_churn": "High churn rate poses risk to customer retention and CLV calculations.",
+        "high_inflation": "High inflation rate of {inflation_percent:.1f}% may increase operational costs.",
+        "currency_volatility": "Currency volatility may affect international business operations.",
+    },
+}
+
+
+def plan_values(plan: CalculationPlan) -> Dict[str, Any]:
+    """
+    Placeholder values available to plan rule messages
+    """
+    return {
+        "country_name": plan.country.name,
+        "currency_code": plan.currency_code,
+        "scenario_name": plan.scenario.name,
+        "corporate_tax_percent": plan.country.corporate_tax_rate * 100,
+        "inflation_percent": plan.country.inflation_rate * 100,
+    }
+
+
+def with_derived_columns(columns: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Add the ratio columns rules compare against, unless the caller supplied them
+    """
+    columns = dict(columns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "clv_cac_ratio" not in columns and "clv" in columns and "cac" in columns:
+            clv, cac = columns["clv"], columns["cac"]
+            columns["clv_cac_ratio"] = np.where((clv > 0) & (cac > 0), clv / cac, np.nan)
+        if "investment_revenue_months" not in columns and "initial_investment" in columns:
+            # Months of revenue the initial investment represents; infinite without revenue
+            investment, revenue = columns["initial_investment"], columns["monthly_revenue"]
+            columns["investment_revenue_months"] = np.where(
+                revenue > 0, investment / np.where(revenue > 0, revenue, 1), np.where(investment > 0, np.inf, np.nan)
+            )
+    return columns
+
+
+def _fields(template: str) -> Tuple[str, ...]:
+    return tuple(field for _, field, _, _ in string.Formatter().parse(template) if field)
+
+
+class InsightEngine:
+    """
+    A rule table compiled for one locale
+    """
+
+    def __init__(self, rules: Sequence[InsightRule] = RULES, locale: str = DEFAULT_LOCALE):
+        catalog = {**MESSAGES[DEFAULT_LOCALE], **MESSAGES.get(locale, {})}
+        missing = [rule.id for rule in rules if rule.id not in catalog]
+        if missing:
+            raise ValueError(f"No message for rules: {', '.join(missing)}")
+        for rule in rules:
+            if rule.section not in SECTIONS:
+                raise ValueError(f"Unknown section for rule {rule.id}: {rule.section}")
+            if rule.conditions and rule.feature is not None:
+                raise ValueError(f"Rule {rule.id} mixes conditions with a plan feature")
+            for condition in rule.conditions:
+                if condition.op not in OPERATORS:
+                    raise ValueError(f"Unknown operator in rule {rule.id}: {condition.op}")
+
+        self.locale = locale
+        self.rules = tuple(rules)
+        self._templates = [catalog[rule.id] for rule in self.rules]
+        self._fields = [_fields(template) for template in self._templates]
+        self._threshold_rules = [i for i, rule in enumerate(self.rules) if rule.conditions]
+        self._plan_rules = [i for i, rule in enumerate(self.rules) if not rule.conditions]
+
+        # Plans are immutable and live as long as their snapshot
+        self._plan_cache: "weakref.WeakKeyDictionary[CalculationPlan, Tuple[np.ndarray, Dict[int, str]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def evaluate(
+        self,
+        columns: Mapping[str, np.ndarray],
+        plans: Union[CalculationPlan, Sequence[CalculationPlan]]
+    ) -> np.ndarray:
+        """
+        Boolean (rows, rules) matrix of the rules that fire for each row.
+        ``plans`` is one plan per row, or a single plan shared by all rows.
+        """
+        columns = with_derived_columns(columns)
+        rows = len(next(iter(columns.values())))
+        mask = np.zeros((rows, len(self.rules)), dtype=bool)
+
+        with np.errstate(invalid="ignore"):
+            for i in self._threshold_rules:
+                fired = np.ones(rows, dtype=bool)
+                for column, op, value in self.rules[i].conditions:
+                    fired &= OPERATORS[op](np.asarray(columns[column], dtype=float), value)
+                mask[:, i] = fired
+
+        if self._plan_rules:
+            if isinstance(plans, CalculationPlan):
+                mask[:, self._plan_rules] = self._compiled_plan(plans)[0]
+            else:
+                # Compile each distinct plan once, then gather its row of flags for every row
+                positions: Dict[int, int] = {}
+                distinct: List[CalculationPlan] = []
+                codes = []
+                for plan in plans:
+                    if id(plan) not in positions:
+                        positions[id(plan)] = len(distinct)
+                        distinct.append(plan)
+                    codes.append(positions[id(plan)])
+                plan_masks = np.stack([self._compiled_plan(plan)[0] for plan in distinct])
+                mask[:, self._plan_rules] = plan_masks[codes]
+
+        return mask
+
+    def messages(
+        self,
+        columns: Mapping[str, np.ndarray],
+        plans: Sequence[CalculationPlan]
+    ) -> List[Dict[str, List[str]]]:
+        """
+        Messages for each row of a batch, grouped by section in rule order
+        """
+        columns = with_derived_columns(columns)
+        mask = self.evaluate(columns, plans)
+        results = [{section: [] for section in SECTIONS} for _ in range(mask.shape[0])]
+
+        # Only fired rules are visited, row by row in rule order
+        for row, i in zip(*np.nonzero(mask)):
+            rule = self.rules[i]
+            if rule.conditions:
+                message = self._render(i, {name: columns[name][row] for name in self._fields[i]})
+            else:
+                message = self._compiled_plan(plans[row])[1][i]
+            results[row][rule.section].append(message)
+
+        return results
+
+    def summarize(
+        self,
+        columns: Mapping[str, np.ndarray],
+        plan: CalculationPlan,
+        min_share: float = 0.5
+    ) -> Dict[str, List[str]]:
+        """
+        Messages for rules that fire in at least ``min_share`` of the rows, such as
+        simulated paths; placeholders show the median over the rows where the rule fired
+        """
+        columns = with_derived_columns(columns)
+        mask = self.evaluate(columns, plan)
+        result: Dict[str, List[str]] = {section: [] for section in SECTIONS}
+        if not mask.shape[0]:
+            return result
+
+        for i in np.flatnonzero(mask.mean(axis=0) >= min_share):
+            rule = self.rules[i]
+            if rule.conditions:
+                fired = mask[:, i]
+                message = self._render(i, {name: np.nanmedian(columns[name][fired]) for name in self._fields[i]})
+            else:
+                message = self._compiled_plan(plan)[1][i]
+            result[rule.section].append(message)
+        return result
+
+    def _render(self, index: int, values: Dict[str, Any]) -> str:
+        template = self._templates[index]
+        return template.format(**values) if values else template
+
+    def _compiled_plan(self, plan: CalculationPlan) -> Tuple[np.ndarray, Dict[int, str]]:
+        """
+        Which plan rules apply to a plan, with their messages rendered
+        """
+        compiled = self._plan_cache.get(plan)
+        if compiled is None:
+            values = plan_values(plan)
+            applies = np.array([
+                self.rules[i].feature is None or bool(plan.features & self.rules[i].feature)
+                for i in self._plan_rules
+            ], dtype=bool)
+            rendered = {
+                i: self._templates[i].format(**values)
+                for i, fired in zip(self._plan_rules, applies.tolist()) if fired
+            }
+            compiled = (applies, rendered)
+            self._plan_cache[plan] = compiled
+        return compiled
@@ -0,0 +1,114 @@
+from typing import Tuple
+
+import numpy as np
+
+# Monthly rate search bracket: from almost total loss up to 1000% per month
+IRR_LOWER_BOUND = -0.99
+IRR_UPPER_BOUND = 10.0
+
+
+class IRRResult:
+    """
+    Per-row IRR solutions for a batch of cash flow vectors.
+
+    ``rates`` holds the periodic rate (NaN where no root was found),
+    ``converged`` whether the solver met its tolerance for that row, and
+    ``bracketed`` whether the NPV changed sign across the search interval.
+    """
+
+    __slots__ = ("rates", "converged", "bracketed", "iterations")
+
+    def __init__(self, rates: np.ndarray, converged: np.ndarray, bracketed: np.ndarray, iterations: int):
+        self.rates = rates
+        self.converged = converged
+        self.bracketed = bracketed
+        self.iterations = iterations
+
+
+def npv_with_derivative(cash_flows: np.ndarray, rates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate NPV and dNPV/drate for each row using Horner's scheme.
+
+    NPV(r) is the polynomial sum(cf_k * x**k) in x = 1 / (1 + r), so one
+    backwards pass over the periods yields both the value and its derivative.
+    """
+    x = 1.0 / (1.0 + rates)
+    value = cash_flows[:, -1].copy()
+    slope = np.zeros_like(value)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        for k in range(cash_flows.shape[1] - 2, -1, -1):
+            slope = slope * x + value
+            value = value * x + cash_flows[:, k]
+
+        # Chain rule: dx/dr = -x**2
+        return value, -slope * x * x
+
+
+def solve_irr(
+    cash_flows: np.ndarray,
+    low: float = IRR_LOWER_BOUND,
+    high: float = IRR_UPPER_BOUND,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100
+) -> IRRResult:
+    """
+    Solve the periodic IRR of every row of a (rows, periods) cash flow matrix.
+
+    Newton steps are taken while they stay inside the current sign-change
+    bracket; otherwise the solver falls back to bisecting the bracket, so each
+    row converges whenever its NPV changes sign between ``low`` and ``high``.
+    Rows can be zero-padded on the right to a common number of periods.
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    n_rows = cash_flows.shape[0]
+
+    a = np.full(n_rows, low)
+    b = np.full(n_rows, high)
+    f_a, _ = npv_with_derivative(cash_flows, a)
+    f_b, _ = npv_with_derivative(cash_flows, b)
+
+    bracketed = np.isfinite(f_a) & np.isfinite(f_b) & (np.sign(f_a) != np.sign(f_b))
+    root_at_bound = (f_a == 0) | (f_b == 0)
+
+    converged = root_at_bound.copy()
+    active = bracketed & ~converged
+    iterations = 0
+
+    # Start Newton from a typical monthly rate; bisection takes over if it strays
+    rate = np.where(f_a == 0, a, np.where(f_b == 0, b, np.clip(0.01, low, high)))
+
+    while active.any() and iterations < max_iterations:
+        iterations += 1
+        idx = np.flatnonzero(active)
+        r = rate[idx]
+
+        f, df = npv_with_derivative(cash_flows[idx], r)
+        exact = f == 0
+
+        # Shrink the bracket, keeping the end whose sign matches f(low) in `a`
+        same_as_a = np.sign(f) == np.sign(f_a[idx])
+        a[idx] = np.where(same_as_a, r, a[idx])
+        b[idx] = np.where(same_as_a, b[idx], r)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = r - f / df
+        inside = np.isfinite(newton) & (newton > a[idx]) & (newton < b[idx])
+        step = np.where(inside, newton, (a[idx] + b[idx]) / 2)
+        # Converged once the step or the remaining bracket is below tolerance
+        step_tolerance = tolerance * (1 + np.abs(r))
+        small = (np.abs(step - r) <= step_tolerance) | (b[idx] - a[idx] <= step_tolerance)
+
+        rate[idx] = np.where(exact, r, step)
+        converged[idx] = exact | small
+        active[idx] = ~converged[idx]
+
+    rates = np.where(converged, rate, np.nan)
+    return IRRResult(rates, converged, bracketed | root_at_bound, iterations)
+
+
+def annualized_irr_percentage(periodic_rates: np.ndarray, periods_per_year: int = 12) -> np.ndarray:
+    """
+    Convert periodic IRR to the nominal annual percentage used in responses
+    """
+    return periodic_rates * periods_per_year * 100
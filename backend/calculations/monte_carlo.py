@@ -0,0 +1,296 @@
+import math
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.roi_models import (
+    DistributionSpec, DistributionSummary, DistributionType, SimulationBand,
+    SimulationRequest, SimulationResponse
+)
+from calculations.plans import CalculationPlan
+from calculations.projection_engine import INPUT_COLUMNS, calculate_batch_metrics, project_batch
+from calculations.roi_calculator import ROICalculator
+
+# Valid range for each input that can be simulated; draws are clipped into it
+SIMULATED_INPUTS = {
+    "monthly_revenue": (0.0, math.inf),
+    "growth_rate": (-0.99, 5.0),
+    "gross_margin": (0.0, 1.0),
+    "churn_rate": (0.0, 1.0),
+    "customer_acquisition_cost": (0.0, math.inf),
+    "average_order_value": (0.0, math.inf),
+}
+
+# Scenario ranges used to derive distributions, and the prepared input holding the base value
+SCENARIO_RANGES = {
+    "monthly_revenue": ("revenue", "monthly_revenue"),
+    "customer_acquisition_cost": ("cac", "cac"),
+    "average_order_value": ("aov", "aov"),
+}
+
+# Costs the calculator derives from revenue when the request leaves them unset
+REVENUE_LINKED_COSTS = {
+    "marketing_spend": "marketing_spend",
+    "operating_expenses": "operating_expenses",
+    "fulfillment_costs": "fulfillment_costs",
+}
+
+# Paths are i.i.d., so the first N paths are a uniform sample for the monthly bands
+BAND_SAMPLE_SIZE = 10000
+HISTOGRAM_BINS = 20
+
+
+def sample_distribution(spec: DistributionSpec, rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Draw values from a distribution spec
+    """
+    if spec.distribution == DistributionType.NORMAL:
+        return rng.normal(spec.mean, spec.std, size)
+
+    if spec.distribution == DistributionType.LOGNORMAL:
+        # Parameterized by the mean and standard deviation of the values themselves
+        sigma2 = math.log(1 + (spec.std / spec.mean) ** 2)
+        return rng.lognormal(math.log(spec.mean) - sigma2 / 2, math.sqrt(sigma2), size)
+
+    if spec.low == spec.high:
+        return np.full(size, float(spec.low))
+
+    if spec.distribution == DistributionType.TRIANGULAR:
+        return rng.triangular(spec.low, spec.mode, spec.high, size)
+
+    return rng.uniform(spec.low, spec.high, size)
+
+
+def validate_distribution(name: str, spec: DistributionSpec) -> None:
+    """
+    Check a spec names a simulated input and carries the parameters its family needs
+    """
+    if name not in SIMULATED_INPUTS:
+        raise ValueError(f"Cannot simulate '{name}'; supported inputs: {', '.join(SIMULATED_INPUTS)}")
+
+    required = {
+        DistributionType.NORMAL: ("mean", "std"),
+        DistributionType.LOGNORMAL: ("mean", "std"),
+        DistributionType.TRIANGULAR: ("low", "mode", "high"),
+        DistributionType.UNIFORM: ("low", "high"),
+    }[spec.distribution]
+    missing = [param for param in required if getattr(spec, param) is None]
+    if missing:
+        raise ValueError(f"{spec.distribution.value} distribution for '{name}' requires {', '.join(missing)}")
+
+    if spec.distribution == DistributionType.LOGNORMAL and spec.mean <= 0:
+        raise ValueError(f"lognormal distribution for '{name}' requires a positive mean")
+    if spec.distribution == DistributionType.TRIANGULAR and not spec.low <= spec.mode <= spec.high:
+        raise ValueError(f"triangular distribution for '{name}' requires low <= mode <= high")
+
+
+def derive_scenario_distributions(
+    processed_input: Dict[str, Any],
+    scenario_ranges: Mapping[str, Tuple[float, float]]
+) -> Dict[str, DistributionSpec]:
+    """
+    Triangular distributions over the scenario's min/max ranges, peaking at the base value
+    """
+    distributions = {}
+
+    for name, (range_key, input_key) in SCENARIO_RANGES.items():
+        value_range = scenario_ranges.get(range_key)
+        if not value_range:
+            continue
+
+        low, high = value_range
+        base = float(processed_input[input_key])
+        distributions[name] = DistributionSpec(
+            distribution=DistributionType.TRIANGULAR,
+            low=min(low, base),
+            mode=base,
+            high=max(high, base)
+        )
+
+    return distributions
+
+
+def simulate_chunk(
+    base_input: Dict[str, Any],
+    linked_costs: Sequence[str],
+    distributions: Dict[str, DistributionSpec],
+    paths: int,
+    seed: np.random.SeedSequence,
+    timeframe_months: int,
+    discount_rate: float,
+    keep_rows: int
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate one chunk of paths through the projection engine.
+    Module-level so it can run in a process pool.
+    """
+    rng = np.random.default_rng(seed)
+    draws = {
+        name: np.clip(sample_distribution(spec, rng, paths), *SIMULATED_INPUTS[name])
+        for name, spec in distributions.items()
+    }
+
+    inputs = {column: np.full(paths, float(base_input[column])) for column in INPUT_COLUMNS}
+
+    # Revenue-driven costs move with the sampled revenue
+    if "monthly_revenue" in draws:
+        scale = draws["monthly_revenue"] / base_input["monthly_revenue"]
+        inputs["monthly_revenue"] = draws["monthly_revenue"]
+        inputs["payment_processing_cost"] = inputs["payment_processing_cost"] * scale
+        for column in linked_costs:
+            inputs[column] = inputs[column] * scale
+
+    for name in ("gross_margin", "growth_rate"):
+        if name in draws:
+            inputs[name] = draws[name]
+
+    projections = project_batch(inputs, np.full(paths, timeframe_months))
+    metrics = calculate_batch_metrics(projections, inputs["initial_investment"], discount_rate)
+
+    # Unit economics follow the calculator's CLV rules
+    aov = draws.get("average_order_value", np.full(paths, float(base_input["aov"])))
+    cac = draws.get("customer_acquisition_cost", np.full(paths, float(base_input["cac"])))
+    churn = draws.get("churn_rate", np.full(paths, float(base_input["churn_rate"] or 0)))
+    margin = inputs["gross_margin"]
+    fallback_clv = base_input.get("clv_override") or aov * 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        clv = np.where(churn > 0, aov * margin / churn, fallback_clv)
+        clv_cac = np.where(cac > 0, clv / cac, np.nan)
+
+    return {
+        "roi_percentage": metrics["roi_percentage"],
+        "npv": metrics["npv"],
+        "payback_period_months": metrics["payback_period_months"],
+        "clv_cac_ratio": clv_cac,
+        # Sampled inputs the insight rules read
+        "gross_margin": margin,
+        "growth_rate": inputs["growth_rate"],
+        "churn_rate": churn,
+        "initial_investment": inputs["initial_investment"],
+        "monthly_revenue": inputs["monthly_revenue"],
+        "cumulative_profit": projections.cumulative_profit[:keep_rows],
+    }
+
+
+def summarize_distribution(values: np.ndarray, percentiles: Sequence[float]) -> DistributionSummary:
+    """
+    Summary statistics, percentiles and a histogram over the finite values
+    """
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return DistributionSummary()
+
+    counts, edges = np.histogram(finite, bins=HISTOGRAM_BINS)
+    return DistributionSummary(
+        mean=float(finite.mean()),
+        std=float(finite.std()),
+        min=float(finite.min()),
+        max=float(finite.max()),
+        percentiles=_percentile_dict(np.percentile(finite, percentiles), percentiles),
+        histogram={"bin_edges": edges.tolist(), "counts": counts.astype(float).tolist()}
+    )
+
+
+def _percentile_dict(values: Sequence[float], percentiles: Sequence[float]) -> Dict[str, float]:
+    return {f"p{p:g}": float(v) for p, v in zip(percentiles, values)}
+
+
+class MonteCarloSimulator:
+    """
+    Risk simulation over uncertain calculator inputs, evaluated in bounded chunks
+    """
+
+    def __init__(self, calculator: ROICalculator):
+        self.calculator = calculator
+
+    def run(
+        self,
+        simulation_request: SimulationRequest,
+        plan: CalculationPlan,
+        executor: Optional[Executor] = None
+    ) -> SimulationResponse:
+        """
+        Simulate ``paths`` outcomes and summarize their distribution
+        """
+        request = simulation_request.base_calculation
+        base_input = self.calculator._prepare_input_data(request, plan.scenario)
+        base_input["clv_override"] = request.customer_lifetime_value
+
+        distributions = self._resolve_distributions(simulation_request, base_input, plan.scenario.ranges)
+        linked_costs = [column for field, column in REVENUE_LINKED_COSTS.items() if not getattr(request, field)]
+
+        # Split paths into chunks so only one chunk's projection matrix is alive per worker
+        chunk_sizes = [
+            min(simulation_request.chunk_size, simulation_request.paths - start)
+            for start in range(0, simulation_request.paths, simulation_request.chunk_size)
+        ]
+        seeds = np.random.SeedSequence(simulation_request.seed).spawn(len(chunk_sizes))
+        offsets = np.cumsum([0] + chunk_sizes[:-1])
+        keep_rows = [int(min(size, max(0, BAND_SAMPLE_SIZE - offset))) for size, offset in zip(chunk_sizes, offsets)]
+
+        n = len(chunk_sizes)
+        args = (
+            [base_input] * n, [linked_costs] * n, [distributions] * n, chunk_sizes, seeds,
+            [request.timeframe_months] * n, [self.calculator.DISCOUNT_RATE] * n, keep_rows
+        )
+        chunks = list(executor.map(simulate_chunk, *args) if executor else map(simulate_chunk, *args))
+
+        combined = {
+            name: np.concatenate([chunk[name] for chunk in chunks])
+            for name in chunks[0] if name != "cumulative_profit"
+        }
+        band_rows = np.concatenate([chunk["cumulative_profit"] for chunk in chunks])
+
+        # Rules evaluated across all paths at once; reported when most paths trigger them
+        messages = self.calculator.insight_engine.summarize(combined, plan)
+
+        percentiles = simulation_request.percentiles
+        return SimulationResponse(
+            paths=simulation_request.paths,
+            timeframe_months=request.timeframe_months,
+            currency_code=plan.currency_code,
+            probability_of_payback=(
+                float(np.isfinite(combined["payback_period_months"]).mean())
+                if request.initial_investment > 0 else None
+            ),
+            payback_period_months=summarize_distribution(combined["payback_period_months"], percentiles),
+            roi_percentage=summarize_distribution(combined["roi_percentage"], percentiles),
+            npv=summarize_distribution(combined["npv"], percentiles),
+            clv_cac_ratio=summarize_distribution(combined["clv_cac_ratio"], percentiles),
+            monthly_bands=self._monthly_bands(band_rows, percentiles),
+            band_sample_size=len(band_rows),
+            distributions_used=distributions,
+            insights=messages["insights"],
+            recommendations=messages["recommendations"],
+            risk_factors=messages["risk_factors"]
+        )
+
+    def _resolve_distributions(
+        self,
+        simulation_request: SimulationRequest,
+        base_input: Dict[str, Any],
+        scenario_ranges: Mapping[str, Tuple[float, float]]
+    ) -> Dict[str, DistributionSpec]:
+        """
+        Explicit distributions win over ones derived from the scenario ranges
+        """
+        distributions = {}
+        if simulation_request.derive_from_scenario:
+            distributions.update(derive_scenario_distributions(base_input, scenario_ranges))
+        distributions.update(simulation_request.distributions)
+
+        for name, spec in distributions.items():
+            validate_distribution(name, spec)
+
+        return distributions
+
+    def _monthly_bands(self, rows: np.ndarray, percentiles: List[float]) -> List[SimulationBand]:
+        """
+        Cumulative profit percentiles for each month
+        """
+        bands = np.percentile(rows, percentiles, axis=0)
+        return [
+            SimulationBand(month=month + 1, cumulative_profit=_percentile_dict(bands[:, month], percentiles))
+            for month in range(rows.shape[1])
+        ]
@@ -0,0 +1,243 @@
+"""
+Compiled calculation plans for the reference data catalog.
+
+Every (country, business type, scenario) combination is resolved once per
+reference data snapshot into a ``CalculationPlan``: the scenario defaults as
+plain floats, the country's tax rates as an array, the industry benchmarks
+and a bit mask of the features that steer insights, recommendations and risk
+factors. The calculator reads slots off the plan, so per-request work is only
+applying the request's overrides. A plan reporting in another currency than
+the country's carries a ``CurrencyConversion`` with the resolved exchange rate.
+
+Plans are immutable and shared between requests and threads.
+"""
+import enum
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from calculations.fx import FXRateTable
+from calculations.projection_engine import tax_rate_array
+from utils.currency_format import CurrencyFormatter, CurrencyFormatterRegistry
+
+# Static benchmarks by business type - in production, this would come from a database
+INDUSTRY_BENCHMARKS: Mapping[str, Mapping[str, float]] = MappingProxyType({
+    "saas": MappingProxyType({
+        "average_roi": 150.0,
+        "average_gross_margin": 0.80,
+        "average_churn_rate": 0.05,
+        "average_cac_payback": 12.0
+    }),
+    "ecommerce": MappingProxyType({
+        "average_roi": 80.0,
+        "average_gross_margin": 0.45,
+        "average_conversion_rate": 0.025,
+        "average_aov": 75.0
+    }),
+    "startup": MappingProxyType({
+        "average_roi": 200.0,
+        "average_gross_margin": 0.70,
+        "average_burn_rate": 50000.0,
+        "average_growth_rate": 0.15
+    })
+})
+
+DEFAULT_PAYMENT_PROCESSING_RATE = 0.029  # Default 2.9%
+
+# Currencies not flagged as a volatility risk
+STABLE_CURRENCIES = frozenset({"USD", "EUR", "GBP"})
+HIGH_INFLATION_RATE = 0.05
+
+# Scenario metrics with a min/max range, used by the Monte Carlo simulator
+RANGE_METRICS = ("revenue", "cac", "aov")
+
+
+class PlanFeature(enum.IntFlag):
+    """
+    Properties of a plan that switch insight, recommendation and risk rules on
+    """
+
+    NONE = 0
+    SUBSCRIPTION = 1
+    ECOMMERCE = 2
+    HIGH_INFLATION = 4
+    CURRENCY_RISK = 8
+
+
+class _FrozenSlots:
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init(self, **values: Any) -> None:
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+
+class ScenarioPlan(_FrozenSlots):
+    """
+    One business scenario's defaults, resolved from its metrics
+    """
+
+    __slots__ = (
+        "business_type", "scenario_id", "name", "revenue_default", "gross_margin", "cac", "aov",
+        "marketing_percentage", "operating_expense_ratio", "churn_rate", "growth_rate",
+        "fulfillment_ratio", "payment_terms", "ranges", "benchmarks", "features"
+    )
+
+    def __init__(self, business_type: str, scenario: Dict[str, Any]):
+        metrics = scenario["metrics"]
+        scenario_id = scenario.get("id", "")
+
+        features = PlanFeature.NONE
+        if "subscription" in scenario_id.lower():
+            features |= PlanFeature.SUBSCRIPTION
+        elif "ecommerce" in scenario_id.lower():
+            features |= PlanFeature.ECOMMERCE
+
+        self._init(
+            business_type=business_type,
+            scenario_id=scenario_id,
+            name=scenario.get("name", "Unknown"),
+            revenue_default=float(metrics["revenue"]["default"]),
+            gross_margin=float(metrics["gross_margin"]),
+            cac=float(metrics["cac"]["default"]),
+            aov=float(metrics["aov"]["default"]),
+            marketing_percentage=float(metrics["marketing_budget"]["percentage"]),
+            operating_expense_ratio=float(metrics["operating_expenses"]),
+            churn_rate=float(metrics.get("churn_rate") or 0),
+            growth_rate=float(metrics["growth_rate"]),
+            fulfillment_ratio=float(metrics.get("fulfillment_cost") or 0),
+            payment_terms=metrics["payment_terms"],
+            ranges=MappingProxyType({
+                key: (float(metrics[key]["min"]), float(metrics[key]["max"]))
+                for key in RANGE_METRICS
+                if metrics.get(key) and "min" in metrics[key] and "max" in metrics[key]
+            }),
+            benchmarks=INDUSTRY_BENCHMARKS.get(business_type),
+            features=features
+        )
+
+
+class CountryPlan(_FrozenSlots):
+    """
+    One country's tax rates, economic indicators and currency formatter
+    """
+
+    __slots__ = (
+        "code", "name", "currency_code", "tax_rates", "corporate_tax_rate", "inflation_rate", "formatter", "features"
+    )
+
+    def __init__(self, country: Dict[str, Any], formatter: Optional[CurrencyFormatter] = None):
+        tax_rates = tax_rate_array([country["tax_rates"]])[0]
+        tax_rates.flags.writeable = False
+        inflation_rate = float(country["economic_indicators"]["inflation_2025"])
+        currency = country["currency"]
+        currency_code = currency["code"]
+
+        features = PlanFeature.NONE
+        if inflation_rate > HIGH_INFLATION_RATE:
+            features |= PlanFeature.HIGH_INFLATION
+        if currency_code not in STABLE_CURRENCIES:
+            features |= PlanFeature.CURRENCY_RISK
+
+        self._init(
+            code=country["code"],
+            name=country["name"],
+            currency_code=currency_code,
+            tax_rates=tax_rates,
+            corporate_tax_rate=float(tax_rates[0]),
+            inflation_rate=inflation_rate,
+            formatter=formatter or CurrencyFormatter(
+                currency_code, currency["symbol"], currency.get("decimal_places", 2)
+            ),
+            features=features
+        )
+
+
+class CurrencyConversion(_FrozenSlots):
+    """
+    Exchange rate and formatter for reporting a country's results in another currency
+    """
+
+    __slots__ = ("from_currency", "to_currency", "rate", "formatter", "rates_version", "rates_as_of")
+
+    def __init__(self, from_currency: str, to_currency: str, fx_rates: FXRateTable, formatter: CurrencyFormatter):
+        self._init(
+            from_currency=from_currency,
+            to_currency=to_currency,
+            rate=fx_rates.rate(from_currency, to_currency),
+            formatter=formatter,
+            rates_version=fx_rates.version,
+            rates_as_of=fx_rates.as_of
+        )
+
+
+class CalculationPlan(_FrozenSlots):
+    """
+    Everything the calculator needs from the reference data for one
+    (country, business type, scenario) combination
+    """
+
+    # Weak references let per-plan caches (e.g. rendered insight messages) follow the snapshot's lifetime
+    __slots__ = ("country", "scenario", "conversion", "features", "__weakref__")
+
+    def __init__(self, country: CountryPlan, scenario: ScenarioPlan, conversion: Optional[CurrencyConversion] = None):
+        self._init(
+            country=country, scenario=scenario, conversion=conversion, features=country.features | scenario.features
+        )
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.country.code, self.scenario.business_type, self.scenario.scenario_id)
+
+    @property
+    def currency_code(self) -> str:
+        return self.country.currency_code
+
+    @property
+    def report_currency_code(self) -> str:
+        return self.conversion.to_currency if self.conversion else self.country.currency_code
+
+    @property
+    def report_formatter(self) -> CurrencyFormatter:
+        return self.conversion.formatter if self.conversion else self.country.formatter
+
+    def with_conversion(self, conversion: CurrencyConversion) -> "CalculationPlan":
+        """
+        The same plan reporting its monetary results through ``conversion``
+        """
+        return CalculationPlan(self.country, self.scenario, conversion)
+
+
+def compile_plan(country: Dict[str, Any], business_type: str, scenario: Dict[str, Any]) -> CalculationPlan:
+    """
+    Compile a single plan from raw country and scenario data
+    """
+    return CalculationPlan(CountryPlan(country), ScenarioPlan(business_type, scenario))
+
+
+def compile_plans(
+    countries: Iterable[Dict[str, Any]],
+    business_types: Iterable[Dict[str, Any]],
+    formatters: Optional[CurrencyFormatterRegistry] = None
+) -> Dict[Tuple[str, str, str], CalculationPlan]:
+    """
+    Compile every (country, business type, scenario) combination of a catalog,
+    taking currency formatters for the default locale from ``formatters`` if given
+    """
+    country_plans = [
+        CountryPlan(country, formatters.get(country["currency"]["code"]) if formatters else None)
+        for country in countries
+    ]
+    scenario_plans = [
+        ScenarioPlan(bt["id"], scenario)
+        for bt in business_types
+        for scenario in bt["scenarios"]
+    ]
+    plans = {}
+    for country_plan in country_plans:
+        for scenario_plan in scenario_plans:
+            plan = CalculationPlan(country_plan, scenario_plan)
+            plans[plan.key] = plan
+    return plans
@@ -0,0 +1,230 @@
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+# Prepared calculator inputs the engine consumes, one value per request
+INPUT_COLUMNS = (
+    "monthly_revenue", "initial_investment", "gross_margin", "marketing_spend",
+    "operating_expenses", "fulfillment_costs", "payment_processing_cost",
+    "employee_costs", "growth_rate"
+)
+
+# Monthly cash flow columns, zeroed beyond each request's timeframe
+FLOW_COLUMNS = (
+    "revenue", "cogs", "marketing", "fulfillment", "payment_processing",
+    "operating", "employee", "expenses", "profit"
+)
+
+# Columns holding amounts of money, converted when reporting in another currency
+MONETARY_COLUMNS = FLOW_COLUMNS + ("cumulative_profit",)
+
+# Country tax rates the engine applies, in column order
+TAX_RATE_FIELDS = ("corporate_tax", "vat", "payroll_tax")
+
+
+class ProjectionArrays:
+    """
+    Month-by-month financial projections stored as NumPy columns.
+
+    Columns have shape (requests, months). Requests with a shorter timeframe
+    than the batch are padded: flow columns are zero past ``timeframe_months``
+    and ``mask`` marks the months that are inside each request's horizon.
+    """
+
+    __slots__ = (
+        "month", "timeframe_months", "mask", "growth_factor", "revenue", "cogs",
+        "marketing", "fulfillment", "payment_processing", "operating", "employee",
+        "expenses", "profit", "cumulative_profit", "roi"
+    )
+
+    def __len__(self) -> int:
+        return self.revenue.shape[0]
+
+    @property
+    def months(self) -> int:
+        return len(self.month)
+
+    def row(self, index: int) -> "ProjectionArrays":
+        """
+        Get one request's projections as 1-D columns trimmed to its timeframe
+        """
+        timeframe = int(self.timeframe_months[index])
+        p = ProjectionArrays()
+        p.month = self.month[:timeframe]
+        p.timeframe_months = self.timeframe_months[index:index + 1]
+        p.mask = self.mask[index, :timeframe]
+        for name in ("growth_factor", "cumulative_profit", "roi") + FLOW_COLUMNS:
+            setattr(p, name, getattr(self, name)[index, :timeframe])
+        return p
+
+    def scaled(self, factors: np.ndarray) -> "ProjectionArrays":
+        """
+        Copy with the monetary columns multiplied by one factor per request, e.g. an exchange rate
+        """
+        p = ProjectionArrays()
+        for name in self.__slots__:
+            setattr(p, name, getattr(self, name))
+        row_factors = np.asarray(factors, dtype=float)[:, None]
+        for name in MONETARY_COLUMNS:
+            setattr(p, name, getattr(self, name) * row_factors)
+        return p
+
+
+def stack_inputs(input_rows: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Stack prepared input dicts into one float array per input column
+    """
+    return {
+        column: np.array([row[column] for row in input_rows], dtype=float)
+        for column in INPUT_COLUMNS
+    }
+
+
+def project_batch(inputs: Dict[str, np.ndarray], timeframe_months: Sequence[int]) -> ProjectionArrays:
+    """
+    Compute monthly projection columns for a batch of requests in one pass
+    """
+    p = ProjectionArrays()
+    p.timeframe_months = np.asarray(timeframe_months, dtype=int)
+    n_months = int(p.timeframe_months.max())
+    n_requests = len(p.timeframe_months)
+
+    p.month = np.arange(1, n_months + 1)
+    p.mask = p.month[None, :] <= p.timeframe_months[:, None]
+    column = {name: values[:, None] for name, values in inputs.items()}
+    initial_investment = inputs["initial_investment"]
+
+    # Growth compounds monthly from month 1: [1, (1+g), (1+g)^2, ...]
+    p.growth_factor = np.ones((n_requests, n_months))
+    np.cumprod(
+        np.broadcast_to(1 + column["growth_rate"], (n_requests, n_months - 1)),
+        axis=1,
+        out=p.growth_factor[:, 1:]
+    )
+    active_growth = p.growth_factor * p.mask
+
+    p.revenue = column["monthly_revenue"] * active_growth
+    p.cogs = p.revenue * (1 - column["gross_margin"])
+
+    # Variable expenses that scale with revenue
+    p.marketing = column["marketing_spend"] * active_growth
+    p.fulfillment = column["fulfillment_costs"] * active_growth
+    p.payment_processing = column["payment_processing_cost"] * active_growth
+
+    # Fixed expenses
+    p.operating = column["operating_expenses"] * p.mask
+    p.employee = column["employee_costs"] * p.mask
+
+    p.expenses = p.cogs + p.marketing + p.fulfillment + p.payment_processing + p.operating + p.employee
+    p.profit = p.revenue - p.expenses
+
+    # Start from the negative investment and accumulate in month order
+    p.cumulative_profit = np.cumsum(
+        np.concatenate((-column["initial_investment"], p.profit), axis=1), axis=1
+    )[:, 1:]
+
+    invested = initial_investment > 0
+    denominator = np.where(invested[:, None], column["initial_investment"], np.maximum(p.revenue, 1))
+    p.roi = (p.cumulative_profit / denominator) * 100
+
+    return p
+
+
+def project_monthly(input_data: Dict[str, Any], timeframe_months: int) -> ProjectionArrays:
+    """
+    Compute 1-D monthly projection columns for a single request
+    """
+    return project_batch(stack_inputs([input_data]), [timeframe_months]).row(0)
+
+
+def calculate_batch_metrics(
+    p: ProjectionArrays,
+    initial_investment: np.ndarray,
+    discount_rate: float
+) -> Dict[str, np.ndarray]:
+    """
+    Compute core ROI metrics for every request in a batch.
+    Missing values (no payback within the timeframe) are NaN.
+    """
+    total_revenue = p.revenue.sum(axis=1)
+    total_expenses = p.expenses.sum(axis=1)
+    net_profit = p.profit.sum(axis=1)
+    gross_profit = total_revenue - np.where(p.revenue > 0, p.expenses - (p.revenue - p.profit), 0).sum(axis=1)
+
+    total_investment = initial_investment + total_expenses
+    safe_investment = np.where(total_investment > 0, total_investment, 1)
+    roi_ratio = np.where(total_investment > 0, net_profit / safe_investment, 0)
+
+    # NPV with monthly discounting of each month's profit
+    discount_factors = (1 + discount_rate / 12) ** p.month
+    npv = -initial_investment + (p.profit / discount_factors).sum(axis=1)
+
+    return {
+        "total_revenue": total_revenue,
+        "total_expenses": total_expenses,
+        "net_profit": net_profit,
+        "gross_profit": gross_profit,
+        "roi_ratio": roi_ratio,
+        "roi_percentage": roi_ratio * 100,
+        "payback_period_months": calculate_payback_periods(p, initial_investment),
+        "npv": npv,
+    }
+
+
+def calculate_payback_periods(p: ProjectionArrays, initial_investment: np.ndarray) -> np.ndarray:
+    """
+    Interpolated payback month per request, NaN when not reached
+    """
+    recovered = (p.cumulative_profit >= 0) & p.mask
+    first = recovered.argmax(axis=1)
+    rows = np.arange(len(first))
+
+    previous = p.cumulative_profit[rows, np.maximum(first - 1, 0)]
+    profit = p.profit[rows, first]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interpolated = first + (-previous / profit)
+
+    payback = np.where(first == 0, 1.0, interpolated)
+    return np.where(recovered.any(axis=1) & (initial_investment > 0), payback, np.nan)
+
+
+def tax_rate_array(tax_rates: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """
+    Stack country tax rate dicts into a (requests, TAX_RATE_FIELDS) array; only
+    the corporate rate is required
+    """
+    return np.array(
+        [[rates["corporate_tax"], rates.get("vat", 0), rates.get("payroll_tax", 0)] for rates in tax_rates],
+        dtype=float
+    ).reshape(-1, len(TAX_RATE_FIELDS))
+
+
+def calculate_batch_taxes(
+    p: ProjectionArrays,
+    tax_rates: np.ndarray,
+    employee_costs: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Compute tax implications for every request in a batch.
+    ``tax_rates`` has one row of TAX_RATE_FIELDS per request.
+    """
+    corporate_rate, vat_rate, payroll_rate = np.asarray(tax_rates, dtype=float).T
+
+    total_profit = np.where(p.profit > 0, p.profit, 0).sum(axis=1)
+    total_revenue = p.revenue.sum(axis=1)
+
+    corporate_tax = np.maximum(0, total_profit * corporate_rate)
+    vat_tax = total_revenue * vat_rate
+    payroll_tax = employee_costs * p.timeframe_months * payroll_rate
+
+    safe_profit = np.where(total_profit > 0, total_profit, 1)
+    effective_tax_rate = np.where(total_profit > 0, corporate_tax / safe_profit * 100, 0)
+
+    return {
+        "corporate_tax": corporate_tax,
+        "vat_tax": vat_tax,
+        "payroll_tax": payroll_tax,
+        "total_tax": corporate_tax + vat_tax + payroll_tax,
+        "effective_tax_rate": effective_tax_rate,
+        "after_tax_profit": total_profit - corporate_tax,
+    }
@@ -1,12 +1,45 @@
 import math
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 import numpy as np
 from models.roi_models import (
     ROICalculationRequest, ROIResponse, ROIMetrics, TaxCalculation,
-    BreakdownItem, MonthlyProjection
+    BreakdownItem, MonthlyProjection, CurrencyConversionDetails
 )
+from calculations.insight_rules import RULE_INPUTS, InsightEngine
+from calculations.irr_solver import IRRResult, annualized_irr_percentage, solve_irr
+from calculations.plans import DEFAULT_PAYMENT_PROCESSING_RATE, CalculationPlan, ScenarioPlan
+from calculations.projection_engine import (
+    ProjectionArrays, project_batch, stack_inputs, calculate_batch_metrics, calculate_batch_taxes
+)
+
+# Expense breakdown categories and the projection column each one sums
+EXPENSE_CATEGORIES = [
+    ("Cost of Goods Sold", "cogs", "Direct costs of producing goods/services"),
+    ("Marketing & Advertising", "marketing", "Customer acquisition and marketing costs"),
+    ("Operating Expenses", "operating", "General business operating costs"),
+    ("Fulfillment & Shipping", "fulfillment", "Order fulfillment and shipping costs"),
+    ("Payment Processing", "payment_processing", "Credit card and payment processing fees"),
+    ("Employee Costs", "employee", "Salary, benefits, and payroll taxes"),
+]
+
+# Response values shown pre-formatted in the result currency
+FORMATTED_VALUES = ("net_profit", "total_revenue", "total_expenses", "corporate_tax", "after_tax_profit", "npv")
+
+# Metrics and taxes that are amounts of money, converted to the report currency
+MONETARY_METRICS = ("total_revenue", "total_expenses", "net_profit", "gross_profit", "npv")
+MONETARY_TAXES = ("corporate_tax", "vat_tax", "payroll_tax", "total_tax", "after_tax_profit")
+
+# Prepared inputs taken from the scenario rather than the request
+SCENARIO_INPUTS = ("growth_rate",)
+
+
+def _optional(value: float) -> Optional[float]:
+    """Convert a NaN array value into None for optional response fields"""
+    value = float(value)
+    return None if math.isnan(value) else value
+
 
 class ROICalculator:
     """
@@ -17,106 +50,179 @@ class ROICalculator:
     def __init__(self):
         self.DISCOUNT_RATE = 0.10  # 10% annual discount rate for NPV
         self.RISK_FREE_RATE = 0.03  # 3% risk-free rate
+        self.insight_engine = InsightEngine()
         
     def calculate_comprehensive_roi(
         self, 
         request: ROICalculationRequest, 
-        country_data: Dict[str, Any], 
-        scenario_data: Dict[str, Any]
+        plan: CalculationPlan
     ) -> ROIResponse:
         """
         Main calculation method that computes comprehensive ROI analysis
         """
-        calculation_id = str(uuid.uuid4())
-        
-        # Extract base metrics from scenario
-        scenario_metrics = scenario_data["metrics"]
+        return self.calculate_batch([(request, plan)])[0]
+    
+    def calculate_batch(
+        self,
+        items: Sequence[Tuple[ROICalculationRequest, CalculationPlan]],
+        include_projections: bool = True
+    ) -> List[ROIResponse]:
+        """
+        Compute ROI analyses for many (request, plan) items at once.
+        Projections, metrics and taxes are evaluated as (requests x months) arrays.
+        """
+        return self._calculate(items, include_projections)[0]
+    
+    def calculate_streaming(
+        self,
+        request: ROICalculationRequest,
+        plan: CalculationPlan
+    ) -> Tuple[ROIResponse, ProjectionArrays]:
+        """
+        Compute a response without projection objects, together with the projection
+        columns, so callers can serialize the months incrementally
+        """
+        responses, projections = self._calculate([(request, plan)], False)
+        return responses[0], projections.row(0)
+    
+    def _calculate(
+        self,
+        items: Sequence[Tuple[ROICalculationRequest, CalculationPlan]],
+        include_projections: bool
+    ) -> Tuple[List[ROIResponse], ProjectionArrays]:
+        # Apply each request's overrides to its scenario defaults
+        plans = [plan for _, plan in items]
+        processed_inputs = [self._prepare_input_data(request, plan.scenario) for request, plan in items]
+        timeframes = [request.timeframe_months for request, _ in items]
+        
+        # Calculate monthly projections as columnar arrays
+        projections = self._calculate_monthly_projections(processed_inputs, timeframes)
+        investments = np.array([data["initial_investment"] for data in processed_inputs], dtype=float)
+        
+        # Calculate core ROI metrics and tax implications for the whole batch
+        metrics = self._calculate_roi_metrics(projections, investments)
+        taxes = self._calculate_taxes(projections, plans, processed_inputs)
+        
+        # Expense category totals for the breakdowns
+        category_totals = np.stack(
+            [getattr(projections, column).sum(axis=1) for _, column, _ in EXPENSE_CATEGORIES],
+            axis=1
+        )
         
-        # Prepare input data with defaults from scenario
-        processed_input = self._prepare_input_data(request, scenario_metrics)
+        # Insights, recommendations and risk factors rely on ratios, so they use local amounts
+        messages = self._generate_messages(metrics, processed_inputs, plans)
         
-        # Calculate monthly projections
-        monthly_projections = self._calculate_monthly_projections(
-            processed_input, country_data, request.timeframe_months
+        # Report currencies and display values for the whole batch
+        projections, metrics, taxes, category_totals = self._convert_currency(
+            plans, projections, metrics, taxes, category_totals
         )
+        formatted_values = self._format_currency_values(metrics, taxes, plans)
         
-        # Calculate core ROI metrics
-        roi_metrics = self._calculate_roi_metrics(
-            monthly_projections, processed_input["initial_investment"]
-        )
+        responses = [
+            self._build_response(
+                i, item, processed_inputs[i], projections, metrics, taxes,
+                category_totals[i], messages[i], formatted_values[i], include_projections
+            )
+            for i, item in enumerate(items)
+        ]
+        return responses, projections
+    
+    def _build_response(
+        self,
+        index: int,
+        item: Tuple[ROICalculationRequest, CalculationPlan],
+        processed_input: Dict[str, Any],
+        projections: ProjectionArrays,
+        metrics: Dict[str, np.ndarray],
+        taxes: Dict[str, np.ndarray],
+        category_totals: np.ndarray,
+        messages: Dict[str, List[str]],
+        formatted_values: Dict[str, str],
+        include_projections: bool
+    ) -> ROIResponse:
+        """
+        Assemble the response objects for one item of a batch
+        """
+        request, plan = item
         
-        # Calculate tax implications
-        tax_calculation = self._calculate_taxes(
-            monthly_projections, country_data, processed_input
+        roi_metrics = ROIMetrics(
+            **{name: _optional(values[index]) for name, values in metrics.items() if name != "irr_converged"},
+            irr_converged=bool(metrics["irr_converged"][index]) if processed_input["initial_investment"] > 0 else None
         )
+        tax_calculation = TaxCalculation(**{name: float(values[index]) for name, values in taxes.items()})
         
         # Generate breakdowns
-        revenue_breakdown = self._generate_revenue_breakdown(monthly_projections, processed_input)
-        expense_breakdown = self._generate_expense_breakdown(monthly_projections, processed_input)
-        
-        # Generate insights and recommendations
-        insights = self._generate_insights(roi_metrics, processed_input, country_data)
-        recommendations = self._generate_recommendations(roi_metrics, processed_input, scenario_data)
-        risk_factors = self._identify_risk_factors(processed_input, country_data)
+        revenue_breakdown = self._generate_revenue_breakdown(roi_metrics.total_revenue)
+        expense_breakdown = self._generate_expense_breakdown(category_totals, roi_metrics.total_expenses)
         
         # Get industry benchmarks
-        industry_benchmarks = self._get_industry_benchmarks(request.business_type, request.scenario)
+        industry_benchmarks = self._get_industry_benchmarks(plan)
+        
+        currency_code = plan.report_currency_code
+        currency_conversion = None
+        if plan.conversion is not None:
+            currency_conversion = CurrencyConversionDetails.model_construct(
+                from_currency=plan.conversion.from_currency,
+                to_currency=plan.conversion.to_currency,
+                exchange_rate=plan.conversion.rate,
+                rates_version=plan.conversion.rates_version,
+                rates_as_of=plan.conversion.rates_as_of
+            )
         
-        # Format currency values
-        currency_code = country_data["currency"]["code"]
-        formatted_values = self._format_currency_values(roi_metrics, tax_calculation, currency_code)
+        monthly_projections = []
+        if include_projections:
+            monthly_projections = self._build_monthly_projections(projections.row(index))
         
-        return ROIResponse(
-            calculation_id=calculation_id,
+        # Every field is built here from validated inputs, so skip re-validating the nested models
+        return ROIResponse.model_construct(
+            calculation_id=str(uuid.uuid4()),
             timestamp=datetime.utcnow(),
-            input_summary=self._create_input_summary(processed_input, country_data, scenario_data),
+            input_summary=self._create_input_summary(processed_input, plan),
             metrics=roi_metrics,
             tax_calculation=tax_calculation,
             revenue_breakdown=revenue_breakdown,
             expense_breakdown=expense_breakdown,
             monthly_projections=monthly_projections,
-            insights=insights,
-            recommendations=recommendations,
-            risk_factors=risk_factors,
+            insights=messages["insights"],
+            recommendations=messages["recommendations"],
+            risk_factors=messages["risk_factors"],
             industry_benchmarks=industry_benchmarks,
             currency_code=currency_code,
-            formatted_values=formatted_values
+            formatted_values=formatted_values,
+            currency_conversion=currency_conversion
         )
     
-    def _prepare_input_data(self, request: ROICalculationRequest, scenario_metrics: Dict) -> Dict[str, Any]:
+    def _prepare_input_data(self, request: ROICalculationRequest, scenario: ScenarioPlan) -> Dict[str, Any]:
         """
-        Prepare and validate input data with scenario defaults
+        Prepare input data by applying the request's overrides to the scenario defaults
         """
         # Use scenario defaults where user input is not provided
-        revenue_default = scenario_metrics["revenue"]["default"]
-        gross_margin = request.gross_margin or scenario_metrics["gross_margin"]
-        cac = request.customer_acquisition_cost or scenario_metrics["cac"]["default"]
-        aov = request.average_order_value or scenario_metrics["aov"]["default"]
+        gross_margin = request.gross_margin or scenario.gross_margin
+        cac = request.customer_acquisition_cost or scenario.cac
+        aov = request.average_order_value or scenario.aov
         
         # Calculate derived metrics
-        monthly_revenue = request.monthly_revenue or revenue_default
+        monthly_revenue = request.monthly_revenue or scenario.revenue_default
         cogs = monthly_revenue * (1 - gross_margin)
         gross_profit = monthly_revenue * gross_margin
         
         # Marketing and operational expenses
-        marketing_spend = request.marketing_spend or (monthly_revenue * scenario_metrics["marketing_budget"]["percentage"])
-        operating_expenses = request.operating_expenses or (monthly_revenue * scenario_metrics["operating_expenses"])
+        marketing_spend = request.marketing_spend or (monthly_revenue * scenario.marketing_percentage)
+        operating_expenses = request.operating_expenses or (monthly_revenue * scenario.operating_expense_ratio)
         
         # Customer metrics
-        churn_rate = request.churn_rate or scenario_metrics.get("churn_rate", 0)
-        if churn_rate and churn_rate > 0:
+        churn_rate = request.churn_rate or scenario.churn_rate
+        if churn_rate > 0:
             clv = self._calculate_clv(aov, gross_margin, churn_rate)
         else:
             clv = request.customer_lifetime_value or (aov * 12)  # Annual estimate
         
         # Growth parameters
-        growth_rate = scenario_metrics["growth_rate"]
+        growth_rate = scenario.growth_rate
         
         # Additional costs
-        fulfillment_costs = request.fulfillment_costs or (
-            monthly_revenue * scenario_metrics.get("fulfillment_cost", 0) if scenario_metrics.get("fulfillment_cost") else 0
-        )
-        payment_processing = request.payment_processing_rate or 0.029  # Default 2.9%
+        fulfillment_costs = request.fulfillment_costs or (monthly_revenue * scenario.fulfillment_ratio)
+        payment_processing = request.payment_processing_rate or DEFAULT_PAYMENT_PROCESSING_RATE
         payment_processing_cost = monthly_revenue * payment_processing
         
         return {
@@ -135,9 +241,45 @@ class ROICalculator:
             "fulfillment_costs": fulfillment_costs,
             "payment_processing_cost": payment_processing_cost,
             "employee_costs": request.employee_costs or 0,
-            "payment_terms": scenario_metrics["payment_terms"]
+            "payment_terms": scenario.payment_terms
         }
     
+    def _prepare_input_override(
+        self,
+        request: ROICalculationRequest,
+        scenario: ScenarioPlan,
+        name: str,
+        value: float,
+        base_input: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Prepare input data with one input replaced. Request fields are re-run
+        through preparation so derived defaults follow them; scenario inputs
+        are overridden on the prepared data.
+        """
+        if name in SCENARIO_INPUTS:
+            base_input = base_input or self._prepare_input_data(request, scenario)
+            return {**base_input, name: value}
+        
+        # Skip validation so edge values (e.g. a 100% margin) can still be evaluated
+        return self._prepare_input_data(request.model_copy(update={name: value}), scenario)
+    
+    def calculate_metric_arrays(
+        self,
+        processed_inputs: List[Dict[str, Any]],
+        timeframes: Sequence[int],
+        include_irr: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """
+        Core metrics for prepared inputs without building responses.
+        Fast path for solvers that evaluate many input variations.
+        """
+        projections = self._calculate_monthly_projections(processed_inputs, timeframes)
+        investments = np.array([data["initial_investment"] for data in processed_inputs], dtype=float)
+        if include_irr:
+            return self._calculate_roi_metrics(projections, investments)
+        return calculate_batch_metrics(projections, investments, self.DISCOUNT_RATE)
+    
     def _calculate_clv(self, aov: float, gross_margin: float, churn_rate: float) -> float:
         """
         Calculate Customer Lifetime Value using the standard formula
@@ -152,251 +294,92 @@ class ROICalculator:
     
     def _calculate_monthly_projections(
         self, 
-        input_data: Dict[str, Any], 
-        country_data: Dict[str, Any], 
-        timeframe_months: int
-    ) -> List[MonthlyProjection]:
+        processed_inputs: List[Dict[str, Any]], 
+        timeframes: List[int]
+    ) -> ProjectionArrays:
         """
         Calculate month-by-month financial projections with growth
         """
-        projections = []
-        cumulative_profit = -input_data["initial_investment"]  # Start with negative investment
-        
-        for month in range(1, timeframe_months + 1):
-            # Apply growth rate
-            growth_factor = (1 + input_data["growth_rate"]) ** (month - 1)
-            
-            # Calculate monthly metrics
-            monthly_revenue = input_data["monthly_revenue"] * growth_factor
-            monthly_cogs = monthly_revenue * (1 - input_data["gross_margin"])
-            monthly_gross_profit = monthly_revenue - monthly_cogs
-            
-            # Variable expenses that scale with revenue
-            monthly_marketing = input_data["marketing_spend"] * growth_factor
-            monthly_fulfillment = input_data["fulfillment_costs"] * growth_factor
-            monthly_payment_processing = input_data["payment_processing_cost"] * growth_factor
-            
-            # Fixed expenses
-            monthly_operating = input_data["operating_expenses"]
-            monthly_employee = input_data["employee_costs"]
-            
-            # Total expenses
-            total_expenses = (
-                monthly_cogs + monthly_marketing + monthly_fulfillment + 
-                monthly_payment_processing + monthly_operating + monthly_employee
-            )
-            
-            # Net profit before taxes
-            monthly_profit = monthly_revenue - total_expenses
-            
-            # Update cumulative profit
-            cumulative_profit += monthly_profit
-            
-            # Calculate ROI for this month
-            if input_data["initial_investment"] > 0:
-                roi = (cumulative_profit / input_data["initial_investment"]) * 100
-            else:
-                roi = (cumulative_profit / max(monthly_revenue, 1)) * 100
-            
-            projections.append(MonthlyProjection(
+        return project_batch(stack_inputs(processed_inputs), timeframes)
+    
+    def _build_monthly_projections(self, projections: ProjectionArrays) -> List[MonthlyProjection]:
+        """
+        Convert one request's projection arrays into response objects.
+        The values are plain Python numbers from ``tolist``, so validation is skipped.
+        """
+        return [
+            MonthlyProjection.model_construct(
                 month=month,
-                revenue=monthly_revenue,
-                expenses=total_expenses,
-                profit=monthly_profit,
+                revenue=revenue,
+                expenses=expenses,
+                profit=profit,
                 cumulative_profit=cumulative_profit,
                 roi=roi
-            ))
-        
-        return projections
+            )
+            for month, revenue, expenses, profit, cumulative_profit, roi in zip(
+                projections.month.tolist(),
+                projections.revenue.tolist(),
+                projections.expenses.tolist(),
+                projections.profit.tolist(),
+                projections.cumulative_profit.tolist(),
+                projections.roi.tolist()
+            )
+        ]
     
     def _calculate_roi_metrics(
         self, 
-        monthly_projections: List[MonthlyProjection], 
-        initial_investment: float
-    ) -> ROIMetrics:
-        """
-        Calculate comprehensive ROI metrics
-        """
-        total_revenue = sum(p.revenue for p in monthly_projections)
-        total_expenses = sum(p.expenses for p in monthly_projections)
-        net_profit = sum(p.profit for p in monthly_projections)
-        gross_profit = total_revenue - sum(p.expenses - (p.revenue - p.profit) for p in monthly_projections if p.revenue > 0)
-        
-        # ROI calculations
-        total_investment = initial_investment + total_expenses
-        if total_investment > 0:
-            roi_percentage = (net_profit / total_investment) * 100
-            roi_ratio = net_profit / total_investment
-        else:
-            roi_percentage = 0
-            roi_ratio = 0
-        
-        # Payback period calculation
-        payback_period = self._calculate_payback_period(monthly_projections, initial_investment)
-        
-        # IRR calculation
-        irr = self._calculate_irr(monthly_projections, initial_investment)
-        
-        # NPV calculation
-        npv = self._calculate_npv(monthly_projections, initial_investment)
-        
-        return ROIMetrics(
-            roi_percentage=roi_percentage,
-            roi_ratio=roi_ratio,
-            net_profit=net_profit,
-            gross_profit=gross_profit,
-            total_revenue=total_revenue,
-            total_expenses=total_expenses,
-            payback_period_months=payback_period,
-            irr=irr,
-            npv=npv
-        )
-    
-    def _calculate_payback_period(
-        self, 
-        monthly_projections: List[MonthlyProjection], 
-        initial_investment: float
-    ) -> Optional[float]:
+        projections: ProjectionArrays, 
+        investments: np.ndarray
+    ) -> Dict[str, np.ndarray]:
         """
-        Calculate payback period in months
+        Calculate comprehensive ROI metrics for every request in the batch
         """
-        if initial_investment <= 0:
-            return None
-        
-        cumulative_cash_flow = -initial_investment
-        
-        for i, projection in enumerate(monthly_projections):
-            cumulative_cash_flow += projection.profit
-            if cumulative_cash_flow >= 0:
-                # Interpolate to get exact payback period
-                if i == 0:
-                    return 1.0
-                
-                prev_cumulative = cumulative_cash_flow - projection.profit
-                fraction = -prev_cumulative / projection.profit
-                return i + fraction
-        
-        return None  # Payback not achieved within timeframe
+        metrics = calculate_batch_metrics(projections, investments, self.DISCOUNT_RATE)
+        irr = self._calculate_irr(projections, investments)
+        metrics["irr"] = irr.rates
+        metrics["irr_converged"] = irr.converged
+        return metrics
     
     def _calculate_irr(
         self, 
-        monthly_projections: List[MonthlyProjection], 
-        initial_investment: float
-    ) -> Optional[float]:
+        projections: ProjectionArrays, 
+        investments: np.ndarray
+    ) -> IRRResult:
         """
-        Calculate Internal Rate of Return using Newton-Raphson method
+        Solve the Internal Rate of Return for every invested request at once
         """
-        if initial_investment <= 0:
-            return None
-        
-        # Create cash flow array
-        cash_flows = [-initial_investment] + [p.profit for p in monthly_projections]
+        # Cash flows are zero-padded past each timeframe, which leaves NPV unchanged
+        cash_flows = np.concatenate((-investments[:, None], projections.profit), axis=1)
+        invested = investments > 0
         
-        # Use numpy to calculate IRR
-        try:
-            return float(np.irr(cash_flows)) * 12 * 100  # Convert to annual percentage
-        except:
-            # Fallback calculation using bisection method
-            return self._irr_bisection(cash_flows)
-    
-    def _irr_bisection(self, cash_flows: List[float], precision: float = 1e-6) -> Optional[float]:
-        """
-        Calculate IRR using bisection method as fallback
-        """
-        def npv_func(rate):
-            return sum(cf / (1 + rate) ** i for i, cf in enumerate(cash_flows))
-        
-        # Initial bounds
-        low, high = -0.99, 10.0
-        
-        # Bisection method
-        for _ in range(100):  # Max iterations
-            mid = (low + high) / 2
-            npv_mid = npv_func(mid)
-            
-            if abs(npv_mid) < precision:
-                return mid * 12 * 100  # Convert to annual percentage
-            
-            if npv_mid > 0:
-                low = mid
-            else:
-                high = mid
-        
-        return None
-    
-    def _calculate_npv(
-        self, 
-        monthly_projections: List[MonthlyProjection], 
-        initial_investment: float
-    ) -> float:
-        """
-        Calculate Net Present Value
-        """
-        monthly_discount_rate = self.DISCOUNT_RATE / 12
-        npv = -initial_investment
+        result = solve_irr(cash_flows[invested])
         
-        for i, projection in enumerate(monthly_projections):
-            npv += projection.profit / (1 + monthly_discount_rate) ** (i + 1)
+        rates = np.full(len(investments), np.nan)
+        converged = np.zeros(len(investments), dtype=bool)
+        bracketed = np.zeros(len(investments), dtype=bool)
+        rates[invested] = annualized_irr_percentage(result.rates)
+        converged[invested] = result.converged
+        bracketed[invested] = result.bracketed
         
-        return npv
+        return IRRResult(rates, converged, bracketed, result.iterations)
     
     def _calculate_taxes(
         self, 
-        monthly_projections: List[MonthlyProjection], 
-        country_data: Dict[str, Any], 
-        input_data: Dict[str, Any]
-    ) -> TaxCalculation:
+        projections: ProjectionArrays, 
+        plans: List[CalculationPlan], 
+        processed_inputs: List[Dict[str, Any]]
+    ) -> Dict[str, np.ndarray]:
         """
-        Calculate comprehensive tax implications
+        Calculate comprehensive tax implications for every request in the batch
         """
-        total_profit = sum(p.profit for p in monthly_projections if p.profit > 0)
-        total_revenue = sum(p.revenue for p in monthly_projections)
-        
-        tax_rates = country_data["tax_rates"]
-        
-        # Corporate tax
-        corporate_tax_rate = tax_rates["corporate_tax"]
-        corporate_tax = max(0, total_profit * corporate_tax_rate)
-        
-        # VAT/Sales tax
-        vat_rate = tax_rates.get("vat", 0)
-        vat_tax = total_revenue * vat_rate
-        
-        # Payroll tax (estimated on employee costs)
-        payroll_tax_rate = tax_rates.get("payroll_tax", 0)
-        payroll_tax = input_data["employee_costs"] * len(monthly_projections) * payroll_tax_rate
-        
-        # Total tax
-        total_tax = corporate_tax + vat_tax + payroll_tax
-        
-        # Effective tax rate
-        if total_profit > 0:
-            effective_tax_rate = (corporate_tax / total_profit) * 100
-        else:
-            effective_tax_rate = 0
-        
-        # After-tax profit
-        after_tax_profit = total_profit - corporate_tax
-        
-        return TaxCalculation(
-            corporate_tax=corporate_tax,
-            vat_tax=vat_tax,
-            payroll_tax=payroll_tax,
-            total_tax=total_tax,
-            effective_tax_rate=effective_tax_rate,
-            after_tax_profit=after_tax_profit
-        )
+        employee_costs = np.array([data["employee_costs"] for data in processed_inputs], dtype=float)
+        tax_rates = np.stack([plan.country.tax_rates for plan in plans])
+        return calculate_batch_taxes(projections, tax_rates, employee_costs)
     
-    def _generate_revenue_breakdown(
-        self, 
-        monthly_projections: List[MonthlyProjection], 
-        input_data: Dict[str, Any]
-    ) -> List[BreakdownItem]:
+    def _generate_revenue_breakdown(self, total_revenue: float) -> List[BreakdownItem]:
         """
         Generate detailed revenue breakdown
         """
-        total_revenue = sum(p.revenue for p in monthly_projections)
-        
         # For simplicity, assume all revenue comes from primary source
         # In a real scenario, this could include multiple revenue streams
         
@@ -413,273 +396,115 @@ class ROICalculator:
     
     def _generate_expense_breakdown(
         self, 
-        monthly_projections: List[MonthlyProjection], 
-        input_data: Dict[str, Any]
+        category_totals: np.ndarray, 
+        total_expenses: float
     ) -> List[BreakdownItem]:
         """
-        Generate detailed expense breakdown
+        Generate detailed expense breakdown from projected category totals
         """
-        total_expenses = sum(p.expenses for p in monthly_projections)
-        
         if total_expenses == 0:
             return []
         
-        # Estimate expense categories based on input data
-        total_marketing = input_data["marketing_spend"] * len(monthly_projections)
-        total_operating = input_data["operating_expenses"] * len(monthly_projections)
-        total_fulfillment = input_data["fulfillment_costs"] * len(monthly_projections)
-        total_processing = input_data["payment_processing_cost"] * len(monthly_projections)
-        total_employee = input_data["employee_costs"] * len(monthly_projections)
-        
-        # COGS estimation
-        total_cogs = sum(p.revenue * (1 - input_data["gross_margin"]) for p in monthly_projections)
-        
         breakdown = []
         
-        if total_cogs > 0:
-            breakdown.append(BreakdownItem(
-                category="Cost of Goods Sold",
-                amount=total_cogs,
-                percentage=(total_cogs / total_expenses) * 100,
-                description="Direct costs of producing goods/services"
-            ))
-        
-        if total_marketing > 0:
-            breakdown.append(BreakdownItem(
-                category="Marketing & Advertising",
-                amount=total_marketing,
-                percentage=(total_marketing / total_expenses) * 100,
-                description="Customer acquisition and marketing costs"
-            ))
-        
-        if total_operating > 0:
-            breakdown.append(BreakdownItem(
-                category="Operating Expenses",
-                amount=total_operating,
-                percentage=(total_operating / total_expenses) * 100,
-                description="General business operating costs"
-            ))
-        
-        if total_fulfillment > 0:
-            breakdown.append(BreakdownItem(
-                category="Fulfillment & Shipping",
-                amount=total_fulfillment,
-                percentage=(total_fulfillment / total_expenses) * 100,
-                description="Order fulfillment and shipping costs"
-            ))
-        
-        if total_processing > 0:
-            breakdown.append(BreakdownItem(
-                category="Payment Processing",
-                amount=total_processing,
-                percentage=(total_processing / total_expenses) * 100,
-                description="Credit card and payment processing fees"
-            ))
-        
-        if total_employee > 0:
-            breakdown.append(BreakdownItem(
-                category="Employee Costs",
-                amount=total_employee,
-                percentage=(total_employee / total_expenses) * 100,
-                description="Salary, benefits, and payroll taxes"
-            ))
+        for (category, _, description), amount in zip(EXPENSE_CATEGORIES, category_totals.tolist()):
+            if amount > 0:
+                breakdown.append(BreakdownItem(
+                    category=category,
+                    amount=amount,
+                    percentage=(amount / total_expenses) * 100,
+                    description=description
+                ))
         
         return breakdown
     
-    def _generate_insights(
-        self, 
-        roi_metrics: ROIMetrics, 
-        input_data: Dict[str, Any], 
-        country_data: Dict[str, Any]
-    ) -> List[str]:
-        """
-        Generate AI-powered insights based on calculation results
-        """
-        insights = []
-        
-        # ROI insights
-        if roi_metrics.roi_percentage > 100:
-            insights.append(f"Excellent ROI of {roi_metrics.roi_percentage:.1f}% indicates a highly profitable investment.")
-        elif roi_metrics.roi_percentage > 50:
-            insights.append(f"Strong ROI of {roi_metrics.roi_percentage:.1f}% shows good investment potential.")
-        elif roi_metrics.roi_percentage > 20:
-            insights.append(f"Moderate ROI of {roi_metrics.roi_percentage:.1f}% suggests acceptable returns.")
-        else:
-            insights.append(f"Low ROI of {roi_metrics.roi_percentage:.1f}% may indicate room for optimization.")
-        
-        # Payback period insights
-        if roi_metrics.payback_period_months:
-            if roi_metrics.payback_period_months < 6:
-                insights.append(f"Fast payback period of {roi_metrics.payback_period_months:.1f} months indicates quick capital recovery.")
-            elif roi_metrics.payback_period_months < 12:
-                insights.append(f"Reasonable payback period of {roi_metrics.payback_period_months:.1f} months.")
-            else:
-                insights.append(f"Extended payback period of {roi_metrics.payback_period_months:.1f} months requires patience.")
-        
-        # Margin insights
-        if input_data["gross_margin"] > 0.7:
-            insights.append("High gross margin suggests strong pricing power and efficient operations.")
-        elif input_data["gross_margin"] < 0.3:
-            insights.append("Low gross margin indicates potential for cost optimization or pricing adjustments.")
-        
-        # Growth insights
-        if input_data["growth_rate"] > 0.1:
-            insights.append("High growth rate projections amplify long-term returns significantly.")
-        elif input_data["growth_rate"] < 0:
-            insights.append("Negative growth projections pose risks to long-term profitability.")
-        
-        # Country-specific insights
-        country_name = country_data["name"]
-        corporate_tax_rate = country_data["tax_rates"]["corporate_tax"] * 100
-        insights.append(f"Operating in {country_name} with {corporate_tax_rate:.1f}% corporate tax rate affects after-tax returns.")
-        
-        return insights
-    
-    def _generate_recommendations(
-        self, 
-        roi_metrics: ROIMetrics, 
-        input_data: Dict[str, Any], 
-        scenario_data: Dict[str, Any]
-    ) -> List[str]:
-        """
-        Generate actionable recommendations
-        """
-        recommendations = []
-        
-        # ROI-based recommendations
-        if roi_metrics.roi_percentage < 20:
-            recommendations.append("Consider reducing operating expenses or increasing revenue to improve ROI.")
-            recommendations.append("Evaluate pricing strategy to maximize profit margins.")
-        
-        # Margin recommendations
-        if input_data["gross_margin"] < 0.5:
-            recommendations.append("Focus on improving gross margins through cost reduction or premium pricing.")
-        
-        # Growth recommendations
-        if input_data["growth_rate"] < 0.05:
-            recommendations.append("Invest in marketing and product development to accelerate growth.")
-        
-        # CAC/CLV recommendations
-        if input_data["clv"] > 0 and input_data["cac"] > 0:
-            clv_cac_ratio = input_data["clv"] / input_data["cac"]
-            if clv_cac_ratio < 3:
-                recommendations.append("Improve customer lifetime value or reduce acquisition costs to achieve 3:1 CLV:CAC ratio.")
-            elif clv_cac_ratio > 5:
-                recommendations.append("Consider increasing marketing spend to accelerate growth with strong unit economics.")
-        
-        # Cash flow recommendations
-        if roi_metrics.payback_period_months and roi_metrics.payback_period_months > 18:
-            recommendations.append("Focus on faster customer acquisition and revenue recognition to improve cash flow.")
-        
-        # Business model recommendations
-        business_type = scenario_data.get("id", "")
-        if "subscription" in business_type.lower():
-            recommendations.append("Focus on reducing churn rate to maximize subscription value.")
-        elif "ecommerce" in business_type.lower():
-            recommendations.append("Optimize conversion rates and average order value for better unit economics.")
-        
-        return recommendations
-    
-    def _identify_risk_factors(
-        self, 
-        input_data: Dict[str, Any], 
-        country_data: Dict[str, Any]
-    ) -> List[str]:
-        """
-        Identify potential risk factors
-        """
-        risk_factors = []
-        
-        # Financial risks
-        if input_data["initial_investment"] > input_data["monthly_revenue"] * 24:
-            risk_factors.append("High initial investment relative to revenue creates capital intensity risk.")
-        
-        if input_data["gross_margin"] < 0.3:
-            risk_factors.append("Low gross margins provide little buffer for cost increases.")
-        
-        # Market risks
-        if input_data["growth_rate"] > 0.2:
-            risk_factors.append("Aggressive growth assumptions may not materialize in competitive markets.")
-        
-        # Customer risks
-        if input_data["churn_rate"] > 0.1:
-            risk_factors.append("High churn rate poses risk to customer retention and CLV calculations.")
-        
-        # Economic risks
-        inflation_rate = country_data["economic_indicators"]["inflation_2025"]
-        if inflation_rate > 0.05:
-            risk_factors.append(f"High inflation rate of {inflation_rate*100:.1f}% may increase operational costs.")
-        
-        # Currency risks
-        currency_code = country_data["currency"]["code"]
-        if currency_code not in ["USD", "EUR", "GBP"]:
-            risk_factors.append("Currency volatility may affect international business operations.")
-        
-        return risk_factors
+    def _generate_messages(
+        self,
+        metrics: Dict[str, np.ndarray],
+        processed_inputs: List[Dict[str, Any]],
+        plans: List[CalculationPlan]
+    ) -> List[Dict[str, List[str]]]:
+        """
+        Evaluate the insight rule table across the batch
+        """
+        columns = {
+            "roi_percentage": metrics["roi_percentage"],
+            "payback_period_months": metrics["payback_period_months"],
+            **{name: np.array([data[name] for data in processed_inputs], dtype=float) for name in RULE_INPUTS}
+        }
+        return self.insight_engine.messages(columns, plans)
     
-    def _get_industry_benchmarks(self, business_type: str, scenario: str) -> Optional[Dict[str, float]]:
+    def _get_industry_benchmarks(self, plan: CalculationPlan) -> Optional[Dict[str, float]]:
         """
         Get industry benchmarks for comparison
         """
-        # Static benchmarks - in production, this would come from a database
-        benchmarks = {
-            "saas": {
-                "average_roi": 150.0,
-                "average_gross_margin": 0.80,
-                "average_churn_rate": 0.05,
-                "average_cac_payback": 12.0
-            },
-            "ecommerce": {
-                "average_roi": 80.0,
-                "average_gross_margin": 0.45,
-                "average_conversion_rate": 0.025,
-                "average_aov": 75.0
-            },
-            "startup": {
-                "average_roi": 200.0,
-                "average_gross_margin": 0.70,
-                "average_burn_rate": 50000.0,
-                "average_growth_rate": 0.15
-            }
-        }
-        
-        return benchmarks.get(business_type)
+        benchmarks = plan.scenario.benchmarks
+        # Responses may be cached and mutated downstream, so hand out a copy
+        return dict(benchmarks) if benchmarks is not None else None
+    
+    def _convert_currency(
+        self,
+        plans: List[CalculationPlan],
+        projections: ProjectionArrays,
+        metrics: Dict[str, np.ndarray],
+        taxes: Dict[str, np.ndarray],
+        category_totals: np.ndarray
+    ) -> Tuple[ProjectionArrays, Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]:
+        """
+        Convert the batch's monetary arrays into each plan's report currency
+        """
+        if all(plan.conversion is None for plan in plans):
+            return projections, metrics, taxes, category_totals
+        
+        rates = np.array([plan.conversion.rate if plan.conversion else 1.0 for plan in plans])
+        metrics = {**metrics, **{name: metrics[name] * rates for name in MONETARY_METRICS}}
+        taxes = {**taxes, **{name: taxes[name] * rates for name in MONETARY_TAXES}}
+        return projections.scaled(rates), metrics, taxes, category_totals * rates[:, None]
     
     def _format_currency_values(
         self, 
-        roi_metrics: ROIMetrics, 
-        tax_calculation: TaxCalculation, 
-        currency_code: str
-    ) -> Dict[str, str]:
-        """
-        Format currency values for display
-        """
-        from utils.currency_utils import CurrencyUtils
-        
-        currency_utils = CurrencyUtils()
-        
-        return {
-            "net_profit": currency_utils.format_currency(roi_metrics.net_profit, currency_code),
-            "total_revenue": currency_utils.format_currency(roi_metrics.total_revenue, currency_code),
-            "total_expenses": currency_utils.format_currency(roi_metrics.total_expenses, currency_code),
-            "corporate_tax": currency_utils.format_currency(tax_calculation.corporate_tax, currency_code),
-            "after_tax_profit": currency_utils.format_currency(tax_calculation.after_tax_profit, currency_code),
-            "npv": currency_utils.format_currency(roi_metrics.npv or 0, currency_code),
-        }
+        metrics: Dict[str, np.ndarray], 
+        taxes: Dict[str, np.ndarray], 
+        plans: List[CalculationPlan]
+    ) -> List[Dict[str, str]]:
+        """
+        Format currency values for display, in bulk per currency
+        """
+        values = np.stack([
+            metrics["net_profit"],
+            metrics["total_revenue"],
+            metrics["total_expenses"],
+            taxes["corporate_tax"],
+            taxes["after_tax_profit"],
+            np.nan_to_num(metrics["npv"], nan=0.0),
+        ], axis=1)
+        
+        # Rows sharing a currency are formatted in one call
+        rows_by_formatter: Dict[int, Tuple[Any, List[int]]] = {}
+        for i, plan in enumerate(plans):
+            formatter = plan.report_formatter
+            rows_by_formatter.setdefault(id(formatter), (formatter, []))[1].append(i)
+        
+        formatted: List[Dict[str, str]] = [{} for _ in plans]
+        width = len(FORMATTED_VALUES)
+        for formatter, rows in rows_by_formatter.values():
+            strings = formatter.format_many(values[rows])
+            for k, i in enumerate(rows):
+                formatted[i] = dict(zip(FORMATTED_VALUES, strings[k * width:(k + 1) * width]))
+        return formatted
     
     def _create_input_summary(
         self, 
         input_data: Dict[str, Any], 
-        country_data: Dict[str, Any], 
-        scenario_data: Dict[str, Any]
+        plan: CalculationPlan
     ) -> Dict[str, Any]:
         """
         Create summary of input parameters
         """
         return {
-            "country": country_data["name"],
-            "currency": country_data["currency"]["code"],
-            "business_type": scenario_data.get("name", "Unknown"),
+            "country": plan.country.name,
+            "currency": plan.currency_code,
+            "business_type": plan.scenario.name,
             "monthly_revenue": input_data["monthly_revenue"],
             "initial_investment": input_data["initial_investment"],
             "gross_margin": input_data["gross_margin"],
@@ -0,0 +1,115 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models.roi_models import (
+    ROICalculationRequest, SensitivityRequest, SensitivityResponse, SensitivityResult
+)
+from calculations.plans import DEFAULT_PAYMENT_PROCESSING_RATE, CalculationPlan
+from calculations.roi_calculator import ROICalculator, _optional
+
+# Metrics reported for each perturbation
+SENSITIVITY_METRICS = ("roi_percentage", "npv", "payback_period_months", "net_profit", "clv")
+
+# Perturbable inputs: the prepared input holding the base value and the
+# upper bound the perturbed value is clipped to
+SENSITIVITY_PARAMETERS = {
+    "monthly_revenue": ("monthly_revenue", None),
+    "operating_expenses": ("operating_expenses", None),
+    "marketing_spend": ("marketing_spend", None),
+    "gross_margin": ("gross_margin", 1.0),
+    "churn_rate": ("churn_rate", 1.0),
+    "growth_rate": ("growth_rate", None),
+    "payment_processing_rate": (None, None),
+    "employee_costs": ("employee_costs", None),
+}
+
+
+def _base_value(parameter: str, request: ROICalculationRequest, base_input: Dict[str, Any]) -> float:
+    input_key = SENSITIVITY_PARAMETERS[parameter][0]
+    if input_key is None:
+        return request.payment_processing_rate or DEFAULT_PAYMENT_PROCESSING_RATE
+    return float(base_input[input_key])
+
+
+class SensitivityAnalyzer:
+    """
+    Tornado-chart sensitivity of ROI metrics to each input, with every
+    perturbation evaluated in a single projection batch
+    """
+
+    def __init__(self, calculator: ROICalculator):
+        self.calculator = calculator
+
+    def run(
+        self,
+        sensitivity_request: SensitivityRequest,
+        plan: CalculationPlan
+    ) -> SensitivityResponse:
+        """
+        Perturb each input by ±``variation_percent`` and rank inputs by ROI swing
+        """
+        request = sensitivity_request.base_calculation
+        parameters = self._resolve_parameters(sensitivity_request.parameters)
+        fraction = sensitivity_request.variation_percent / 100
+
+        base_input = self.calculator._prepare_input_data(request, plan.scenario)
+        rows = [base_input]
+        values = []
+        for parameter in parameters:
+            base_value = _base_value(parameter, request, base_input)
+            upper = SENSITIVITY_PARAMETERS[parameter][1]
+            low_value = base_value * (1 - fraction)
+            high_value = base_value * (1 + fraction) if upper is None else min(base_value * (1 + fraction), upper)
+            values.append((base_value, low_value, high_value))
+            for value in (low_value, high_value):
+                rows.append(self.calculator._prepare_input_override(
+                    request, plan.scenario, parameter, value, base_input
+                ))
+
+        metrics = self.calculator.calculate_metric_arrays(rows, [request.timeframe_months] * len(rows))
+        metrics["clv"] = np.array([row["clv"] for row in rows], dtype=float)
+        base_metrics = {name: _optional(metrics[name][0]) for name in SENSITIVITY_METRICS}
+
+        results = []
+        for i, (parameter, (base_value, low_value, high_value)) in enumerate(zip(parameters, values)):
+            low, high = 1 + 2 * i, 2 + 2 * i
+            results.append(SensitivityResult(
+                parameter=parameter,
+                base_value=base_value,
+                low_value=low_value,
+                high_value=high_value,
+                low_deltas=self._deltas(metrics, low),
+                high_deltas=self._deltas(metrics, high),
+                roi_swing=float(abs(metrics["roi_percentage"][high] - metrics["roi_percentage"][low]))
+            ))
+
+        results.sort(key=lambda result: result.roi_swing, reverse=True)
+
+        return SensitivityResponse(
+            variation_percent=sensitivity_request.variation_percent,
+            base_metrics=base_metrics,
+            results=results,
+            currency_code=plan.currency_code
+        )
+
+    def _resolve_parameters(self, parameters: Optional[Sequence[str]]) -> List[str]:
+        """
+        Validate the requested inputs, defaulting to all supported ones
+        """
+        if not parameters:
+            return list(SENSITIVITY_PARAMETERS)
+
+        unknown = [name for name in parameters if name not in SENSITIVITY_PARAMETERS]
+        if unknown:
+            raise ValueError(
+                f"Unsupported sensitivity parameters: {', '.join(unknown)}; "
+                f"supported: {', '.join(SENSITIVITY_PARAMETERS)}"
+            )
+        return list(dict.fromkeys(parameters))
+
+    def _deltas(self, metrics: Dict[str, np.ndarray], index: int) -> Dict[str, Optional[float]]:
+        """
+        Change of each metric against the base row
+        """
+        return {name: _optional(metrics[name][index] - metrics[name][0]) for name in SENSITIVITY_METRICS}
@@ -0,0 +1,103 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from models.roi_models import (
+    ROICalculationRequest, ROIResponse, WhatIfResponse, WhatIfResult, WhatIfVariation
+)
+from calculations.plans import CalculationPlan
+from calculations.roi_calculator import ROICalculator
+
+# Metrics compared against the base case for every variation
+COMPARED_METRICS = (
+    "roi_percentage", "net_profit", "total_revenue", "total_expenses",
+    "payback_period_months", "irr", "npv"
+)
+
+
+def apply_variation(base: ROICalculationRequest, variation: WhatIfVariation) -> ROICalculationRequest:
+    """
+    Build the request for a variation by overlaying its changes on the base case;
+    changes to fields the request doesn't have raise ValueError
+    """
+    unknown = sorted(set(variation.changes) - set(ROICalculationRequest.model_fields))
+    if unknown:
+        raise ValueError(f"Unknown field{'s' if len(unknown) > 1 else ''}: {', '.join(unknown)}")
+    return ROICalculationRequest(**{**base.dict(), **variation.changes})
+
+
+def compare_results(base: ROIResponse, result: ROIResponse) -> Dict[str, float]:
+    """
+    Absolute and percentage deltas of a variation's metrics against the base case
+    """
+    comparison = {}
+
+    for name in COMPARED_METRICS:
+        base_value = getattr(base.metrics, name)
+        value = getattr(result.metrics, name)
+        if base_value is None or value is None:
+            continue
+
+        delta = value - base_value
+        comparison[f"{name}_change"] = delta
+        if base_value != 0:
+            comparison[f"{name}_change_percent"] = (delta / abs(base_value)) * 100
+
+    comparison["after_tax_profit_change"] = (
+        result.tax_calculation.after_tax_profit - base.tax_calculation.after_tax_profit
+    )
+
+    return comparison
+
+
+def run_what_if(
+    calculator: ROICalculator,
+    base_request: ROICalculationRequest,
+    variation_requests: Sequence[ROICalculationRequest],
+    variations: Sequence[WhatIfVariation],
+    plans: Sequence[CalculationPlan]
+) -> WhatIfResponse:
+    """
+    Evaluate the base case and all variations in a single calculator batch.
+    ``plans`` holds the calculation plan for the base followed by each
+    variation, in order.
+    """
+    requests = [base_request, *variation_requests]
+    items = list(zip(requests, plans))
+
+    base_result, *variation_responses = calculator.calculate_batch(items)
+
+    variation_results = [
+        WhatIfResult(
+            variation=variation,
+            result=result,
+            comparison=compare_results(base_result, result)
+        )
+        for variation, result in zip(variations, variation_responses)
+    ]
+
+    return WhatIfResponse(
+        base_result=base_result,
+        variation_results=variation_results,
+        summary=summarize_variations(base_result, variation_results)
+    )
+
+
+def summarize_variations(base: ROIResponse, results: List[WhatIfResult]) -> Dict[str, Any]:
+    """
+    Summarize which variations improve on the base case
+    """
+    ranked = sorted(results, key=lambda r: r.result.metrics.roi_percentage, reverse=True)
+    best: Optional[WhatIfResult] = ranked[0] if ranked else None
+    worst: Optional[WhatIfResult] = ranked[-1] if ranked else None
+
+    return {
+        "variation_count": len(results),
+        "base_roi_percentage": base.metrics.roi_percentage,
+        "best_variation": best.variation.name if best else None,
+        "best_roi_percentage": best.result.metrics.roi_percentage if best else None,
+        "worst_variation": worst.variation.name if worst else None,
+        "worst_roi_percentage": worst.result.metrics.roi_percentage if worst else None,
+        "improving_variations": [
+            r.variation.name for r in ranked
+            if r.result.metrics.roi_percentage > base.metrics.roi_percentage
+        ],
+    }
@@ -1,27 +1,43 @@
 from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 import json
 import os
-import sqlite3
 import hashlib
 import logging
 from datetime import datetime, timedelta
 import uuid
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 # Import custom modules
 from models.roi_models import *
+from calculations.plans import CalculationPlan
 from calculations.roi_calculator import ROICalculator
-from services.pdf_service import PDFService
-from services.email_service import EmailService
+from calculations.what_if import apply_variation, run_what_if
+from calculations.monte_carlo import MonteCarloSimulator
+from calculations.sensitivity import SensitivityAnalyzer
+from calculations.goal_seek import GoalSeeker
 from services.analytics_service import AnalyticsService
+from services.analytics_queue import AnalyticsWriteQueue
+from services.email_queue import EmailDeliveryQueue, email_config_from_env, roi_report_message
+from services.database import Database
+from services.pdf_worker import PDFQueueFull, PDFReportRenderer, PDFRenderTimeout, PDFRendererUnavailable
+from services.jobs import FINISHED_STATUSES, JobContext, JobFile, JobManager, JobQueueFull, create_job_store
+from services.retention import RetentionManager, policies_from_env
+from services.reference_data import ReferenceDataRegistry
+from services.result_cache import canonical_request_key, create_result_cache
 from middleware.rate_limiting import RateLimitMiddleware
-from utils.currency_utils import CurrencyUtils
 from utils.validation_utils import ValidationUtils
+from utils.http_cache import cached_json_response
+from utils.response_encoding import (
+    STREAM_MEDIA_TYPES, encode_event, roi_batch_json_response, roi_json_response, roi_response_payload,
+    roi_stream, select_projection_format
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -50,88 +66,70 @@ app.add_middleware(RateLimitMiddleware)
 
 # Initialize services
 roi_calculator = ROICalculator()
-pdf_service = PDFService()
-email_service = EmailService()
-analytics_service = AnalyticsService()
-currency_utils = CurrencyUtils()
+pdf_renderer = PDFReportRenderer(
+    cache_dir=os.getenv("PDF_CACHE_DIR", "pdf_cache"),
+    max_workers=int(os.getenv("PDF_WORKERS", "2")),
+    max_pending=int(os.getenv("PDF_MAX_PENDING", "16")),
+    timeout=float(os.getenv("PDF_RENDER_TIMEOUT", "30")),
+    ttl_seconds=float(os.getenv("PDF_CACHE_TTL_SECONDS", "86400"))
+)
+database = Database(os.getenv("DATABASE_PATH", "amplifyroi.db"))
+analytics_service = AnalyticsService(database)
+retention_manager = RetentionManager(
+    database,
+    policies_from_env(os.environ),
+    interval=float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+)
+analytics_queue = AnalyticsWriteQueue(
+    database,
+    max_size=int(os.getenv("ANALYTICS_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("ANALYTICS_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "0.25"))
+)
+job_manager = JobManager(
+    create_job_store(os.getenv("JOB_STORE", "memory"), database),
+    max_concurrent=int(os.getenv("JOB_MAX_CONCURRENT", "4")),
+    max_queued=int(os.getenv("JOB_MAX_QUEUED", "100")),
+    result_ttl=float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+)
+email_queue = EmailDeliveryQueue(
+    database,
+    email_config_from_env(os.environ),
+    use_tls=os.getenv("SMTP_USE_TLS", "true").lower() == "true",
+    batch_size=int(os.getenv("EMAIL_BATCH_SIZE", "20")),
+    max_attempts=int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+)
 validation_utils = ValidationUtils()
+reference_data = ReferenceDataRegistry()
+monte_carlo_simulator = MonteCarloSimulator(roi_calculator)
+sensitivity_analyzer = SensitivityAnalyzer(roi_calculator)
+goal_seeker = GoalSeeker(roi_calculator)
+result_cache = create_result_cache(
+    url=os.getenv("RESULT_CACHE_URL"),
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2048")),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "900")),
+    enabled=os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+)
+
+# Process pool for parallel simulations, created on first use
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", os.cpu_count() or 1))
+simulation_executor: Optional[ProcessPoolExecutor] = None
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Batch items calculated between progress updates when run as a job
+BATCH_JOB_CHUNK_SIZE = 500
+
+# Batch items calculated per step of a streamed batch
+BATCH_STREAM_CHUNK_SIZE = 100
+
+# Headers that stop proxies from buffering streamed responses
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 # Security
 security = HTTPBearer()
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
 
-# Database initialization
-def init_database():
-    """Initialize SQLite database for analytics and email submissions"""
-    conn = sqlite3.connect("amplifyroi.db")
-    cursor = conn.cursor()
-    
-    # Analytics table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS analytics (
-            id TEXT PRIMARY KEY,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            country_code TEXT,
-            business_type TEXT,
-            scenario_id TEXT,
-            calculation_data TEXT,
-            session_id TEXT,
-            ip_address TEXT,
-            user_agent TEXT
-        )
-    """)
-    
-    # Email submissions table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS email_submissions (
-            id TEXT PRIMARY KEY,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            email TEXT,
-            name TEXT,
-            company TEXT,
-            calculation_id TEXT,
-            country_code TEXT,
-            business_type TEXT,
-            roi_result REAL,
-            gdpr_consent BOOLEAN,
-            ip_address TEXT
-        )
-    """)
-    
-    # PDF exports table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pdf_exports (
-            id TEXT PRIMARY KEY,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            calculation_id TEXT,
-            export_type TEXT,
-            file_size INTEGER,
-            session_id TEXT
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
-
-# Load data
-def load_business_scenarios():
-    """Load business scenarios from JSON file"""
-    try:
-        with open("data/business_scenarios.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.error("Business scenarios file not found")
-        return {"business_types": []}
-
-def load_countries():
-    """Load countries data from JSON file"""
-    try:
-        with open("data/countries.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.error("Countries file not found")
-        return {"countries": []}
-
 # Authentication
 async def verify_admin_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify admin authentication"""
@@ -150,29 +148,123 @@ def get_client_ip(request: Request) -> str:
         return forwarded.split(",")[0].strip()
     return request.client.host
 
-def log_analytics(request: Request, calculation_data: dict):
-    """Log calculation analytics"""
+def resolve_calculation_plan(calculation_request: ROICalculationRequest) -> CalculationPlan:
+    """Look up the compiled calculation plan for a calculation request"""
+    data = reference_data.snapshot()
+    
+    try:
+        plan = data.get_plan(
+            calculation_request.country, calculation_request.business_type, calculation_request.scenario,
+            calculation_request.report_currency
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Unsupported report currency")
+    if plan is None:
+        if not data.get_country(calculation_request.country):
+            raise HTTPException(status_code=400, detail="Invalid country code")
+        raise HTTPException(status_code=400, detail="Invalid business type or scenario")
+    
+    return plan
+
+def get_simulation_executor() -> ProcessPoolExecutor:
+    """Get the shared simulation process pool"""
+    global simulation_executor
+    if simulation_executor is None:
+        simulation_executor = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS)
+    return simulation_executor
+
+def submit_job(kind: str, work) -> JSONResponse:
+    """Run work as a background job and answer 202 with the job's status"""
     try:
-        analytics_service.log_calculation(
+        job = job_manager.submit(kind, work)
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Too many background jobs, please retry", headers={"Retry-After": "5"})
+    
+    status_payload = JobResponse(**job.model_dump(include=set(JobResponse.model_fields)))
+    return JSONResponse(
+        status_code=202,
+        content=status_payload.model_dump(mode="json"),
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
+def log_analytics(
+    request: Request,
+    calculation_data: dict,
+    roi_percentage: Optional[float] = None,
+    session_id: Optional[str] = None
+):
+    """Queue calculation analytics for the background writer"""
+    try:
+        analytics_queue.log_calculation(
             country_code=calculation_data.get("country"),
             business_type=calculation_data.get("business_type"),
             scenario_id=calculation_data.get("scenario"),
-            calculation_data=json.dumps(calculation_data),
-            session_id=request.headers.get("X-Session-ID", str(uuid.uuid4())),
+            calculation_data=calculation_data,
+            session_id=session_id or request.headers.get("X-Session-ID", str(uuid.uuid4())),
             ip_address=get_client_ip(request),
-            user_agent=request.headers.get("User-Agent", "")
+            user_agent=request.headers.get("User-Agent", ""),
+            roi_percentage=roi_percentage
         )
     except Exception as e:
         logger.error(f"Failed to log analytics: {str(e)}")
 
+def log_batch_analytics(
+    request: Request,
+    calculations: List[Tuple[ROICalculationRequest, ROIResponse]],
+    session_id: Optional[str] = None
+):
+    """Queue one calculation event per batch item, all under the request's session"""
+    session_id = session_id or request.headers.get("X-Session-ID", str(uuid.uuid4()))
+    for calculation_request, result in calculations:
+        log_analytics(request, calculation_request.dict(), result.metrics.roi_percentage, session_id)
+
+def calculate_batch_items(
+    items: List[Tuple[ROICalculationRequest, CalculationPlan]],
+    include_projections: bool = True
+) -> List[Tuple[Optional[ROIResponse], Optional[str]]]:
+    """Calculate items in one pass, falling back to one at a time so only failing items report an error"""
+    try:
+        return [(result, None) for result in roi_calculator.calculate_batch(items, include_projections)]
+    except Exception as e:
+        logger.warning(f"Batch calculation of {len(items)} items failed, retrying one at a time: {str(e)}")
+    
+    outcomes: List[Tuple[Optional[ROIResponse], Optional[str]]] = []
+    for item in items:
+        try:
+            outcomes.append((roi_calculator.calculate_batch([item], include_projections)[0], None))
+        except ValueError as e:
+            outcomes.append((None, str(e)))
+        except Exception as e:
+            logger.error(f"ROI calculation error: {str(e)}")
+            outcomes.append((None, "Internal server error"))
+    return outcomes
+
 # API Endpoints
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and services on startup"""
-    init_database()
+    database.migrate()
+    reference_data.load()
+    await analytics_queue.start()
+    await retention_manager.start()
+    await pdf_renderer.start()
+    await job_manager.start()
+    await email_queue.start()
     logger.info("AmplifyROI API started successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued analytics and release worker pools on shutdown"""
+    await email_queue.stop()
+    await job_manager.stop()
+    await pdf_renderer.stop()
+    await retention_manager.stop()
+    await analytics_queue.stop()
+    database.close()
+    if simulation_executor is not None:
+        simulation_executor.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -183,246 +275,744 @@ async def health_check():
     }
 
 @app.get("/api/business-types", response_model=List[BusinessTypeResponse])
-async def get_business_types():
+async def get_business_types(request: Request):
     """Get all business types and their scenarios"""
-    data = load_business_scenarios()
-    return data["business_types"]
+    payload = reference_data.snapshot().business_types_payload
+    return cached_json_response(payload, request.headers.get("If-None-Match"))
 
 @app.get("/api/business-types/{business_type_id}", response_model=BusinessTypeResponse)
-async def get_business_type(business_type_id: str):
+async def get_business_type(request: Request, business_type_id: str):
     """Get specific business type by ID"""
-    data = load_business_scenarios()
-    for business_type in data["business_types"]:
-        if business_type["id"] == business_type_id:
-            return business_type
+    payload = reference_data.snapshot().business_type_payloads_by_id.get(business_type_id)
+    if payload:
+        return cached_json_response(payload, request.headers.get("If-None-Match"))
     raise HTTPException(status_code=404, detail="Business type not found")
 
 @app.get("/api/countries", response_model=List[CountryResponse])
-async def get_countries():
+async def get_countries(request: Request):
     """Get all countries with tax data"""
-    data = load_countries()
-    return data["countries"]
+    payload = reference_data.snapshot().countries_payload
+    return cached_json_response(payload, request.headers.get("If-None-Match"))
 
 @app.get("/api/countries/{country_code}", response_model=CountryResponse)
-async def get_country(country_code: str):
+async def get_country(request: Request, country_code: str):
     """Get specific country by code"""
-    data = load_countries()
-    for country in data["countries"]:
-        if country["code"] == country_code:
-            return country
+    payload = reference_data.snapshot().country_payloads_by_code.get(country_code)
+    if payload:
+        return cached_json_response(payload, request.headers.get("If-None-Match"))
     raise HTTPException(status_code=404, detail="Country not found")
 
 @app.post("/api/calculate-roi", response_model=ROIResponse)
-async def calculate_roi(request: Request, calculation_request: ROICalculationRequest):
-    """Calculate ROI based on business metrics"""
+async def calculate_roi(
+    request: Request,
+    calculation_request: ROICalculationRequest,
+    projection_format: Optional[str] = None
+):
+    """Calculate ROI based on business metrics; projections as rows or columns"""
     try:
+        response_format = select_projection_format(projection_format, request.headers.get("Accept"))
+        
         # Validate input data
         validation_utils.validate_calculation_request(calculation_request)
         
-        # Get country and scenario data
-        countries_data = load_countries()
-        scenarios_data = load_business_scenarios()
-        
-        country = next((c for c in countries_data["countries"] if c["code"] == calculation_request.country), None)
-        if not country:
-            raise HTTPException(status_code=400, detail="Invalid country code")
+        # Get the compiled country and scenario plan
+        plan = resolve_calculation_plan(calculation_request)
         
-        # Find business type and scenario
-        business_type = None
-        scenario = None
-        for bt in scenarios_data["business_types"]:
-            if bt["id"] == calculation_request.business_type:
-                business_type = bt
-                for s in bt["scenarios"]:
-                    if s["id"] == calculation_request.scenario:
-                        scenario = s
-                        break
-                break
-        
-        if not business_type or not scenario:
-            raise HTTPException(status_code=400, detail="Invalid business type or scenario")
+        # Identical inputs against the same reference data give identical results
+        cache_key = canonical_request_key(calculation_request, reference_data.snapshot().version)
+        result = await result_cache.get_async(cache_key)
         
         # Perform ROI calculation
-        result = roi_calculator.calculate_comprehensive_roi(
-            calculation_request, country, scenario
-        )
+        if result is None:
+            result = roi_calculator.calculate_comprehensive_roi(calculation_request, plan)
+            await result_cache.set_async(cache_key, result)
         
         # Log analytics
-        log_analytics(request, calculation_request.dict())
+        log_analytics(request, calculation_request.dict(), result.metrics.roi_percentage)
         
-        return result
+        return roi_json_response(result, response_format)
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"ROI calculation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/api/export-pdf")
-async def export_pdf(request: Request, export_request: PDFExportRequest):
-    """Generate and return PDF report"""
+@app.post("/api/calculate-roi/stream")
+async def calculate_roi_stream(
+    request: Request,
+    calculation_request: ROICalculationRequest,
+    stream_format: str = "ndjson",
+    projection_format: Optional[str] = None,
+    chunk_months: int = 12
+):
+    """Stream an ROI calculation as NDJSON or SSE: summary first, then projection chunks"""
     try:
-        # Generate PDF
-        pdf_file = pdf_service.generate_roi_report(
-            export_request.calculation_data,
-            export_request.country_data,
-            export_request.business_data
+        if stream_format not in STREAM_MEDIA_TYPES:
+            raise ValueError(f"stream_format must be one of {', '.join(STREAM_MEDIA_TYPES)}")
+        if not 1 <= chunk_months <= 120:
+            raise ValueError("chunk_months must be between 1 and 120")
+        response_format = select_projection_format(projection_format, request.headers.get("Accept"))
+        
+        validation_utils.validate_calculation_request(calculation_request)
+        plan = resolve_calculation_plan(calculation_request)
+        
+        # Projection columns stay as arrays; months are encoded as the client reads them
+        summary, projections = await run_in_threadpool(
+            roi_calculator.calculate_streaming, calculation_request, plan
         )
         
-        # Log export
-        analytics_service.log_pdf_export(
-            calculation_id=export_request.calculation_id,
-            export_type="standard",
-            file_size=os.path.getsize(pdf_file),
-            session_id=request.headers.get("X-Session-ID", str(uuid.uuid4()))
+        # Log analytics
+        log_analytics(request, calculation_request.dict(), summary.metrics.roi_percentage)
+        
+        return StreamingResponse(
+            roi_stream(summary, projections, stream_format, response_format, chunk_months),
+            media_type=STREAM_MEDIA_TYPES[stream_format],
+            headers=STREAM_HEADERS
         )
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"ROI stream error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/api/calculate-roi/batch", response_model=ROIBatchResponse)
+async def calculate_roi_batch(
+    request: Request,
+    batch_request: ROIBatchRequest,
+    background: bool = False,
+    projection_format: Optional[str] = None
+):
+    """Calculate ROI for many requests in one vectorized pass, optionally as a background job"""
+    try:
+        response_format = select_projection_format(projection_format, request.headers.get("Accept"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    results: List[Optional[ROIBatchItem]] = [None] * len(batch_request.requests)
+    calculation_requests: List[Optional[ROICalculationRequest]] = [None] * len(batch_request.requests)
+    resolved = []
+    items = []
+    positions = []
+    cache_keys = []
+    data_version = reference_data.snapshot().version
+    
+    # Validate and resolve each item on its own so one bad entry doesn't fail the batch
+    for index, payload in enumerate(batch_request.requests):
+        try:
+            calculation_request = ROICalculationRequest(**{"report_currency": batch_request.report_currency, **payload})
+            validation_utils.validate_calculation_request(calculation_request)
+            plan = resolve_calculation_plan(calculation_request)
+        except HTTPException as e:
+            results[index] = ROIBatchItem(index=index, success=False, error=e.detail)
+            continue
+        except ValueError as e:
+            results[index] = ROIBatchItem(index=index, success=False, error=str(e))
+            continue
+        
+        calculation_requests[index] = calculation_request
+        cache_key = canonical_request_key(calculation_request, data_version, batch_request.include_projections)
+        resolved.append((index, calculation_request, plan, cache_key))
+    
+    # One cache round trip for the whole batch; only the misses are calculated
+    cached_results = await result_cache.get_many_async([cache_key for _, _, _, cache_key in resolved])
+    for (index, calculation_request, plan, cache_key), cached in zip(resolved, cached_results):
+        if cached is not None:
+            results[index] = ROIBatchItem(index=index, success=True, result=cached)
+            continue
+        
+        items.append((calculation_request, plan))
+        positions.append(index)
+        cache_keys.append(cache_key)
+    
+    async def compute(job: Optional[JobContext] = None) -> ROIBatchResponse:
+        # Jobs calculate in chunks so they can report progress
+        chunk_size = BATCH_JOB_CHUNK_SIZE if job is not None else max(len(items), 1)
+        for start in range(0, len(items), chunk_size):
+            end = start + chunk_size
+            computed = await run_in_threadpool(
+                calculate_batch_items, items[start:end], batch_request.include_projections
+            )
+            await result_cache.set_many_async([
+                (cache_key, result) for cache_key, (result, _) in zip(cache_keys[start:end], computed)
+                if result is not None
+            ])
+            for index, (result, error) in zip(positions[start:end], computed):
+                results[index] = ROIBatchItem(index=index, success=result is not None, result=result, error=error)
+            if job is not None:
+                job.progress(min(end, len(items)) / len(items), f"Calculated {min(end, len(items))} of {len(items)}")
+        
+        # Log analytics: each item counts as its own calculation
+        log_batch_analytics(request, [
+            (calculation_request, item.result)
+            for calculation_request, item in zip(calculation_requests, results)
+            if item.success
+        ])
+        
+        succeeded = sum(item.success for item in results)
+        return ROIBatchResponse(
+            results=results,
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded
+        )
+    
+    if background:
+        return submit_job("roi_batch", compute)
+    
+    try:
+        response = await compute()
+    except Exception as e:
+        logger.error(f"Batch ROI calculation error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    return roi_batch_json_response(response, response_format)
+
+@app.post("/api/calculate-roi/batch/stream")
+async def calculate_roi_batch_stream(
+    request: Request,
+    batch_request: ROIBatchRequest,
+    stream_format: str = "ndjson",
+    projection_format: Optional[str] = None
+):
+    """Stream batch results as NDJSON or SSE, one event per item in request order"""
+    try:
+        if stream_format not in STREAM_MEDIA_TYPES:
+            raise ValueError(f"stream_format must be one of {', '.join(STREAM_MEDIA_TYPES)}")
+        response_format = select_projection_format(projection_format, request.headers.get("Accept"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    data_version = reference_data.snapshot().version
+    
+    def resolve(payload: Dict[str, Any]):
+        calculation_request = ROICalculationRequest(**{"report_currency": batch_request.report_currency, **payload})
+        validation_utils.validate_calculation_request(calculation_request)
+        return calculation_request, resolve_calculation_plan(calculation_request)
+    
+    def events():
+        try:
+            yield from batch_events()
+        except Exception as e:
+            # The status line has already been sent, so report the failure in-stream
+            logger.error(f"Batch ROI stream error: {str(e)}")
+            yield encode_event("error", {"detail": "Internal server error"}, stream_format)
+    
+    def batch_events():
+        succeeded = 0
+        session_id = request.headers.get("X-Session-ID", str(uuid.uuid4()))
+        # Validate and calculate a chunk at a time so memory stays flat for large batches
+        for start in range(0, len(batch_request.requests), BATCH_STREAM_CHUNK_SIZE):
+            chunk = batch_request.requests[start:start + BATCH_STREAM_CHUNK_SIZE]
+            outcomes: List[Dict[str, Any]] = []
+            calculated = []
+            pending = []
+            for index, payload in enumerate(chunk, start):
+                try:
+                    item = resolve(payload)
+                except HTTPException as e:
+                    outcomes.append({"index": index, "success": False, "result": None, "error": e.detail})
+                    continue
+                except ValueError as e:
+                    outcomes.append({"index": index, "success": False, "result": None, "error": str(e)})
+                    continue
+                
+                cache_key = canonical_request_key(item[0], data_version, batch_request.include_projections)
+                outcome = {"index": index, "success": True, "result": result_cache.get(cache_key), "error": None}
+                outcomes.append(outcome)
+                calculated.append((item[0], outcome))
+                if outcome["result"] is None:
+                    pending.append((outcome, cache_key, item))
+            
+            if pending:
+                computed = calculate_batch_items(
+                    [item for _, _, item in pending], batch_request.include_projections
+                )
+                for (outcome, cache_key, _), (result, error) in zip(pending, computed):
+                    if result is None:
+                        outcome.update(success=False, error=error)
+                        continue
+                    result_cache.set(cache_key, result)
+                    outcome["result"] = result
+            
+            # Log analytics: each item counts as its own calculation
+            log_batch_analytics(request, [
+                (calculation_request, outcome["result"])
+                for calculation_request, outcome in calculated
+                if outcome["success"]
+            ], session_id)
+            
+            for outcome in outcomes:
+                if outcome["success"]:
+                    succeeded += 1
+                    outcome["result"] = roi_response_payload(outcome["result"], response_format)
+                yield encode_event("result", outcome, stream_format)
+        
+        total = len(batch_request.requests)
+        yield encode_event("end", {"total": total, "succeeded": succeeded, "failed": total - succeeded}, stream_format)
+    
+    return StreamingResponse(events(), media_type=STREAM_MEDIA_TYPES[stream_format], headers=STREAM_HEADERS)
+
+async def render_pdf_export(export_request: PDFExportRequest, session_id: str) -> Tuple[Path, bool]:
+    """Render a report in the worker pool, or reuse an identical cached one, and log the export"""
+    pdf_file, cached = await pdf_renderer.get_report(export_request.dict())
+    
+    analytics_queue.log_pdf_export(
+        calculation_id=export_request.calculation_id,
+        export_type=export_request.export_format,
+        file_size=os.path.getsize(pdf_file),
+        session_id=session_id
+    )
+    return pdf_file, cached
+
+@app.post("/api/export-pdf")
+async def export_pdf(request: Request, export_request: PDFExportRequest, background: bool = False):
+    """Generate and return PDF report, optionally as a background job"""
+    session_id = request.headers.get("X-Session-ID", str(uuid.uuid4()))
+    filename = f"amplifyroi-report-{datetime.now().strftime('%Y%m%d')}.pdf"
+    
+    if background:
+        if not pdf_renderer.available:
+            raise HTTPException(status_code=503, detail="PDF export is not available on this server")
+        
+        async def render(job: JobContext) -> JobFile:
+            pdf_file, _ = await render_pdf_export(export_request, session_id)
+            return JobFile(pdf_file, "application/pdf", filename)
+        
+        return submit_job("pdf_export", render)
+    
+    try:
+        pdf_file, cached = await render_pdf_export(export_request, session_id)
+        
         return FileResponse(
             pdf_file,
             media_type="application/pdf",
-            filename=f"amplifyroi-report-{datetime.now().strftime('%Y%m%d')}.pdf"
+            filename=filename,
+            headers={"X-Report-Cache": "hit" if cached else "miss"}
         )
         
+    except PDFRendererUnavailable:
+        raise HTTPException(status_code=503, detail="PDF export is not available on this server")
+    except PDFQueueFull:
+        raise HTTPException(status_code=503, detail="PDF service busy, please retry", headers={"Retry-After": "5"})
+    except PDFRenderTimeout:
+        raise HTTPException(status_code=504, detail="PDF generation timed out, please retry")
     except Exception as e:
         logger.error(f"PDF export error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate PDF")
 
 @app.post("/api/send-email")
 async def send_email(request: Request, email_request: EmailRequest):
-    """Send ROI report via email"""
+    """Queue an ROI report email and return its delivery id"""
     try:
         # Validate GDPR consent
         if not email_request.gdpr_consent:
             raise HTTPException(status_code=400, detail="GDPR consent required")
+        if not email_queue.enabled:
+            raise HTTPException(status_code=503, detail="Email delivery is not configured")
         
-        # Send email
-        success = email_service.send_roi_report(
-            email_request.email,
+        # Delivered in the background with retries
+        subject, body = roi_report_message(
+            email_request.name,
             email_request.calculation_data,
             email_request.additional_data
         )
+        delivery_id = await email_queue.enqueue(email_request.email, subject, body)
         
-        if success:
-            # Log email submission
-            analytics_service.log_email_submission(
-                email=email_request.email,
-                name=email_request.name,
-                company=email_request.company,
-                calculation_id=email_request.calculation_id,
-                country_code=email_request.calculation_data.get("country"),
-                business_type=email_request.calculation_data.get("business_type"),
-                roi_result=email_request.calculation_data.get("roi", 0),
-                gdpr_consent=email_request.gdpr_consent,
-                ip_address=get_client_ip(request)
-            )
-            
-            return {"success": True, "message": "Email sent successfully"}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to send email")
-            
+        # Log email submission
+        analytics_queue.log_email_submission(
+            email=email_request.email,
+            name=email_request.name,
+            company=email_request.company,
+            calculation_id=email_request.calculation_id,
+            country_code=email_request.calculation_data.get("country"),
+            business_type=email_request.calculation_data.get("business_type"),
+            roi_result=email_request.calculation_data.get("roi", 0),
+            gdpr_consent=email_request.gdpr_consent,
+            ip_address=get_client_ip(request)
+        )
+        
+        return {"success": True, "message": "Email queued for delivery", "delivery_id": delivery_id}
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Email sending error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to send email")
 
+@app.get("/api/email/deliveries/{delivery_id}")
+async def get_email_delivery(delivery_id: str):
+    """Get the delivery status of a queued email"""
+    delivery = await run_in_threadpool(email_queue.get_delivery, delivery_id)
+    if delivery is None:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return delivery
+
 @app.get("/api/currency/format")
-async def format_currency(amount: float, currency_code: str):
+async def format_currency(amount: float, currency_code: str, locale: Optional[str] = None):
     """Format currency amount according to locale"""
     try:
-        formatted = currency_utils.format_currency(amount, currency_code)
-        return {"formatted": formatted, "currency": currency_code}
-    except Exception as e:
+        formatter = reference_data.snapshot().currency_formatters.get(currency_code, locale)
+        return {"formatted": formatter.format(amount), "currency": formatter.currency_code, "locale": formatter.locale}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Currency formatting error: {str(e)}")
+
+@app.get("/api/currency/rates")
+async def get_fx_rates():
+    """Get the FX rate table used for report currencies"""
+    return reference_data.snapshot().fx_rates.to_dict()
+
+@app.post("/api/currency/format", response_model=CurrencyFormatResponse)
+async def format_currency_bulk(format_request: CurrencyFormatRequest):
+    """Format a list of amounts in one currency and locale"""
+    try:
+        formatter = reference_data.snapshot().currency_formatters.get(
+            format_request.currency_code, format_request.locale
+        )
+        return CurrencyFormatResponse(
+            formatted=formatter.format_many(format_request.amounts),
+            currency=formatter.currency_code,
+            locale=formatter.locale
+        )
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Currency formatting error: {str(e)}")
 
 @app.get("/api/admin/analytics", dependencies=[Depends(verify_admin_token)])
 async def get_analytics():
     """Get usage analytics (admin only)"""
     try:
-        analytics_data = analytics_service.get_analytics_summary()
+        analytics_data = await run_in_threadpool(analytics_service.get_analytics_summary)
         return analytics_data
     except Exception as e:
         logger.error(f"Analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve analytics")
 
-@app.get("/api/admin/submissions", dependencies=[Depends(verify_admin_token)])
-async def get_email_submissions():
-    """Get email submissions (admin only)"""
+@app.get("/api/admin/analytics/timeseries", dependencies=[Depends(verify_admin_token)])
+async def get_analytics_timeseries(period: str = "day", limit: int = 30):
+    """Get hourly or daily usage rollups (admin only)"""
     try:
-        submissions = analytics_service.get_email_submissions()
-        return {"submissions": submissions}
-    except Exception as e:
-        logger.error(f"Submissions error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve submissions")
+        return {"period": period, "buckets": await run_in_threadpool(analytics_service.get_timeseries, period, limit)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/api/admin/exports", dependencies=[Depends(verify_admin_token)])
-async def get_pdf_exports():
-    """Get PDF export statistics (admin only)"""
+@app.get("/api/admin/analytics/queue", dependencies=[Depends(verify_admin_token)])
+async def get_analytics_queue_stats():
+    """Get analytics write queue statistics (admin only)"""
+    return analytics_queue.stats()
+
+async def admin_listing(
+    table: str,
+    key: str,
+    export_format: str,
+    limit: int,
+    cursor: Optional[str],
+    filters: Dict[str, Any]
+):
+    """Serve an admin listing as a JSON page or a streamed NDJSON/CSV export"""
     try:
-        exports = analytics_service.get_pdf_exports()
-        return {"exports": exports}
+        if export_format == "json":
+            rows, next_cursor = await run_in_threadpool(analytics_service.list_rows, table, limit, cursor, **filters)
+            return {key: rows, "next_cursor": next_cursor, "limit": limit}
+        
+        stream = analytics_service.stream_rows(table, export_format, **filters)
+        return StreamingResponse(
+            stream,
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": f'attachment; filename="{key}-{datetime.now().strftime("%Y%m%d")}.{export_format}"'
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Exports error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve exports")
+        logger.error(f"Admin listing error ({table}): {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve {key}")
+
+@app.get("/api/admin/submissions", dependencies=[Depends(verify_admin_token)])
+async def get_email_submissions(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    country_code: Optional[str] = None,
+    business_type: Optional[str] = None,
+    format: str = "json"
+):
+    """Get email submissions, newest first, paginated by cursor or streamed as NDJSON/CSV (admin only)"""
+    filters = {"start": start, "end": end, "country_code": country_code, "business_type": business_type}
+    return await admin_listing("email_submissions", "submissions", format, limit, cursor, filters)
+
+@app.get("/api/admin/exports", dependencies=[Depends(verify_admin_token)])
+async def get_pdf_exports(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    export_type: Optional[str] = None,
+    format: str = "json"
+):
+    """Get PDF exports, newest first, paginated by cursor or streamed as NDJSON/CSV (admin only)"""
+    filters = {"start": start, "end": end, "export_type": export_type}
+    return await admin_listing("pdf_exports", "exports", format, limit, cursor, filters)
 
 @app.post("/api/admin/clear-data", dependencies=[Depends(verify_admin_token)])
 async def clear_analytics_data(data_type: str):
-    """Clear analytics data (admin only)"""
+    """Clear analytics data in small batches (admin only)"""
     try:
-        if data_type not in ["analytics", "submissions", "exports", "all"]:
-            raise HTTPException(status_code=400, detail="Invalid data type")
-        
-        result = analytics_service.clear_data(data_type)
+        result = await retention_manager.clear(data_type)
         return {"success": True, "message": f"Cleared {result} records"}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid data type")
     except Exception as e:
         logger.error(f"Clear data error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to clear data")
 
-@app.get("/api/scenarios/search")
-async def search_scenarios(query: str, category: Optional[str] = None):
-    """Search business scenarios"""
+@app.post("/api/admin/submissions/erase", dependencies=[Depends(verify_admin_token)])
+async def erase_email_submissions(email: str):
+    """Delete every submission for an email address, e.g. for a GDPR erasure request (admin only)"""
     try:
-        data = load_business_scenarios()
-        results = []
-        
-        for business_type in data["business_types"]:
-            if category and business_type.get("category") != category:
-                continue
-                
-            for scenario in business_type["scenarios"]:
-                if (query.lower() in scenario["name"].lower() or 
-                    query.lower() in scenario["description"].lower() or
-                    query.lower() in business_type["name"].lower()):
-                    results.append({
-                        "business_type": business_type,
-                        "scenario": scenario
-                    })
-        
-        return {"results": results, "total": len(results)}
+        result = await retention_manager.forget_email(email)
+        return {"success": True, "message": f"Erased {result} submissions"}
+    except Exception as e:
+        logger.error(f"Erase submissions error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to erase submissions")
+
+@app.get("/api/admin/retention", dependencies=[Depends(verify_admin_token)])
+async def get_retention_status():
+    """Get retention policies and recent purge progress (admin only)"""
+    return retention_manager.stats()
+
+@app.get("/api/admin/pdf", dependencies=[Depends(verify_admin_token)])
+async def get_pdf_renderer_stats():
+    """Get PDF render queue and report cache statistics (admin only)"""
+    return pdf_renderer.stats()
+
+@app.get("/api/admin/jobs", dependencies=[Depends(verify_admin_token)])
+async def get_job_stats():
+    """Get background job statistics (admin only)"""
+    return await job_manager.stats()
+
+@app.get("/api/admin/currency", dependencies=[Depends(verify_admin_token)])
+async def get_currency_formatter_stats():
+    """Get currency formatter cache statistics (admin only)"""
+    return reference_data.snapshot().currency_formatters.stats()
+
+@app.get("/api/admin/email", dependencies=[Depends(verify_admin_token)])
+async def get_email_queue_stats():
+    """Get outbound email queue statistics (admin only)"""
+    return await run_in_threadpool(email_queue.stats)
+
+@app.get("/api/admin/email/dead-letters", dependencies=[Depends(verify_admin_token)])
+async def get_email_dead_letters(limit: int = 100):
+    """Get emails that could not be delivered (admin only)"""
+    return await run_in_threadpool(email_queue.dead_letters, min(max(limit, 1), 1000))
+
+@app.post("/api/admin/email/dead-letters/{delivery_id}/retry", dependencies=[Depends(verify_admin_token)])
+async def retry_email_dead_letter(delivery_id: str):
+    """Requeue an undelivered email (admin only)"""
+    if not await run_in_threadpool(email_queue.requeue, delivery_id):
+        raise HTTPException(status_code=404, detail="Dead-lettered delivery not found")
+    return {"success": True, "message": "Email requeued"}
+
+@app.get("/api/admin/cache", dependencies=[Depends(verify_admin_token)])
+async def get_cache_stats():
+    """Get calculation result cache statistics (admin only)"""
+    return result_cache.stats()
+
+@app.post("/api/admin/cache/clear", dependencies=[Depends(verify_admin_token)])
+async def clear_result_cache():
+    """Clear cached calculation results (admin only)"""
+    try:
+        cleared = await run_in_threadpool(result_cache.clear)
+        return {"success": True, "message": f"Cleared {cleared} cached results"}
+    except Exception as e:
+        logger.error(f"Clear cache error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to clear cache")
+
+@app.get("/api/scenarios/search", response_model=SearchResponse)
+async def search_scenarios(
+    query: str,
+    category: Optional[str] = None,
+    business_type: Optional[str] = None,
+    limit: int = 20
+):
+    """Search business scenarios, ranked by relevance"""
+    try:
+        return reference_data.snapshot().search_index.search(
+            query, category=category, business_type=business_type, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Search error: {str(e)}")
         raise HTTPException(status_code=500, detail="Search failed")
 
-@app.get("/api/what-if")
-async def what_if_analysis(request: Request, base_calculation: dict, variations: List[dict]):
-    """Perform what-if analysis with multiple scenarios"""
+@app.post("/api/what-if", response_model=WhatIfResponse)
+async def what_if_analysis(request: Request, what_if_request: WhatIfRequest, background: bool = False):
+    """Perform what-if analysis with multiple scenarios, optionally as a background job"""
     try:
-        results = []
-        for variation in variations:
-            # Merge base calculation with variation
-            modified_calc = {**base_calculation, **variation}
+        base_request = what_if_request.base_calculation
+        validation_utils.validate_calculation_request(base_request)
+        base_plan = resolve_calculation_plan(base_request)
+        
+        variation_requests = []
+        plans = [base_plan]
+        for variation in what_if_request.variations:
+            try:
+                variation_request = apply_variation(base_request, variation)
+                validation_utils.validate_calculation_request(variation_request)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid variation '{variation.name}': {str(e)}")
             
-            # Perform calculation
-            calculation_request = ROICalculationRequest(**modified_calc)
-            result = await calculate_roi(request, calculation_request)
-            results.append({
-                "variation": variation,
-                "result": result
-            })
-        
-        return {"what_if_results": results}
+            variation_requests.append(variation_request)
+            plans.append(resolve_calculation_plan(variation_request))
+        
+        async def analyse(job: Optional[JobContext] = None) -> WhatIfResponse:
+            return await run_in_threadpool(
+                run_what_if, roi_calculator, base_request, variation_requests,
+                what_if_request.variations, plans
+            )
+        
+        if background:
+            log_analytics(request, base_request.dict())
+            return submit_job("what_if", analyse)
+        
+        response = await analyse()
+        
+        # Log analytics
+        log_analytics(request, base_request.dict())
+        
+        return response
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"What-if analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail="What-if analysis failed")
 
+@app.post("/api/simulate", response_model=SimulationResponse)
+async def simulate_roi(request: Request, simulation_request: SimulationRequest, background: bool = False):
+    """Run a Monte Carlo risk simulation around an ROI calculation, optionally as a background job"""
+    try:
+        base_request = simulation_request.base_calculation
+        validation_utils.validate_calculation_request(base_request)
+        plan = resolve_calculation_plan(base_request)
+        
+        executor = get_simulation_executor() if simulation_request.parallel else None
+        
+        async def simulate(job: Optional[JobContext] = None) -> SimulationResponse:
+            return await run_in_threadpool(
+                monte_carlo_simulator.run, simulation_request, plan, executor
+            )
+        
+        if background:
+            log_analytics(request, base_request.dict())
+            return submit_job("simulation", simulate)
+        
+        response = await simulate()
+        
+        # Log analytics
+        log_analytics(request, base_request.dict())
+        
+        return response
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Simulation error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Simulation failed")
+
+@app.post("/api/sensitivity", response_model=SensitivityResponse)
+async def sensitivity_analysis(request: Request, sensitivity_request: SensitivityRequest):
+    """Rank inputs by how much a ±x% change moves ROI (tornado chart data)"""
+    try:
+        base_request = sensitivity_request.base_calculation
+        validation_utils.validate_calculation_request(base_request)
+        plan = resolve_calculation_plan(base_request)
+        
+        response = await run_in_threadpool(sensitivity_analyzer.run, sensitivity_request, plan)
+        
+        # Log analytics
+        log_analytics(request, base_request.dict())
+        
+        return response
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Sensitivity analysis error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Sensitivity analysis failed")
+
+@app.post("/api/goal-seek", response_model=GoalSeekResponse)
+async def goal_seek(request: Request, goal_request: GoalSeekRequest):
+    """Solve for the input value needed to hit a target ROI, payback or NPV"""
+    try:
+        base_request = goal_request.base_calculation
+        validation_utils.validate_calculation_request(base_request)
+        plan = resolve_calculation_plan(base_request)
+        
+        response = await run_in_threadpool(goal_seeker.run, goal_request, plan)
+        
+        # Log analytics
+        log_analytics(request, base_request.dict())
+        
+        return response
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Goal seek error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Goal seek failed")
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get the status and progress of a background job"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Get the result of a finished background job"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    
+    if job.result_file is not None:
+        if not os.path.exists(job.result_file):
+            raise HTTPException(status_code=410, detail="Job result is no longer available")
+        return FileResponse(job.result_file, media_type=job.media_type, filename=job.filename)
+    return job.result
+
+@app.delete("/api/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running background job"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status.value}")
+    if not job_manager.owns(job_id):
+        # Jobs run in the worker that accepted them; a shared store only lets other workers report on them
+        raise HTTPException(status_code=409, detail="Job is running on another worker and cannot be cancelled here")
+    return await job_manager.cancel(job_id)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -24,8 +24,8 @@ class TaxRates(BaseModel):
     varies_by_state: bool = Field(default=False, description="Whether tax varies by state/region")
 
 class FinancialYear(BaseModel):
-    start: str = Field(..., regex=r"^\d{2}-\d{2}$", description="Start date in MM-DD format")
-    end: str = Field(..., regex=r"^\d{2}-\d{2}$", description="End date in MM-DD format")
+    start: str = Field(..., pattern=r"^\d{2}-\d{2}$", description="Start date in MM-DD format")
+    end: str = Field(..., pattern=r"^\d{2}-\d{2}$", description="End date in MM-DD format")
 
 class BusinessRegistration(BaseModel):
     timeframe: str = Field(..., description="Time to register business")
@@ -134,11 +134,21 @@ class ROICalculationRequest(BaseModel):
     payment_processing_rate: Optional[float] = Field(None, ge=0, le=0.1)
     employee_costs: Optional[float] = Field(None, ge=0)
     
+    # Reporting
+    report_currency: Optional[str] = Field(
+        None, min_length=3, max_length=3,
+        description="Currency for monetary results; defaults to the country's currency"
+    )
+    
     @validator('monthly_revenue')
     def revenue_must_be_positive(cls, v):
         if v <= 0:
             raise ValueError('Monthly revenue must be positive')
         return v
+    
+    @validator('report_currency')
+    def report_currency_upper(cls, v):
+        return v.upper() if v else v
 
 class BreakdownItem(BaseModel):
     category: str
@@ -163,6 +173,7 @@ class ROIMetrics(BaseModel):
     total_expenses: float = Field(..., description="Total expenses")
     payback_period_months: Optional[float] = Field(None, description="Payback period in months")
     irr: Optional[float] = Field(None, description="Internal Rate of Return")
+    irr_converged: Optional[bool] = Field(None, description="Whether the IRR solver converged")
     npv: Optional[float] = Field(None, description="Net Present Value")
 
 class TaxCalculation(BaseModel):
@@ -173,6 +184,13 @@ class TaxCalculation(BaseModel):
     effective_tax_rate: float
     after_tax_profit: float
 
+class CurrencyConversionDetails(BaseModel):
+    from_currency: str
+    to_currency: str
+    exchange_rate: float = Field(..., description="Units of to_currency per unit of from_currency")
+    rates_version: str
+    rates_as_of: Optional[str] = None
+
 class ROIResponse(BaseModel):
     calculation_id: str = Field(..., description="Unique calculation ID")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -204,15 +222,57 @@ class ROIResponse(BaseModel):
     # Currency formatting
     currency_code: str
     formatted_values: Dict[str, str] = Field(default_factory=dict)
+    currency_conversion: Optional[CurrencyConversionDetails] = Field(
+        None, description="Set when results are reported in a currency other than the country's"
+    )
+
+class ROIBatchRequest(BaseModel):
+    requests: List[Dict[str, Any]] = Field(
+        ..., min_items=1, max_items=5000,
+        description="ROICalculationRequest payloads, validated individually"
+    )
+    include_projections: bool = Field(default=True, description="Include monthly projections in each result")
+    report_currency: Optional[str] = Field(
+        None, min_length=3, max_length=3,
+        description="Report currency for items that do not set their own"
+    )
+
+class ROIBatchItem(BaseModel):
+    index: int = Field(..., description="Position of the item in the batch request")
+    success: bool
+    result: Optional[ROIResponse] = None
+    error: Optional[str] = None
+
+class ROIBatchResponse(BaseModel):
+    results: List[ROIBatchItem]
+    total: int
+    succeeded: int
+    failed: int
+
+class CurrencyFormatRequest(BaseModel):
+    amounts: List[float] = Field(..., min_items=1, max_items=1000, description="Amounts to format")
+    currency_code: str = Field(..., min_length=3, max_length=3)
+    locale: Optional[str] = Field(None, description="Locale such as en_US or de-DE; defaults to en_US")
+
+class CurrencyFormatResponse(BaseModel):
+    formatted: List[str]
+    currency: str
+    locale: str
 
 class PDFExportRequest(BaseModel):
     calculation_id: str = Field(..., description="Calculation ID to export")
     calculation_data: Dict[str, Any] = Field(..., description="Calculation results")
     country_data: Dict[str, Any] = Field(..., description="Country information")
     business_data: Dict[str, Any] = Field(..., description="Business type and scenario data")
-    export_format: str = Field(default="standard", description="PDF export format")
+    export_format: str = Field(default="standard", description="PDF export format: standard or summary")
     include_charts: bool = Field(default=True, description="Include charts in PDF")
     include_projections: bool = Field(default=True, description="Include monthly projections")
+    
+    @validator('export_format')
+    def export_format_supported(cls, v):
+        if v not in ('standard', 'summary'):
+            raise ValueError('export_format must be standard or summary')
+        return v
 
 class EmailRequest(BaseModel):
     email: EmailStr = Field(..., description="Recipient email address")
@@ -289,6 +349,148 @@ class WhatIfResponse(BaseModel):
     variation_results: List[WhatIfResult]
     summary: Dict[str, Any] = Field(..., description="Summary of variations")
 
+class DistributionType(str, Enum):
+    NORMAL = "normal"
+    TRIANGULAR = "triangular"
+    UNIFORM = "uniform"
+    LOGNORMAL = "lognormal"
+
+class DistributionSpec(BaseModel):
+    distribution: DistributionType = Field(..., description="Distribution family")
+    mean: Optional[float] = Field(None, description="Mean (normal, lognormal)")
+    std: Optional[float] = Field(None, ge=0, description="Standard deviation (normal, lognormal)")
+    low: Optional[float] = Field(None, description="Lower bound (triangular, uniform)")
+    mode: Optional[float] = Field(None, description="Most likely value (triangular)")
+    high: Optional[float] = Field(None, description="Upper bound (triangular, uniform)")
+
+    @validator('high')
+    def high_not_below_low(cls, v, values):
+        if v is not None and values.get('low') is not None and v < values['low']:
+            raise ValueError('high must be greater than or equal to low')
+        return v
+
+class SimulationRequest(BaseModel):
+    base_calculation: ROICalculationRequest
+    distributions: Dict[str, DistributionSpec] = Field(
+        default_factory=dict,
+        description="Distributions keyed by input: monthly_revenue, growth_rate, gross_margin, "
+                    "churn_rate, customer_acquisition_cost, average_order_value"
+    )
+    derive_from_scenario: bool = Field(
+        default=True,
+        description="Use the scenario's min/max ranges for revenue, CAC and AOV when not given"
+    )
+    paths: int = Field(default=10000, ge=100, le=100000, description="Number of simulated paths")
+    chunk_size: int = Field(default=2000, ge=100, le=10000, description="Paths evaluated per chunk")
+    percentiles: List[float] = Field(default_factory=lambda: [5, 25, 50, 75, 95])
+    seed: Optional[int] = Field(None, description="Random seed for reproducible runs")
+    parallel: bool = Field(default=False, description="Spread chunks across the simulation process pool")
+
+    @validator('percentiles')
+    def percentiles_in_range(cls, v):
+        if not v or any(p < 0 or p > 100 for p in v):
+            raise ValueError('percentiles must be between 0 and 100')
+        return sorted(set(v))
+
+class DistributionSummary(BaseModel):
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    percentiles: Dict[str, float] = Field(default_factory=dict)
+    histogram: Dict[str, List[float]] = Field(default_factory=dict, description="Bin edges and counts")
+
+class SimulationBand(BaseModel):
+    month: int
+    cumulative_profit: Dict[str, float] = Field(..., description="Cumulative profit percentiles")
+
+class SimulationResponse(BaseModel):
+    paths: int
+    timeframe_months: int
+    currency_code: str
+    probability_of_payback: Optional[float] = Field(None, description="Share of paths that pay back")
+    payback_period_months: DistributionSummary
+    roi_percentage: DistributionSummary
+    npv: DistributionSummary
+    clv_cac_ratio: DistributionSummary
+    monthly_bands: List[SimulationBand]
+    band_sample_size: int = Field(..., description="Paths used for the monthly percentile bands")
+    distributions_used: Dict[str, DistributionSpec]
+    # Insight rules that fire in most simulated paths
+    insights: List[str] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
+    risk_factors: List[str] = Field(default_factory=list)
+
+class SensitivityRequest(BaseModel):
+    base_calculation: ROICalculationRequest
+    variation_percent: float = Field(default=10, gt=0, le=90, description="Relative change applied in each direction")
+    parameters: Optional[List[str]] = Field(None, description="Inputs to perturb; defaults to all supported inputs")
+
+class SensitivityResult(BaseModel):
+    parameter: str
+    base_value: float
+    low_value: float
+    high_value: float
+    low_deltas: Dict[str, Optional[float]] = Field(..., description="Metric changes with the input decreased")
+    high_deltas: Dict[str, Optional[float]] = Field(..., description="Metric changes with the input increased")
+    roi_swing: float = Field(..., description="Spread of ROI percentage between the low and high cases")
+
+class SensitivityResponse(BaseModel):
+    variation_percent: float
+    base_metrics: Dict[str, Optional[float]]
+    results: List[SensitivityResult] = Field(..., description="Sorted by ROI swing, largest first")
+    currency_code: str
+
+class GoalSeekMetric(str, Enum):
+    ROI_PERCENTAGE = "roi_percentage"
+    PAYBACK_PERIOD_MONTHS = "payback_period_months"
+    NPV = "npv"
+
+class GoalSeekRequest(BaseModel):
+    base_calculation: ROICalculationRequest
+    target_metric: GoalSeekMetric
+    target_value: float
+    variable: str = Field(..., description="Input to solve for, e.g. monthly_revenue")
+    lower_bound: Optional[float] = Field(None, description="Lower end of the search range")
+    upper_bound: Optional[float] = Field(None, description="Upper end of the search range")
+    tolerance: float = Field(default=1e-6, gt=0, le=0.1, description="Relative tolerance on the target metric")
+
+class GoalSeekResponse(BaseModel):
+    variable: str
+    target_metric: GoalSeekMetric
+    target_value: float
+    reachable: bool = Field(..., description="Whether the target is attainable within the search range")
+    converged: bool
+    solved_value: Optional[float] = Field(None, description="Input value that meets the target")
+    achieved_value: Optional[float] = Field(None, description="Metric value at the solved input")
+    base_value: float
+    base_metric_value: Optional[float]
+    change_percent: Optional[float] = Field(None, description="Solved value relative to the base value")
+    search_bounds: List[float]
+    achievable_range: Dict[str, Optional[float]] = Field(..., description="Metric min/max seen over the search range")
+    iterations: int
+    currency_code: str
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str = Field(..., description="Operation the job runs, e.g. pdf_export")
+    status: JobStatus
+    progress: float = Field(default=0.0, ge=0, le=1)
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = Field(None, description="When a finished job and its result are discarded")
+    result_url: Optional[str] = Field(None, description="Where to fetch the result once the job has succeeded")
+    error: Optional[str] = None
+
 class SearchResult(BaseModel):
     business_type: BusinessTypeResponse
     scenario: BusinessScenario
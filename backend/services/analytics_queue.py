@@ -0,0 +1,310 @@
+"""
+Asynchronous, batched writer for analytics events.
+
+Request handlers enqueue calculation, PDF export and email submission events
+without touching the database. A background task collects them and writes
+each batch with ``executemany`` in a single transaction on a dedicated
+writer thread, flushing every ``flush_interval`` seconds or as soon as
+``batch_size`` events are waiting. The queue is bounded: when it is full new
+events are dropped and counted rather than slowing down requests.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from services import analytics_rollups
+from services.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Insert column order for each event table
+EVENT_COLUMNS = {
+    "analytics": (
+        "id", "timestamp", "country_code", "business_type", "scenario_id",
+        "calculation_data", "session_id", "ip_address", "user_agent", "roi_percentage"
+    ),
+    "email_submissions": (
+        "id", "timestamp", "email", "name", "company", "calculation_id",
+        "country_code", "business_type", "roi_result", "gdpr_consent", "ip_address"
+    ),
+    "pdf_exports": (
+        "id", "timestamp", "calculation_id", "export_type", "file_size", "session_id"
+    ),
+}
+
+INSERT_STATEMENTS = {
+    table: f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    for table, columns in EVENT_COLUMNS.items()
+}
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class AnalyticsWriteQueue:
+    """
+    Bounded in-memory queue of analytics events with a background batch writer
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.25
+    ):
+        self.database = database
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=max_size)
+        self._wakeup = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # One writer thread, so all inserts share that thread's connection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics-writer")
+
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_seconds = 0.0
+
+    # Event producers
+
+    def log_calculation(
+        self,
+        country_code: Optional[str],
+        business_type: Optional[str],
+        scenario_id: Optional[str],
+        calculation_data: Any,
+        session_id: str,
+        ip_address: str,
+        user_agent: str,
+        roi_percentage: Optional[float] = None
+    ) -> bool:
+        """
+        Queue a calculation event; ``calculation_data`` is serialized by the writer
+        """
+        return self.enqueue("analytics", {
+            "country_code": country_code,
+            "business_type": business_type,
+            "scenario_id": scenario_id,
+            "calculation_data": calculation_data,
+            "session_id": session_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "roi_percentage": roi_percentage,
+        })
+
+    def log_pdf_export(self, calculation_id: str, export_type: str, file_size: int, session_id: str) -> bool:
+        """
+        Queue a PDF export event
+        """
+        return self.enqueue("pdf_exports", {
+            "calculation_id": calculation_id,
+            "export_type": export_type,
+            "file_size": file_size,
+            "session_id": session_id,
+        })
+
+    def log_email_submission(
+        self,
+        email: str,
+        name: Optional[str],
+        company: Optional[str],
+        calculation_id: str,
+        country_code: Optional[str],
+        business_type: Optional[str],
+        roi_result: float,
+        gdpr_consent: bool,
+        ip_address: str
+    ) -> bool:
+        """
+        Queue an email submission event
+        """
+        return self.enqueue("email_submissions", {
+            "email": email,
+            "name": name,
+            "company": company,
+            "calculation_id": calculation_id,
+            "country_code": country_code,
+            "business_type": business_type,
+            "roi_result": roi_result,
+            "gdpr_consent": gdpr_consent,
+            "ip_address": ip_address,
+        })
+
+    def enqueue(self, table: str, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row for ``table`` without blocking. Returns False if it was dropped.
+        Safe to call from worker threads as well as the event loop.
+        """
+        if table not in EVENT_COLUMNS:
+            raise ValueError(f"Unknown analytics table: {table}")
+
+        event = (table, {
+            "id": str(uuid.uuid4()),
+            # Stamp at enqueue time in SQLite's CURRENT_TIMESTAMP format
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            **row,
+        })
+
+        loop = self._loop
+        if loop is not None and not self._on_loop_thread(loop):
+            if self._closed or self._queue.qsize() >= self.max_size:
+                self._count("dropped")
+                return False
+            loop.call_soon_threadsafe(self._put, event)
+            return True
+
+        return self._put(event)
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """
+        Start the background writer on the running event loop
+        """
+        if self._task is not None:
+            return
+
+        # Rebind the queue and events to this loop, keeping events queued before start
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        for event in pending:
+            self._queue.put_nowait(event)
+        self._wakeup = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        if pending:
+            self._wakeup.set()
+
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting events and flush everything already queued
+        """
+        self._closed = True
+        self._wakeup.set()
+        self._batch_ready.set()
+
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Analytics queue drain timed out with {self._queue.qsize()} events pending")
+                self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "running": self._task is not None and not self._task.done(),
+                "pending": self._queue.qsize(),
+                "max_size": self.max_size,
+                "batch_size": self.batch_size,
+                "flush_interval": self.flush_interval,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+                "last_flush_seconds": self.last_flush_seconds,
+            }
+
+    # Writer
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while not (self._closed and self._queue.empty()):
+            if self._queue.empty():
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Give a partial batch until the flush interval to fill up
+            if self._queue.qsize() < self.batch_size and not self._closed:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if not self._closed:
+                self._batch_ready.clear()
+
+            started = time.perf_counter()
+            try:
+                await loop.run_in_executor(self._executor, self._write_batch, batch)
+                self._count("written", len(batch))
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} analytics events: {str(e)}")
+                self._count("failed", len(batch))
+            with self._stats_lock:
+                self.batches += 1
+                self.last_flush_seconds = time.perf_counter() - started
+
+    def _write_batch(self, batch: List[Event]) -> None:
+        """
+        Write one batch and its rollup updates in a single transaction,
+        one executemany per table
+        """
+        rows_by_table: Dict[str, List[Tuple[Any, ...]]] = defaultdict(list)
+        for table, row in batch:
+            if table == "analytics" and not isinstance(row["calculation_data"], str):
+                row["calculation_data"] = json.dumps(row["calculation_data"])
+            rows_by_table[table].append(tuple(row.get(column) for column in EVENT_COLUMNS[table]))
+
+        with self.database.transaction() as conn:
+            for table, rows in rows_by_table.items():
+                conn.executemany(INSERT_STATEMENTS[table], rows)
+            analytics_rollups.apply_events(conn, batch)
+
+    # Helpers
+
+    def _put(self, event: Event) -> bool:
+        if self._closed:
+            self._count("dropped")
+            return False
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._count("dropped")
+            return False
+
+        self._count("enqueued")
+        self._wakeup.set()
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    def _on_loop_thread(self, loop: asyncio.AbstractEventLoop) -> bool:
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
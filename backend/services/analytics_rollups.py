@@ -0,0 +1,172 @@
+"""
+Incremental rollups of analytics events for the admin dashboard.
+
+Every batch written by the analytics queue also updates, in the same
+transaction, per-hour, per-day and all-time aggregates:
+
+- ``analytics_rollups``: event counts by country, business type, scenario
+  and event kind (email submission, PDF export)
+- ``analytics_rollup_totals``: calculation count, ROI sum/count, first and
+  last event time and, for days and all time, a HyperLogLog sketch of
+  session ids for unique visitor estimates
+
+Dashboard queries then read a handful of rollup rows instead of scanning
+the event tables, so their cost does not grow with history.
+"""
+import sqlite3
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.hyperloglog import HyperLogLog
+
+ALL_TIME = ("all", "")
+
+# Periods that keep a unique-session sketch; hourly sketches would cost 4 KB per hour
+SKETCH_PERIODS = ("day", "all")
+
+# Dimension recorded for the non-calculation event tables
+EVENT_KINDS = {
+    "email_submissions": "email_submission",
+    "pdf_exports": "pdf_export",
+}
+
+UPSERT_COUNT = """
+    INSERT INTO analytics_rollups (period, bucket, dimension, value, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (period, bucket, dimension, value) DO UPDATE SET count = count + excluded.count
+"""
+
+UPSERT_TOTALS = """
+    INSERT INTO analytics_rollup_totals
+        (period, bucket, calculations, roi_sum, roi_count, first_seen, last_seen, sessions_hll)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (period, bucket) DO UPDATE SET
+        calculations = calculations + excluded.calculations,
+        roi_sum = roi_sum + excluded.roi_sum,
+        roi_count = roi_count + excluded.roi_count,
+        first_seen = MIN(COALESCE(first_seen, excluded.first_seen), excluded.first_seen),
+        last_seen = MAX(COALESCE(last_seen, excluded.last_seen), excluded.last_seen),
+        sessions_hll = excluded.sessions_hll
+"""
+
+Bucket = Tuple[str, str]
+
+
+def bucket_keys(timestamp: Optional[str]) -> List[Bucket]:
+    """
+    Hour, day and all-time buckets for a ``YYYY-MM-DD HH:MM:SS`` timestamp
+    """
+    normalized = (timestamp or "")[:19].replace("T", " ")
+    if len(normalized) < 13:
+        return [ALL_TIME]
+    return [("hour", normalized[:13] + ":00:00"), ("day", normalized[:10]), ALL_TIME]
+
+
+def calculation_dimensions(row: Dict[str, Any]) -> List[Tuple[str, str]]:
+    dimensions = []
+    if row.get("country_code"):
+        dimensions.append(("country", row["country_code"]))
+    if row.get("business_type"):
+        dimensions.append(("business_type", row["business_type"]))
+        if row.get("scenario_id"):
+            dimensions.append(("scenario", f"{row['business_type']}/{row['scenario_id']}"))
+    return dimensions
+
+
+class _BucketTotals:
+    __slots__ = ("calculations", "roi_sum", "roi_count", "first_seen", "last_seen", "sessions")
+
+    def __init__(self):
+        self.calculations = 0
+        self.roi_sum = 0.0
+        self.roi_count = 0
+        self.first_seen: Optional[str] = None
+        self.last_seen: Optional[str] = None
+        self.sessions = set()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.calculations += 1
+        if row.get("roi_percentage") is not None:
+            self.roi_sum += row["roi_percentage"]
+            self.roi_count += 1
+        timestamp = row.get("timestamp")
+        if timestamp:
+            self.first_seen = min(self.first_seen or timestamp, timestamp)
+            self.last_seen = max(self.last_seen or timestamp, timestamp)
+        if row.get("session_id"):
+            self.sessions.add(row["session_id"])
+
+
+def apply_events(conn: sqlite3.Connection, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+    """
+    Fold a batch of (table, row) events into the rollup tables.
+    Must run inside the transaction that inserts the events.
+    """
+    counts: Counter = Counter()
+    totals: Dict[Bucket, _BucketTotals] = {}
+
+    for table, row in events:
+        buckets = bucket_keys(row.get("timestamp"))
+        if table == "analytics":
+            dimensions = calculation_dimensions(row)
+            for bucket in buckets:
+                for dimension, value in dimensions:
+                    counts[(*bucket, dimension, value)] += 1
+                totals.setdefault(bucket, _BucketTotals()).add(row)
+        elif table in EVENT_KINDS:
+            for bucket in buckets:
+                counts[(*bucket, "event", EVENT_KINDS[table])] += 1
+
+    if counts:
+        conn.executemany(UPSERT_COUNT, [(*key, count) for key, count in counts.items()])
+
+    for (period, bucket), bucket_totals in totals.items():
+        sketch = None
+        if period in SKETCH_PERIODS:
+            existing = conn.execute(
+                "SELECT sessions_hll FROM analytics_rollup_totals WHERE period = ? AND bucket = ?",
+                (period, bucket)
+            ).fetchone()
+            hll = HyperLogLog.from_bytes(existing[0] if existing else None)
+            hll.update(bucket_totals.sessions)
+            sketch = hll.to_bytes()
+
+        conn.execute(UPSERT_TOTALS, (
+            period, bucket, bucket_totals.calculations, bucket_totals.roi_sum, bucket_totals.roi_count,
+            bucket_totals.first_seen, bucket_totals.last_seen, sketch
+        ))
+
+
+def backfill(conn: sqlite3.Connection, batch_size: int = 5000) -> None:
+    """
+    Build the rollups from events already stored (used by the schema migration)
+    """
+    sources = (
+        ("analytics", "SELECT timestamp, country_code, business_type, scenario_id, session_id, "
+                      "roi_percentage FROM analytics"),
+        ("email_submissions", "SELECT timestamp FROM email_submissions"),
+        ("pdf_exports", "SELECT timestamp FROM pdf_exports"),
+    )
+    for table, query in sources:
+        cursor = conn.execute(query)
+        columns = [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            apply_events(conn, [(table, dict(zip(columns, row))) for row in rows])
+
+
+def reset(conn: sqlite3.Connection, tables: Sequence[str]) -> None:
+    """
+    Drop the rollups derived from the given event tables after they are cleared
+    """
+    if "analytics" in tables:
+        conn.execute("DELETE FROM analytics_rollups WHERE dimension != 'event'")
+        conn.execute("DELETE FROM analytics_rollup_totals")
+    for table in tables:
+        if table in EVENT_KINDS:
+            conn.execute(
+                "DELETE FROM analytics_rollups WHERE dimension = 'event' AND value = ?",
+                (EVENT_KINDS[table],)
+            )
@@ -0,0 +1,238 @@
+"""
+Read and maintenance queries for the analytics database used by the admin endpoints.
+Writes go through the batched ``AnalyticsWriteQueue``; dashboard figures are
+read from the rollups it maintains.
+"""
+import base64
+import binascii
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from models.roi_models import AnalyticsSummary
+from services import analytics_rollups
+from services.database import Database
+from utils.hyperloglog import HyperLogLog
+
+POPULAR_LIMIT = 10
+
+# Equality filters allowed on each admin listing, besides the start/end date range
+LISTING_FILTERS = {
+    "email_submissions": ("country_code", "business_type", "calculation_id"),
+    "pdf_exports": ("export_type", "calculation_id"),
+}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 500
+EXPORT_FORMATS = ("ndjson", "csv")
+
+ROLLUP_PERIODS = ("hour", "day")
+
+
+def _parse_timestamp(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.utcnow()
+    return datetime.fromisoformat(value)
+
+
+def _format_timestamp(value: Any) -> str:
+    """Format a datetime filter like the stored SQLite timestamps"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+def _csv_lines(rows: Iterable[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_cursor(timestamp: str, row_id: str) -> str:
+    """Opaque cursor for the row a page ended on"""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, row_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    return str(timestamp), str(row_id)
+
+
+class AnalyticsService:
+    """
+    Admin analytics queries over the shared analytics database
+    """
+
+    def __init__(self, database: Optional[Database] = None):
+        self.database = database or Database()
+
+    def get_analytics_summary(self) -> AnalyticsSummary:
+        """
+        Usage summary for the admin dashboard, answered from the all-time rollups
+        """
+        period, bucket = analytics_rollups.ALL_TIME
+        totals = self.database.query_one(
+            "SELECT calculations, roi_sum, roi_count, first_seen, last_seen, sessions_hll "
+            "FROM analytics_rollup_totals WHERE period = ? AND bucket = ?",
+            (period, bucket)
+        )
+        events = {row["value"]: row["count"] for row in self._top("event", limit=None)}
+
+        total_calculations = totals["calculations"] if totals else 0
+        return AnalyticsSummary(
+            total_calculations=total_calculations,
+            unique_visitors=HyperLogLog.from_bytes(totals["sessions_hll"]).count() if totals else 0,
+            popular_countries=[
+                {"country_code": row["value"], "count": row["count"]} for row in self._top("country")
+            ],
+            popular_business_types=[
+                {"business_type": row["value"], "count": row["count"]} for row in self._top("business_type")
+            ],
+            popular_scenarios=[
+                dict(zip(("business_type", "scenario_id"), row["value"].split("/", 1)), count=row["count"])
+                for row in self._top("scenario")
+            ],
+            average_roi=totals["roi_sum"] / totals["roi_count"] if totals and totals["roi_count"] else 0.0,
+            date_range={
+                "start": _parse_timestamp(totals["first_seen"] if totals else None),
+                "end": _parse_timestamp(totals["last_seen"] if totals else None),
+            },
+            conversion_metrics={
+                "email_conversion_rate": self._rate(events.get("email_submission", 0), total_calculations),
+                "pdf_export_rate": self._rate(events.get("pdf_export", 0), total_calculations),
+            }
+        )
+
+    def get_timeseries(self, period: str = "day", limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        Most recent hourly or daily rollup totals, oldest first
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Invalid period: {period}")
+
+        rows = self.database.query(
+            "SELECT bucket, calculations, roi_sum, roi_count, sessions_hll FROM analytics_rollup_totals "
+            "WHERE period = ? ORDER BY bucket DESC LIMIT ?",
+            (period, limit)
+        )
+        return [
+            {
+                "bucket": row["bucket"],
+                "calculations": row["calculations"],
+                "average_roi": row["roi_sum"] / row["roi_count"] if row["roi_count"] else None,
+                "unique_visitors": (
+                    HyperLogLog.from_bytes(row["sessions_hll"]).count() if row["sessions_hll"] else None
+                ),
+            }
+            for row in reversed(rows)
+        ]
+
+    def list_rows(
+        self,
+        table: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        **filters: Any
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Keyset-paginated listing on (timestamp, id), so every page costs one
+        index range scan no matter how deep it is
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        where, params = self._listing_filters(table, filters)
+        if cursor:
+            where.append("(timestamp, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        # Fetch one extra row to know whether another page follows
+        rows = self.database.query(self._listing_query(table, where) + " LIMIT ?", (*params, limit + 1))
+        page = [dict(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(page[-1]["timestamp"], page[-1]["id"]) if len(rows) > limit else None
+        return page, next_cursor
+
+    def stream_rows(self, table: str, export_format: str = "ndjson", **filters: Any) -> Iterator[bytes]:
+        """
+        Stream every matching row as NDJSON or CSV from a server-side cursor.
+        Rows are fetched in chunks on a dedicated connection, so memory stays
+        bounded by the chunk size and the generator can be consumed from any thread.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format: {export_format}")
+
+        where, params = self._listing_filters(table, filters)
+        query = self._listing_query(table, where)
+
+        def generate() -> Iterator[bytes]:
+            conn = self.database.open_connection()
+            try:
+                rows = conn.execute(query, params)
+                columns = [description[0] for description in rows.description]
+                if export_format == "csv":
+                    yield _csv_lines([columns])
+
+                while True:
+                    chunk = rows.fetchmany(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if export_format == "csv":
+                        yield _csv_lines(chunk)
+                    else:
+                        yield "".join(
+                            json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in chunk
+                        ).encode("utf-8")
+            finally:
+                conn.close()
+
+        return generate()
+
+    def _listing_filters(self, table: str, filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """
+        WHERE clauses for a date range and the table's equality filters
+        """
+        if table not in LISTING_FILTERS:
+            raise ValueError(f"Invalid listing: {table}")
+
+        where: List[str] = []
+        params: List[Any] = []
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name == "start":
+                where.append("timestamp >= ?")
+                params.append(_format_timestamp(value))
+            elif name == "end":
+                where.append("timestamp < ?")
+                params.append(_format_timestamp(value))
+            elif name in LISTING_FILTERS[table]:
+                where.append(f"{name} = ?")
+                params.append(value)
+            else:
+                raise ValueError(f"Unsupported filter for {table}: {name}")
+        return where, params
+
+    def _listing_query(self, table: str, where: List[str]) -> str:
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        return f"SELECT * FROM {table}{clause} ORDER BY timestamp DESC, id DESC"
+
+    def _top(self, dimension: str, limit: Optional[int] = POPULAR_LIMIT) -> List[Any]:
+        """
+        Most frequent all-time values of a rollup dimension
+        """
+        period, bucket = analytics_rollups.ALL_TIME
+        return self.database.query(
+            "SELECT value, count FROM analytics_rollups "
+            "WHERE period = ? AND bucket = ? AND dimension = ? ORDER BY count DESC LIMIT ?",
+            (period, bucket, dimension, -1 if limit is None else limit)
+        )
+
+    @staticmethod
+    def _rate(count: int, total: int) -> float:
+        return count / total * 100 if total else 0.0
@@ -0,0 +1,266 @@
+"""
+SQLite persistence layer for the analytics database.
+
+Each thread gets its own long-lived connection (SQLite connections must not
+be shared across threads), configured for WAL journaling so admin readers
+never block the analytics writer and vice versa. Connections keep a
+statement cache, so repeated queries are prepared once per connection.
+
+The schema is versioned with ``PRAGMA user_version``; ``migrate`` applies
+every migration newer than the database's version in order.
+"""
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from services import analytics_rollups
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "amplifyroi.db"
+
+# Applied to every new connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",  # Durable at checkpoints; safe with WAL
+    "PRAGMA cache_size = -20000",  # ~20 MB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# A migration step is a SQL statement or a callable run on the connection
+MigrationStep = Union[str, Callable[[sqlite3.Connection], None]]
+
+# (version, steps) in ascending order; never edit a released migration
+MIGRATIONS: List[Tuple[int, Sequence[MigrationStep]]] = [
+    (1, (
+        """
+        CREATE TABLE IF NOT EXISTS analytics (
+            id TEXT PRIMARY KEY,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            country_code TEXT,
+            business_type TEXT,
+            scenario_id TEXT,
+            calculation_data TEXT,
+            session_id TEXT,
+            ip_address TEXT,
+            user_agent TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS email_submissions (
+            id TEXT PRIMARY KEY,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            email TEXT,
+            name TEXT,
+            company TEXT,
+            calculation_id TEXT,
+            country_code TEXT,
+            business_type TEXT,
+            roi_result REAL,
+            gdpr_consent BOOLEAN,
+            ip_address TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pdf_exports (
+            id TEXT PRIMARY KEY,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            calculation_id TEXT,
+            export_type TEXT,
+            file_size INTEGER,
+            session_id TEXT
+        )
+        """,
+    )),
+    # Indexes for the admin queries
+    (2, (
+        "CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_country_code ON analytics (country_code)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_business_type ON analytics (business_type)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_scenario_id ON analytics (business_type, scenario_id)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_session_id ON analytics (session_id)",
+        "CREATE INDEX IF NOT EXISTS idx_email_submissions_timestamp ON email_submissions (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_email_submissions_calculation_id ON email_submissions (calculation_id)",
+        "CREATE INDEX IF NOT EXISTS idx_pdf_exports_timestamp ON pdf_exports (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_pdf_exports_calculation_id ON pdf_exports (calculation_id)",
+    )),
+    # Dashboard rollups, built from existing events
+    (3, (
+        "ALTER TABLE analytics ADD COLUMN roi_percentage REAL",
+        """
+        CREATE TABLE IF NOT EXISTS analytics_rollups (
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket, dimension, value)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS analytics_rollup_totals (
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            calculations INTEGER NOT NULL DEFAULT 0,
+            roi_sum REAL NOT NULL DEFAULT 0,
+            roi_count INTEGER NOT NULL DEFAULT 0,
+            first_seen TEXT,
+            last_seen TEXT,
+            sessions_hll BLOB,
+            PRIMARY KEY (period, bucket)
+        ) WITHOUT ROWID
+        """,
+        analytics_rollups.backfill,
+    )),
+    # Keyset pagination on (timestamp, id) for the admin listings
+    (4, (
+        "DROP INDEX IF EXISTS idx_email_submissions_timestamp",
+        "DROP INDEX IF EXISTS idx_pdf_exports_timestamp",
+        "CREATE INDEX IF NOT EXISTS idx_email_submissions_timestamp_id ON email_submissions (timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_pdf_exports_timestamp_id ON pdf_exports (timestamp, id)",
+    )),
+    # Erasure requests delete submissions by email
+    (5, (
+        "CREATE INDEX IF NOT EXISTS idx_email_submissions_email ON email_submissions (email)",
+    )),
+    # Background job state shared by all workers
+    (6, (
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            expires_at TEXT,
+            payload TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_expires_at ON jobs (expires_at)",
+    )),
+    # Outbound email queue
+    (7, (
+        """
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT NOT NULL,
+            last_error TEXT,
+            sent_at TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at)",
+        "CREATE INDEX IF NOT EXISTS idx_email_outbox_recipient ON email_outbox (recipient)",
+    )),
+]
+
+
+class Database:
+    """
+    Per-thread SQLite connections to one database file
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, cached_statements: int = 256):
+        self.path = path
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection, opening it on first use
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self.open_connection()
+            self._local.connection = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def open_connection(self) -> sqlite3.Connection:
+        """
+        Open a configured connection owned by the caller, e.g. for a
+        streaming cursor that is consumed across threads
+        """
+        conn = sqlite3.connect(
+            self.path,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements in one transaction, committed on success and rolled back on error
+        """
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return self.connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return self.connection().execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """
+        Execute one statement in its own transaction and return the affected row count
+        """
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> int:
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
+
+    def schema_version(self) -> int:
+        return self.connection().execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self) -> int:
+        """
+        Enable WAL and incremental vacuum, and apply pending schema migrations. Returns the new schema version.
+        """
+        conn = self.connection()
+        # Only takes effect on a new, empty database; existing files need a full VACUUM to switch
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # The journal mode is stored in the database file, so this only needs doing once
+        conn.execute("PRAGMA journal_mode = WAL")
+
+        current = self.schema_version()
+        for version, steps in MIGRATIONS:
+            if version <= current:
+                continue
+            with conn:
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+            logger.info(f"Applied analytics database migration {version}")
+            current = version
+
+        return current
+
+    def close(self) -> None:
+        """
+        Close every connection opened through this database
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        self._local = threading.local()
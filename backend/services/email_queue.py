@@ -0,0 +1,341 @@
+"""
+Outbound email queue with SMTP connection reuse, retries and dead letters.
+
+``send_email`` only inserts the message into the ``email_outbox`` table and
+returns its delivery id. A background worker takes due messages in batches
+and sends them over one long-lived SMTP connection on a dedicated thread,
+reconnecting when the relay drops it and closing it after a quiet period.
+
+Temporary failures (4xx replies, dropped connections) are retried with
+exponential backoff and jitter; permanent rejections (5xx replies) and
+messages out of attempts are moved to the dead-letter state for an admin to
+inspect and requeue. Delivery is at least once: a crash mid-batch resends the
+messages of that batch.
+"""
+import asyncio
+import json
+import logging
+import random
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models.roi_models import EmailConfig
+from services.database import Database
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+SENT = "sent"
+DEAD = "dead"
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def roi_report_message(
+    name: Optional[str],
+    calculation_data: Dict[str, Any],
+    additional_data: Optional[Dict[str, Any]] = None
+) -> Tuple[str, str]:
+    """
+    Subject and plain-text body of the ROI report email
+    """
+    metrics = calculation_data.get("metrics") or calculation_data
+    lines = [f"Hi {name}," if name else "Hi,", "", "Here is a summary of your AmplifyROI calculation:", ""]
+    for label, key, suffix in (
+        ("ROI", "roi_percentage", "%"),
+        ("Payback period", "payback_period_months", " months"),
+        ("Net present value", "npv", ""),
+        ("Break-even", "break_even_months", " months"),
+    ):
+        value = metrics.get(key)
+        if value is not None:
+            lines.append(f"- {label}: {value:,.2f}{suffix}" if isinstance(value, (int, float)) else f"- {label}: {value}")
+    if additional_data and additional_data.get("message"):
+        lines += ["", str(additional_data["message"])]
+    lines += ["", "Thanks for using AmplifyROI."]
+    return "Your AmplifyROI report", "\n".join(lines)
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """
+    Whether retrying the message cannot succeed (5xx replies other than authentication)
+    """
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class EmailDeliveryQueue:
+    """
+    Durable outbox of ROI report emails with a background SMTP sender
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        config: Optional[EmailConfig],
+        use_tls: bool = True,
+        batch_size: int = 20,
+        max_attempts: int = 6,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+        poll_interval: float = 5.0,
+        idle_timeout: float = 60.0,
+        smtp_timeout: float = 30.0,
+        smtp_factory: Optional[Callable[[], Any]] = None,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.database = database
+        self.config = config
+        self.use_tls = use_tls
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.smtp_timeout = smtp_timeout
+        self._smtp_factory = smtp_factory or self._open_smtp
+        self._clock = clock
+
+        self._smtp: Any = None
+        self._last_used = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # One sender thread owns the SMTP connection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-sender")
+
+        self._stats_lock = threading.Lock()
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.connections_opened = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config is not None
+
+    async def enqueue(self, recipient: str, subject: str, text_body: str) -> str:
+        """
+        Store a message for delivery and return its delivery id
+        """
+        delivery_id = str(uuid.uuid4())
+        now = self._timestamp(self._clock())
+        payload = json.dumps({"subject": subject, "text": text_body})
+        await asyncio.get_running_loop().run_in_executor(None, self.database.execute, """
+            INSERT INTO email_outbox (id, created_at, recipient, payload, status, attempts, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+        """, (delivery_id, now, recipient, payload, QUEUED, now))
+        self._wakeup.set()
+        return delivery_id
+
+    def get_delivery(self, delivery_id: str) -> Optional[Dict[str, Any]]:
+        row = self.database.query_one(
+            "SELECT id, status, attempts, created_at, sent_at FROM email_outbox WHERE id = ?",
+            (delivery_id,)
+        )
+        return dict(row) if row is not None else None
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self.database.query("""
+            SELECT id, created_at, recipient, attempts, last_error FROM email_outbox
+            WHERE status = ? ORDER BY created_at DESC LIMIT ?
+        """, (DEAD, limit))
+        return [dict(row) for row in rows]
+
+    def requeue(self, delivery_id: str) -> bool:
+        """
+        Give a dead-lettered message a fresh set of attempts
+        """
+        updated = self.database.execute("""
+            UPDATE email_outbox SET status = ?, attempts = 0, next_attempt_at = ?, last_error = NULL
+            WHERE id = ? AND status = ?
+        """, (QUEUED, self._timestamp(self._clock()), delivery_id, DEAD))
+        if updated:
+            self._wakeup.set()
+        return bool(updated)
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        if self._task is None and self.enabled:
+            self._wakeup = asyncio.Event()
+            self._wakeup.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._disconnect)
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.database.query("SELECT status, COUNT(*) AS count FROM email_outbox GROUP BY status")
+        with self._stats_lock:
+            return {
+                "enabled": self.enabled,
+                "running": self._task is not None and not self._task.done(),
+                "outbox": {row["status"]: row["count"] for row in rows},
+                "sent": self.sent,
+                "retried": self.retried,
+                "dead": self.dead,
+                "connections_opened": self.connections_opened,
+                "connected": self._smtp is not None,
+            }
+
+    # Sender
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            try:
+                delivered = await loop.run_in_executor(self._executor, self.deliver_due)
+            except Exception as e:
+                logger.error(f"Email delivery batch failed: {str(e)}")
+                delivered = 0
+
+            # A full batch means more are probably due
+            if delivered >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def deliver_due(self) -> int:
+        """
+        Send one batch of due messages over the shared connection; returns the batch size.
+        Runs on the sender thread.
+        """
+        now = self._clock()
+        rows = self.database.query("""
+            SELECT id, recipient, payload, attempts FROM email_outbox
+            WHERE status = ? AND next_attempt_at <= ?
+            ORDER BY next_attempt_at LIMIT ?
+        """, (QUEUED, self._timestamp(now), self.batch_size))
+
+        if not rows:
+            if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                self._disconnect()
+            return 0
+
+        sent: List[Tuple[Any, ...]] = []
+        retries: List[Tuple[Any, ...]] = []
+        dead: List[Tuple[Any, ...]] = []
+
+        for row in rows:
+            attempts = row["attempts"] + 1
+            try:
+                self._send(row["recipient"], json.loads(row["payload"]))
+                sent.append((SENT, attempts, self._timestamp(self._clock()), row["id"]))
+            except (smtplib.SMTPException, OSError) as e:
+                if not isinstance(e, smtplib.SMTPResponseException) or isinstance(e, smtplib.SMTPAuthenticationError):
+                    # The connection may be unusable; open a fresh one for the next message
+                    self._disconnect()
+                error = f"{type(e).__name__}: {e}"[:500]
+                if is_permanent_failure(e) or attempts >= self.max_attempts:
+                    dead.append((DEAD, attempts, error, row["id"]))
+                    logger.error(f"Email {row['id']} dead-lettered after {attempts} attempts: {error}")
+                else:
+                    retry_at = now + timedelta(seconds=self._backoff(attempts))
+                    retries.append((attempts, self._timestamp(retry_at), error, row["id"]))
+
+        # One transaction for the whole batch's outcomes
+        with self.database.transaction() as conn:
+            conn.executemany("UPDATE email_outbox SET status = ?, attempts = ?, sent_at = ? WHERE id = ?", sent)
+            conn.executemany(
+                "UPDATE email_outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?", retries
+            )
+            conn.executemany("UPDATE email_outbox SET status = ?, attempts = ?, last_error = ? WHERE id = ?", dead)
+
+        with self._stats_lock:
+            self.sent += len(sent)
+            self.retried += len(retries)
+            self.dead += len(dead)
+        return len(rows)
+
+    def _send(self, recipient: str, payload: Dict[str, Any]) -> None:
+        message = EmailMessage()
+        message["From"] = formataddr((self.config.from_name, self.config.from_email))
+        message["To"] = recipient
+        message["Subject"] = payload["subject"]
+        message["Message-ID"] = make_msgid(domain=self.config.from_email.rpartition("@")[2] or None)
+        message.set_content(payload["text"])
+
+        self._connection().send_message(message)
+        self._last_used = time.monotonic()
+
+    def _connection(self) -> Any:
+        # Probe a connection that has sat idle, since relays drop quiet sessions
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout / 2:
+            try:
+                self._smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+
+        if self._smtp is None:
+            self._smtp = self._smtp_factory()
+            self._last_used = time.monotonic()
+            with self._stats_lock:
+                self.connections_opened += 1
+        return self._smtp
+
+    def _open_smtp(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.config.smtp_host, self.config.smtp_port, timeout=self.smtp_timeout)
+        if self.use_tls:
+            smtp.starttls(context=ssl.create_default_context())
+        if self.config.smtp_username:
+            smtp.login(self.config.smtp_username, self.config.smtp_password)
+        return smtp
+
+    def _disconnect(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        # Full jitter spreads retries from a burst across the window
+        return random.uniform(0, delay)
+
+    @staticmethod
+    def _timestamp(value: datetime) -> str:
+        return value.strftime(TIMESTAMP_FORMAT)
+
+
+def email_config_from_env(environ: Dict[str, str]) -> Optional[EmailConfig]:
+    """
+    SMTP settings from SMTP_* variables; None when no relay is configured
+    """
+    host = environ.get("SMTP_HOST", "").strip()
+    if not host:
+        return None
+    return EmailConfig(
+        smtp_host=host,
+        smtp_port=int(environ.get("SMTP_PORT", "587")),
+        smtp_username=environ.get("SMTP_USERNAME", ""),
+        smtp_password=environ.get("SMTP_PASSWORD", ""),
+        from_email=environ.get("SMTP_FROM_EMAIL", "reports@amplifyroi.com"),
+        from_name=environ.get("SMTP_FROM_NAME", "AmplifyROI Calculator")
+    )
@@ -0,0 +1,369 @@
+"""
+Background jobs for long-running exports and calculations.
+
+An endpoint that opts in submits an async work function and immediately
+returns a job id. Jobs run as tasks on the API's event loop, at most
+``max_concurrent`` at a time (CPU-bound work inside them still goes to a
+thread or process pool), and report progress through a ``JobContext``.
+Clients poll ``GET /api/jobs/{id}``, fetch the result once it has succeeded,
+or cancel it. Finished jobs are discarded ``result_ttl`` seconds after they
+end.
+
+Job state lives in a pluggable store: in memory for a single worker, or in
+the SQLite analytics database so every worker can report on any job. Jobs
+run in the process that accepted them, so only that process can cancel them.
+Blocking stores are read and written on one dedicated thread, which keeps
+SQLite off the event loop and applies writes and reads in submission order.
+"""
+import asyncio
+import logging
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+from models.roi_models import JobResponse, JobStatus
+from services.database import Database
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_TTL_SECONDS = 3600.0
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when too many jobs are already queued or running
+    """
+
+
+class Job(JobResponse):
+    """
+    Stored job state, including the result that is served separately from the status
+    """
+
+    result: Any = None
+    result_file: Optional[str] = None
+    media_type: Optional[str] = None
+    filename: Optional[str] = None
+
+
+class JobFile:
+    """
+    File result of a job, served as a download
+    """
+
+    __slots__ = ("path", "media_type", "filename")
+
+    def __init__(self, path: str, media_type: str, filename: Optional[str] = None):
+        self.path = str(path)
+        self.media_type = media_type
+        self.filename = filename
+
+
+class JobContext:
+    """
+    Handle passed to a job's work function for progress reporting
+    """
+
+    __slots__ = ("_manager", "_job")
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self._manager = manager
+        self._job = job
+
+    @property
+    def job_id(self) -> str:
+        return self._job.id
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        self._job.progress = min(max(fraction, 0.0), 1.0)
+        if message is not None:
+            self._job.message = message
+        self._manager._save(self._job)
+
+
+JobWork = Callable[[JobContext], Awaitable[Any]]
+
+
+class InMemoryJobStore:
+    """
+    Job store for a single worker process
+    """
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job.model_copy()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job is not None else None
+
+    def delete_expired(self, now: datetime) -> int:
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.expires_at is not None and job.expires_at <= now
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"jobs": len(self._jobs)}
+
+
+class SQLiteJobStore:
+    """
+    Job store in the analytics database, shared by all workers on the host
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    def save(self, job: Job) -> None:
+        self.database.execute(
+            """
+            INSERT INTO jobs (id, status, expires_at, payload) VALUES (?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                status = excluded.status, expires_at = excluded.expires_at, payload = excluded.payload
+            """,
+            (job.id, job.status.value, self._timestamp(job.expires_at), job.model_dump_json())
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self.database.query_one("SELECT payload FROM jobs WHERE id = ?", (job_id,))
+        return Job.model_validate_json(row["payload"]) if row is not None else None
+
+    def delete_expired(self, now: datetime) -> int:
+        return self.database.execute(
+            "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (self._timestamp(now),)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.database.query("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")
+        return {"jobs": sum(row["count"] for row in rows), "by_status": {row["status"]: row["count"] for row in rows}}
+
+    @staticmethod
+    def _timestamp(value: Optional[datetime]) -> Optional[str]:
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f") if value is not None else None
+
+
+class JobManager:
+    """
+    Runs submitted jobs on the event loop with bounded concurrency
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        max_concurrent: int = 4,
+        max_queued: int = 100,
+        result_ttl: float = DEFAULT_RESULT_TTL_SECONDS,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.store = store
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._clock = clock
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Jobs queued or running in this process
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+        # Single thread for blocking stores, so store calls run in the order they were made
+        self._store_executor: Optional[ThreadPoolExecutor] = None
+
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def submit(self, kind: str, work: JobWork) -> Job:
+        """
+        Queue ``work`` as a new job and return its initial state
+        """
+        if len(self._tasks) >= self.max_queued:
+            self.rejected += 1
+            raise JobQueueFull(f"{len(self._tasks)} jobs already queued or running")
+
+        job = Job(id=str(uuid.uuid4()), kind=kind, status=JobStatus.QUEUED, created_at=self._clock())
+        self._save(job)
+        self._tasks[job.id] = asyncio.create_task(self._execute(job, work))
+        self.submitted += 1
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self._run_store(self.store.get, job_id)
+
+    def owns(self, job_id: str) -> bool:
+        """
+        Whether the job is queued or running in this process
+        """
+        return job_id in self._tasks
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job; jobs this process doesn't own are returned unchanged
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        return await self.get(job_id)
+
+    async def start(self, cleanup_interval: float = 60.0) -> None:
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._run_cleanup(cleanup_interval))
+
+    async def stop(self) -> None:
+        """
+        Cancel unfinished jobs and stop the cleanup task
+        """
+        tasks = list(self._tasks.values())
+        if self._cleanup_task is not None:
+            tasks.append(self._cleanup_task)
+            self._cleanup_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Let the final job states reach the store before the thread goes away
+        if self._store_executor is not None:
+            await self._run_store(lambda: None)
+            self._store_executor.shutdown(wait=False)
+            self._store_executor = None
+
+    async def cleanup(self) -> int:
+        """
+        Discard jobs whose result TTL has passed; returns the number removed
+        """
+        return await self._run_store(self.store.delete_expired, self._clock())
+
+    async def stats(self) -> Dict[str, Any]:
+        store_stats = await self._run_store(self.store.stats)
+        return {
+            "store": self.store.name,
+            "active": len(self._tasks),
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "result_ttl": self.result_ttl,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            **store_stats,
+        }
+
+    def _save(self, job: Job) -> None:
+        """
+        Save a job's state without waiting for a blocking store
+        """
+        if not self.store.blocking:
+            self.store.save(job)
+            return
+        # The job keeps changing while the write is queued, so save a copy of its current state
+        future = self._executor().submit(self.store.save, job.model_copy())
+        future.add_done_callback(self._log_save_error)
+
+    async def _run_store(self, function: Callable[..., Any], *args: Any) -> Any:
+        if not self.store.blocking:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor(), function, *args)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._store_executor is None:
+            self._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        return self._store_executor
+
+    @staticmethod
+    def _log_save_error(future: Future) -> None:
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Saving job state failed: {str(error)}")
+
+    async def _execute(self, job: Job, work: JobWork) -> None:
+        try:
+            async with self._semaphore:
+                job.status = JobStatus.RUNNING
+                job.started_at = self._clock()
+                self._save(job)
+                outcome = await work(JobContext(self, job))
+            self._set_result(job, outcome)
+            self._finish(job, JobStatus.SUCCEEDED)
+        except asyncio.CancelledError:
+            self._finish(job, JobStatus.CANCELLED)
+        except ValueError as e:
+            self._finish(job, JobStatus.FAILED, str(e))
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            self._finish(job, JobStatus.FAILED, "Job failed")
+        finally:
+            self._tasks.pop(job.id, None)
+
+    def _set_result(self, job: Job, outcome: Any) -> None:
+        if isinstance(outcome, JobFile):
+            job.result_file = outcome.path
+            job.media_type = outcome.media_type
+            job.filename = outcome.filename
+        elif isinstance(outcome, BaseModel):
+            job.result = outcome.model_dump(mode="json")
+        else:
+            job.result = outcome
+        job.progress = 1.0
+        job.result_url = f"/api/jobs/{job.id}/result"
+
+    def _finish(self, job: Job, status: JobStatus, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = self._clock()
+        job.expires_at = job.finished_at + timedelta(seconds=self.result_ttl)
+        self._save(job)
+
+        counter = {JobStatus.SUCCEEDED: "succeeded", JobStatus.FAILED: "failed", JobStatus.CANCELLED: "cancelled"}
+        setattr(self, counter[status], getattr(self, counter[status]) + 1)
+
+    async def _run_cleanup(self, interval: float) -> None:
+        while True:
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    logger.info(f"Discarded {removed} expired jobs")
+            except Exception as e:
+                logger.error(f"Job cleanup failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+
+def create_job_store(backend: str, database: Database) -> Any:
+    """
+    Build the configured job store ("memory" or "sqlite")
+    """
+    if backend == "sqlite":
+        return SQLiteJobStore(database)
+    if backend == "memory":
+        return InMemoryJobStore()
+    raise ValueError(f"Unknown job store: {backend}")
@@ -0,0 +1,171 @@
+"""
+ROI report rendering with reportlab.
+
+``PDFService`` lays out one calculation as an A4 report: headline metrics,
+then (for the standard format) taxes, the expense breakdown and the
+insights, an optional cumulative profit chart and an optional table of
+monthly projections. It runs inside the PDF worker processes; the API
+process only checks ``is_available`` so it never loads reportlab itself.
+"""
+import importlib.util
+from typing import Any, Dict, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+try:
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+except ImportError:  # Optional dependency; without it is_available() is False and exports answer 503
+    SimpleDocTemplate = None
+
+# "summary" keeps the headline metrics only; "standard" adds taxes, breakdown and insights
+EXPORT_FORMATS = ("standard", "summary")
+
+# Headline metrics in report order: (label, metrics key, formatted_values key, suffix)
+HEADLINE_METRICS = (
+    ("ROI", "roi_percentage", None, "%"),
+    ("Net profit", "net_profit", "net_profit", ""),
+    ("Total revenue", "total_revenue", "total_revenue", ""),
+    ("Total expenses", "total_expenses", "total_expenses", ""),
+    ("Payback period", "payback_period_months", None, " months"),
+    ("IRR", "irr", None, "%"),
+    ("Net present value", "npv", "npv", ""),
+)
+
+TAX_ROWS = (
+    ("Corporate tax", "corporate_tax"),
+    ("VAT", "vat_tax"),
+    ("Payroll tax", "payroll_tax"),
+    ("Total tax", "total_tax"),
+    ("After-tax profit", "after_tax_profit"),
+)
+
+MESSAGE_SECTIONS = (
+    ("Insights", "insights"),
+    ("Recommendations", "recommendations"),
+    ("Risk factors", "risk_factors"),
+)
+
+
+def is_available() -> bool:
+    """
+    Whether reportlab can be imported, without importing it
+    """
+    return importlib.util.find_spec("reportlab") is not None
+
+
+def _number(value: Any, suffix: str = "") -> str:
+    if isinstance(value, (int, float)):
+        return f"{value:,.2f}{suffix}"
+    return "n/a" if value is None else f"{value}{suffix}"
+
+
+class PDFService:
+    """
+    Renders ROI reports to PDF files
+    """
+
+    def __init__(self):
+        if SimpleDocTemplate is None:
+            raise RuntimeError("PDF rendering requires reportlab")
+        self.styles = getSampleStyleSheet()
+
+    def generate_roi_report(
+        self,
+        output_path: str,
+        calculation_data: Dict[str, Any],
+        country_data: Dict[str, Any],
+        business_data: Dict[str, Any],
+        export_format: str = "standard",
+        include_charts: bool = True,
+        include_projections: bool = True
+    ) -> None:
+        """
+        Write the report for one calculation to ``output_path``
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"export_format must be one of {', '.join(EXPORT_FORMATS)}")
+
+        metrics = calculation_data.get("metrics") or {}
+        formatted = calculation_data.get("formatted_values") or {}
+        currency = calculation_data.get("currency_code") or ""
+        projections = calculation_data.get("monthly_projections") or []
+
+        business = business_data.get("name") or business_data.get("business_type") or "Business"
+        country = country_data.get("name") or country_data.get("code") or ""
+        story: List[Any] = [
+            Paragraph("ROI Report", self.styles["Title"]),
+            Paragraph(escape(f"{business} in {country}" if country else business), self.styles["Heading2"]),
+            Spacer(1, 4 * mm),
+            self._table([
+                (label, formatted.get(formatted_key) or _number(metrics.get(key), suffix))
+                for label, key, formatted_key, suffix in HEADLINE_METRICS
+            ]),
+        ]
+
+        if export_format == "standard":
+            taxes = calculation_data.get("tax_calculation") or {}
+            story += self._section("Taxes", self._table([
+                (label, formatted.get(key) or _number(taxes.get(key))) for label, key in TAX_ROWS
+            ]))
+            breakdown = calculation_data.get("expense_breakdown") or []
+            if breakdown:
+                story += self._section("Expense breakdown", self._table(
+                    [(item.get("category", ""), _number(item.get("amount")), _number(item.get("percentage"), "%"))
+                     for item in breakdown],
+                    header=("Category", f"Amount {currency}".strip(), "Share")
+                ))
+            for title, key in MESSAGE_SECTIONS:
+                messages = calculation_data.get(key) or []
+                if messages:
+                    story += self._section(title, *[
+                        Paragraph(f"&bull; {escape(str(message))}", self.styles["BodyText"]) for message in messages
+                    ])
+
+        if include_charts and projections:
+            story += self._section("Cumulative profit", self._cumulative_profit_chart(projections))
+
+        if include_projections and projections:
+            story += self._section("Monthly projections", self._table(
+                [(row.get("month"), _number(row.get("revenue")), _number(row.get("expenses")),
+                  _number(row.get("profit")), _number(row.get("cumulative_profit")))
+                 for row in projections],
+                header=("Month", "Revenue", "Expenses", "Profit", "Cumulative")
+            ))
+
+        SimpleDocTemplate(output_path, pagesize=A4, title=f"ROI Report - {business}").build(story)
+
+    def _section(self, title: str, *flowables: Any) -> List[Any]:
+        return [Spacer(1, 6 * mm), Paragraph(escape(title), self.styles["Heading3"]), *flowables]
+
+    def _table(self, rows: Sequence[Sequence[Any]], header: Optional[Sequence[str]] = None) -> "Table":
+        data = ([list(header)] if header else []) + [[str(cell) for cell in row] for row in rows]
+        table = Table(data, hAlign="LEFT")
+        style = [
+            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ]
+        if header:
+            style.append(("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"))
+        table.setStyle(TableStyle(style))
+        return table
+
+    def _cumulative_profit_chart(self, projections: Sequence[Dict[str, Any]]) -> "Drawing":
+        points = [
+            (float(row["month"]), float(row["cumulative_profit"]))
+            for row in projections
+            if row.get("month") is not None and row.get("cumulative_profit") is not None
+        ]
+        drawing = Drawing(170 * mm, 60 * mm)
+        plot = LinePlot()
+        plot.x, plot.y = 12 * mm, 8 * mm
+        plot.width, plot.height = 150 * mm, 48 * mm
+        plot.data = [points]
+        plot.lines[0].strokeColor = colors.HexColor("#2563eb")
+        drawing.add(plot)
+        return drawing
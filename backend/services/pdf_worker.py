@@ -0,0 +1,317 @@
+"""
+PDF report rendering off the event loop, with a content-addressed disk cache.
+
+Reports are rendered in a process pool so a slow reportlab/weasyprint render
+never blocks other requests. At most ``max_pending`` renders are queued or
+running at once; further requests are rejected instead of piling up, and a
+request gives up waiting after ``timeout`` seconds.
+
+Reports are rendered by ``services.pdf_service`` with reportlab. When
+reportlab is not installed the renderer is marked unavailable at startup and
+requests fail fast with ``PDFRendererUnavailable`` instead of failing in the
+worker.
+
+Finished reports are stored under the hash of everything that affects their
+content, so a repeat download is a plain file send. Identical concurrent
+requests share one render, and a render that outlives its request's timeout
+still lands in the cache for the retry. Files older than ``ttl_seconds`` are
+removed by a periodic cleanup.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 86400.0
+
+# Request fields that determine the rendered report; all of them reach the render function
+REPORT_FIELDS = (
+    "calculation_data", "country_data", "business_data",
+    "export_format", "include_charts", "include_projections"
+)
+
+# Render function run in a worker process: (output_path, report) -> None
+RenderFunction = Callable[[str, Dict[str, Any]], None]
+
+
+class PDFQueueFull(Exception):
+    """
+    Raised when the render queue is at capacity
+    """
+
+
+class PDFRenderTimeout(Exception):
+    """
+    Raised when a render does not finish within the request timeout
+    """
+
+
+class PDFRendererUnavailable(Exception):
+    """
+    Raised when the PDF rendering library is not installed
+    """
+
+
+_pdf_service = None
+
+
+def render_report(output_path: str, report: Dict[str, Any]) -> None:
+    """
+    Render one report with the PDF service to ``output_path``.
+    Runs in a worker process, which keeps its own PDFService.
+    """
+    global _pdf_service
+    if _pdf_service is None:
+        # Imported here so the API process never loads the rendering libraries
+        from services.pdf_service import PDFService
+        _pdf_service = PDFService()
+
+    _pdf_service.generate_roi_report(
+        output_path,
+        report["calculation_data"],
+        report["country_data"],
+        report["business_data"],
+        export_format=report["export_format"],
+        include_charts=report["include_charts"],
+        include_projections=report["include_projections"]
+    )
+
+
+def renderer_available() -> bool:
+    """
+    Whether the default render function's library is installed
+    """
+    from services.pdf_service import is_available
+    return is_available()
+
+
+def report_cache_key(report: Dict[str, Any]) -> str:
+    """
+    Stable hash of the report content fields, independent of key order
+    """
+    normalized = json.dumps(
+        {field: report.get(field) for field in REPORT_FIELDS},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class PDFReportRenderer:
+    """
+    Bounded process pool for PDF renders backed by an on-disk report cache
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        render: RenderFunction = render_report,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        timeout: float = 30.0,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        executor_factory: Optional[Callable[[int], Executor]] = None,
+        clock: Callable[[], float] = time.time,
+        available: Optional[bool] = None
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.render = render
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.ttl_seconds = ttl_seconds
+        self._executor_factory = executor_factory or (lambda workers: ProcessPoolExecutor(max_workers=workers))
+        self._clock = clock
+        # Custom render functions bring their own dependencies
+        self.available = available if available is not None else (render is not render_report or renderer_available())
+
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        # Renders queued or running, by cache key
+        self._inflight: Dict[str, "asyncio.Future[None]"] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.removed = 0
+
+    async def get_report(self, report: Dict[str, Any]) -> Tuple[Path, bool]:
+        """
+        Return the path of the rendered report and whether it came from the cache
+        """
+        key = report_cache_key(report)
+        path = self._path(key)
+        if self._is_fresh(path):
+            self.hits += 1
+            return path, True
+        if not self.available:
+            raise PDFRendererUnavailable("PDF rendering is not installed on this server")
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.rejected += 1
+                raise PDFQueueFull(f"{len(self._inflight)} PDF renders already pending")
+            self.misses += 1
+            future = self._submit(key, report)
+
+        try:
+            # Shielded so a timed-out request leaves the render running for the cache
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PDFRenderTimeout(f"PDF render did not finish within {self.timeout:g}s")
+        return path, False
+
+    async def start(self, cleanup_interval: Optional[float] = None) -> None:
+        """
+        Create the cache directory and start periodic cleanup of expired reports
+        """
+        if not self.available:
+            logger.warning("reportlab is not installed; PDF exports will answer 503")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if self._task is None:
+            interval = cleanup_interval or min(self.ttl_seconds, 3600.0)
+            self._task = asyncio.create_task(self._run_cleanup(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def cleanup(self) -> int:
+        """
+        Delete expired reports and stale partial files; returns the number removed
+        """
+        if not self.cache_dir.is_dir():
+            return 0
+
+        cutoff = self._clock() - self.ttl_seconds
+        removed = 0
+        for entry in self.cache_dir.iterdir():
+            if entry.suffix not in (".pdf", ".tmp"):
+                continue
+            try:
+                # Partial files of live renders are younger than the TTL
+                if entry.stat().st_mtime < cutoff:
+                    entry.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        self.removed += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        files = list(self.cache_dir.glob("*.pdf")) if self.cache_dir.is_dir() else []
+        return {
+            "available": self.available,
+            "cache_dir": str(self.cache_dir),
+            "cached_reports": len(files),
+            "cached_bytes": sum(self._size(path) for path in files),
+            "pending": len(self._inflight),
+            "max_pending": self.max_pending,
+            "max_workers": self.max_workers,
+            "timeout": self.timeout,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "removed": self.removed,
+        }
+
+    def _submit(self, key: str, report: Dict[str, Any]) -> "asyncio.Future[None]":
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Render to a unique temporary name and rename, so readers never see a partial file
+        temp_path = self.cache_dir / f"{key}.{uuid.uuid4().hex}.tmp"
+        payload = {field: report.get(field) for field in REPORT_FIELDS}
+
+        try:
+            future = asyncio.wrap_future(self._get_executor().submit(self.render, str(temp_path), payload))
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; replace it and retry once
+            self._reset_executor()
+            future = asyncio.wrap_future(self._get_executor().submit(self.render, str(temp_path), payload))
+
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, temp_path, done))
+        return future
+
+    def _finish(self, key: str, temp_path: Path, future: "asyncio.Future[None]") -> None:
+        self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None and temp_path.exists():
+            os.replace(temp_path, self._path(key))
+            return
+
+        if not future.cancelled():
+            self.failures += 1
+            logger.error(f"PDF render {key[:12]} failed: {future.exception()}")
+            if isinstance(future.exception(), BrokenProcessPool):
+                self._reset_executor()
+        temp_path.unlink(missing_ok=True)
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self._executor_factory(self.max_workers)
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    async def _run_cleanup(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                removed = await loop.run_in_executor(None, self.cleanup)
+                if removed:
+                    logger.info(f"Removed {removed} expired PDF reports")
+            except Exception as e:
+                logger.error(f"PDF cache cleanup failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
+
+    def _is_fresh(self, path: Path) -> bool:
+        try:
+            return path.stat().st_mtime >= self._clock() - self.ttl_seconds
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,240 @@
+"""
+Reference data registry for countries and business scenarios.
+
+The JSON catalogs in ``data/`` are parsed and validated into the Pydantic
+models once, then served from in-memory indexes, together with the FX rate
+table used for report currencies. A snapshot is swapped in
+atomically whenever the files change on disk, so readers never observe a
+half-loaded catalog.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from calculations.fx import FXRateTable
+from calculations.plans import CalculationPlan, CurrencyConversion, compile_plans
+from models.roi_models import BusinessScenario, BusinessTypeResponse, CountryResponse
+from services.scenario_search import ScenarioSearchIndex
+from utils.currency_format import CurrencyFormatterRegistry
+from utils.http_cache import CachedPayload
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+COUNTRIES_FILE = "countries.json"
+BUSINESS_SCENARIOS_FILE = "business_scenarios.json"
+FX_RATES_FILE = "fx_rates.json"
+
+_COUNTRY_LIST = TypeAdapter(List[CountryResponse])
+_BUSINESS_TYPE_LIST = TypeAdapter(List[BusinessTypeResponse])
+
+
+class ReferenceDataSnapshot:
+    """
+    Immutable, fully indexed view of one load of the reference data files
+    """
+
+    def __init__(
+        self,
+        countries: List[Dict[str, Any]],
+        business_types: List[Dict[str, Any]],
+        version: str,
+        mtimes: Tuple[Optional[int], ...],
+        fx_rates: Optional[Dict[str, Any]] = None
+    ):
+        self.version = version
+        self.mtimes = mtimes
+        self.loaded_at = time.time()
+
+        # Raw dicts are what ROICalculator consumes; models are what the API serves
+        self.countries = countries
+        self.business_types = business_types
+        self.country_models = [CountryResponse(**c) for c in countries]
+        self.business_type_models = [BusinessTypeResponse(**bt) for bt in business_types]
+
+        self.countries_by_code: Dict[str, Dict[str, Any]] = {c["code"]: c for c in countries}
+        self.country_models_by_code: Dict[str, CountryResponse] = {
+            c.code: c for c in self.country_models
+        }
+        self.business_types_by_id: Dict[str, Dict[str, Any]] = {bt["id"]: bt for bt in business_types}
+        self.business_type_models_by_id: Dict[str, BusinessTypeResponse] = {
+            bt.id: bt for bt in self.business_type_models
+        }
+
+        self.scenarios_by_key: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.scenario_models_by_key: Dict[Tuple[str, str], BusinessScenario] = {}
+        for bt, bt_model in zip(business_types, self.business_type_models):
+            for scenario, scenario_model in zip(bt["scenarios"], bt_model.scenarios):
+                key = (bt["id"], scenario["id"])
+                self.scenarios_by_key[key] = scenario
+                self.scenario_models_by_key[key] = scenario_model
+
+        self.search_index = ScenarioSearchIndex(business_types, self.business_type_models)
+
+        self.currency_formatters = CurrencyFormatterRegistry.from_countries(countries)
+
+        # Every (country, business type, scenario) combination, resolved for the calculator
+        self.plans: Dict[Tuple[str, str, str], CalculationPlan] = compile_plans(
+            countries, business_types, self.currency_formatters
+        )
+
+        # Plans reporting in another currency are derived on first use
+        self.fx_rates = FXRateTable.from_dict(fx_rates or {})
+        self._converted_plans: Dict[Tuple[str, str, str, str], CalculationPlan] = {}
+
+        # Catalog responses only change with the data, so serialize them once
+        self.countries_payload = CachedPayload(_COUNTRY_LIST.dump_json(self.country_models))
+        self.country_payloads_by_code: Dict[str, CachedPayload] = {
+            code: CachedPayload(model.model_dump_json().encode())
+            for code, model in self.country_models_by_code.items()
+        }
+        self.business_types_payload = CachedPayload(_BUSINESS_TYPE_LIST.dump_json(self.business_type_models))
+        self.business_type_payloads_by_id: Dict[str, CachedPayload] = {
+            bt_id: CachedPayload(model.model_dump_json().encode())
+            for bt_id, model in self.business_type_models_by_id.items()
+        }
+
+    def get_country(self, country_code: str) -> Optional[Dict[str, Any]]:
+        """Get raw country data by code"""
+        return self.countries_by_code.get(country_code)
+
+    def get_business_type(self, business_type_id: str) -> Optional[Dict[str, Any]]:
+        """Get raw business type data by ID"""
+        return self.business_types_by_id.get(business_type_id)
+
+    def get_scenario(self, business_type_id: str, scenario_id: str) -> Optional[Dict[str, Any]]:
+        """Get raw scenario data by (business type, scenario) pair"""
+        return self.scenarios_by_key.get((business_type_id, scenario_id))
+
+    def get_plan(
+        self,
+        country_code: str,
+        business_type_id: str,
+        scenario_id: str,
+        report_currency: Optional[str] = None
+    ) -> Optional[CalculationPlan]:
+        """
+        Get the compiled calculation plan for a (country, business type, scenario) combination,
+        converting results into ``report_currency`` if given; raises ValueError if it is unsupported
+        """
+        plan = self.plans.get((country_code, business_type_id, scenario_id))
+        if plan is None or not report_currency or report_currency == plan.currency_code:
+            return plan
+
+        key = plan.key + (report_currency,)
+        converted = self._converted_plans.get(key)
+        if converted is None:
+            conversion = CurrencyConversion(
+                plan.currency_code, report_currency, self.fx_rates, self.currency_formatters.get(report_currency)
+            )
+            converted = self._converted_plans.setdefault(key, plan.with_conversion(conversion))
+        return converted
+
+
+class ReferenceDataRegistry:
+    """
+    Loads reference data once and reloads it when the source files change
+    """
+
+    def __init__(self, data_dir: Optional[Path] = None, check_interval: float = 1.0):
+        self.data_dir = Path(data_dir) if data_dir else DATA_DIR
+        self.check_interval = check_interval
+        self._snapshot: Optional[ReferenceDataSnapshot] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def countries_path(self) -> Path:
+        return self.data_dir / COUNTRIES_FILE
+
+    @property
+    def business_scenarios_path(self) -> Path:
+        return self.data_dir / BUSINESS_SCENARIOS_FILE
+
+    @property
+    def fx_rates_path(self) -> Path:
+        return self.data_dir / FX_RATES_FILE
+
+    def snapshot(self) -> ReferenceDataSnapshot:
+        """
+        Get the current snapshot, reloading first if the files have changed
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load()
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            if self._current_mtimes() != snapshot.mtimes:
+                return self.load()
+
+        return snapshot
+
+    def load(self) -> ReferenceDataSnapshot:
+        """
+        Parse, validate and index the data files, then swap the snapshot in.
+        A reload that fails validation keeps serving the previous snapshot.
+        """
+        with self._lock:
+            mtimes = self._current_mtimes()
+            current = self._snapshot
+            if current is not None and current.mtimes == mtimes:
+                return current
+
+            try:
+                countries_bytes = self._read_bytes(self.countries_path)
+                scenarios_bytes = self._read_bytes(self.business_scenarios_path)
+                fx_rates_bytes = self._read_bytes(self.fx_rates_path)
+                countries = json.loads(countries_bytes)["countries"] if countries_bytes else []
+                business_types = json.loads(scenarios_bytes)["business_types"] if scenarios_bytes else []
+                fx_rates = json.loads(fx_rates_bytes) if fx_rates_bytes else {}
+
+                # Cached results are keyed by this version, so rate changes invalidate them too
+                version = hashlib.sha256(
+                    countries_bytes + b"\0" + scenarios_bytes + b"\0" + fx_rates_bytes
+                ).hexdigest()[:16]
+                snapshot = ReferenceDataSnapshot(countries, business_types, version, mtimes, fx_rates)
+            except Exception as e:
+                if current is None:
+                    raise
+                logger.error(f"Reference data reload failed, keeping version {current.version}: {str(e)}")
+                return current
+
+            self._snapshot = snapshot
+            self._last_check = time.monotonic()
+            logger.info(
+                f"Loaded reference data version {snapshot.version}: "
+                f"{len(countries)} countries, {len(business_types)} business types, "
+                f"FX rates {snapshot.fx_rates.version or 'unversioned'}"
+            )
+            return snapshot
+
+    def _current_mtimes(self) -> Tuple[Optional[int], ...]:
+        return (
+            self._mtime(self.countries_path),
+            self._mtime(self.business_scenarios_path),
+            self._mtime(self.fx_rates_path)
+        )
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read_bytes(path: Path) -> bytes:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            logger.error(f"Reference data file not found: {path}")
+            return b""
@@ -0,0 +1,295 @@
+"""
+Cache for ROI calculation results.
+
+A calculation is a pure function of the validated request and the reference
+data it was computed against, so results are keyed on a canonical hash of
+the normalized request plus the reference data version. Hits are returned
+with a freshly minted ``calculation_id`` and ``timestamp``.
+
+The default backend is an in-process LRU with a TTL; a Redis backend can be
+used to share results across workers. Redis calls use short socket timeouts
+and run on a worker thread from the async helpers, so a slow or unreachable
+Redis degrades to cache misses instead of stalling the event loop.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models.roi_models import ROICalculationRequest, ROIResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL_SECONDS = 900.0
+# Redis connect and read/write timeout; a lookup slower than this counts as a miss
+DEFAULT_REDIS_TIMEOUT = 0.25
+
+
+def canonical_request_key(
+    request: ROICalculationRequest,
+    data_version: str,
+    include_projections: bool = True
+) -> str:
+    """
+    Stable hash of a validated request and the reference data version.
+    Field order and int/float spelling of the submitted JSON do not matter.
+    """
+    normalized = json.dumps(
+        request.model_dump(mode="json"),
+        sort_keys=True,
+        separators=(",", ":"),
+        allow_nan=False
+    )
+    digest = hashlib.sha256()
+    digest.update(data_version.encode("utf-8"))
+    digest.update(b"|projections=1|" if include_projections else b"|projections=0|")
+    digest.update(normalized.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LocalCacheBackend:
+    """
+    Thread-safe in-process LRU cache with a per-entry time to live
+    """
+
+    name = "local"
+    # Lookups never wait on I/O, so they run inline on the event loop
+    blocking = False
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, ROIResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[ROIResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[ROIResponse]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: ROIResponse) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_many(self, items: Sequence[Tuple[str, ROIResponse]]) -> None:
+        for key, value in items:
+            self.set(key, value)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class RedisCacheBackend:
+    """
+    Shared cache backend storing serialized responses in Redis.
+    Expiry and eviction are left to Redis (``EX`` and its maxmemory policy).
+    """
+
+    name = "redis"
+    # Network round trips run on a worker thread, off the event loop
+    blocking = True
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        prefix: str = "amplifyroi:roi:",
+        client: Any = None,
+        timeout: float = DEFAULT_REDIS_TIMEOUT
+    ):
+        if client is None:
+            import redis  # Optional dependency, only needed for the shared backend
+
+            client = redis.Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
+
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def get(self, key: str) -> Optional[ROIResponse]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[ROIResponse]]:
+        if not keys:
+            return []
+        raws = self.client.mget([self.prefix + key for key in keys])
+        return [None if raw is None else ROIResponse.model_validate_json(raw) for raw in raws]
+
+    def set(self, key: str, value: ROIResponse) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Sequence[Tuple[str, ROIResponse]]) -> None:
+        ttl = max(1, int(self.ttl_seconds))
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items:
+            pipeline.set(self.prefix + key, value.model_dump_json(), ex=ttl)
+        pipeline.execute()
+
+    def clear(self) -> int:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ttl_seconds": self.ttl_seconds, "prefix": self.prefix, "timeout": self.timeout}
+
+
+class ResultCache:
+    """
+    Calculation result cache with hit/miss counters over a pluggable backend.
+    Backend failures and timeouts are logged and treated as misses so a cache
+    outage never fails a calculation. Async handlers use the ``*_async``
+    methods, which move blocking backends off the event loop.
+    """
+
+    def __init__(self, backend: Any = None, enabled: bool = True):
+        self.backend = backend if backend is not None else LocalCacheBackend()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[ROIResponse]:
+        """
+        Get a cached result re-stamped with a new id and timestamp
+        """
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[ROIResponse]]:
+        """
+        Look up several keys in one backend round trip
+        """
+        if not self.enabled or not keys:
+            return [None] * len(keys)
+
+        try:
+            cached = self.backend.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Result cache read failed: {str(e)}")
+            self._count("errors")
+            cached = [None] * len(keys)
+
+        hits = sum(value is not None for value in cached)
+        self._count("hits", hits)
+        self._count("misses", len(keys) - hits)
+        return [
+            None if value is None
+            else value.model_copy(update={"calculation_id": str(uuid.uuid4()), "timestamp": datetime.utcnow()})
+            for value in cached
+        ]
+
+    def set(self, key: str, value: ROIResponse) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Sequence[Tuple[str, ROIResponse]]) -> None:
+        if not self.enabled or not items:
+            return
+
+        try:
+            self.backend.set_many(items)
+        except Exception as e:
+            logger.warning(f"Result cache write failed: {str(e)}")
+            self._count("errors")
+
+    async def get_async(self, key: str) -> Optional[ROIResponse]:
+        return (await self.get_many_async([key]))[0]
+
+    async def get_many_async(self, keys: Sequence[str]) -> List[Optional[ROIResponse]]:
+        if self.enabled and self.backend.blocking:
+            return await asyncio.to_thread(self.get_many, keys)
+        return self.get_many(keys)
+
+    async def set_async(self, key: str, value: ROIResponse) -> None:
+        await self.set_many_async([(key, value)])
+
+    async def set_many_async(self, items: Sequence[Tuple[str, ROIResponse]]) -> None:
+        if self.enabled and self.backend.blocking:
+            await asyncio.to_thread(self.set_many, items)
+        else:
+            self.set_many(items)
+
+    def clear(self) -> int:
+        return self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                "enabled": self.enabled,
+                "backend": self.backend.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+        counters.update(self.backend.stats())
+        return counters
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+
+def create_result_cache(
+    url: Optional[str] = None,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    enabled: bool = True
+) -> ResultCache:
+    """
+    Build a result cache, using Redis when a URL is configured
+    """
+    if url:
+        try:
+            return ResultCache(RedisCacheBackend(url, ttl_seconds), enabled)
+        except Exception as e:
+            logger.warning(f"Redis result cache unavailable, using local cache: {str(e)}")
+    return ResultCache(LocalCacheBackend(max_entries, ttl_seconds), enabled)
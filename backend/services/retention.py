@@ -0,0 +1,237 @@
+"""
+Retention policies and bounded-time purges for the analytics tables.
+
+Deletes run in small batches selected by rowid, each in its own short
+transaction on a worker thread, with a pause between batches so the
+analytics writer and admin readers are never locked out for long. After a
+purge, freed pages are returned to the OS with ``PRAGMA incremental_vacuum``
+when the database was created with incremental auto-vacuum.
+
+Rollups are kept when old events age out, so dashboard history survives
+retention; explicitly clearing a data type resets its rollups as well.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from services import analytics_rollups
+from services.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Tables cleared for each ``clear`` data type
+CLEARABLE_TABLES = {
+    "analytics": ("analytics",),
+    "submissions": ("email_submissions",),
+    "exports": ("pdf_exports",),
+    "all": ("analytics", "email_submissions", "pdf_exports"),
+}
+
+# PRAGMA auto_vacuum value for incremental mode
+AUTO_VACUUM_INCREMENTAL = 2
+
+HISTORY_SIZE = 50
+
+
+class PurgeRun:
+    """
+    Progress and timing of one purge; "queued" while it waits for another purge to finish
+    """
+
+    __slots__ = ("table", "reason", "status", "deleted", "batches", "started_at", "seconds", "reclaimed_pages", "error")
+
+    def __init__(self, table: str, reason: str):
+        self.table = table
+        self.reason = reason
+        self.status = "queued"
+        self.deleted = 0
+        self.batches = 0
+        self.started_at = datetime.utcnow()
+        self.seconds = 0.0
+        self.reclaimed_pages = 0
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RetentionManager:
+    """
+    Enforces per-table retention periods in the background and runs batched purges
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        policies: Dict[str, Optional[int]],
+        batch_size: int = 1000,
+        pause: float = 0.01,
+        interval: float = 3600.0,
+        vacuum_pages: int = 1000
+    ):
+        self.database = database
+        # Days to keep rows of each table; None keeps them indefinitely
+        self.policies = policies
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self.vacuum_pages = vacuum_pages
+
+        self.runs: List[PurgeRun] = []
+        self._task: Optional[asyncio.Task] = None
+        # One purge at a time keeps lock hold times predictable
+        self._purge_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self._task is None and any(days is not None for days in self.policies.values()):
+            self._purge_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def enforce_policies(self, now: Optional[datetime] = None) -> List[PurgeRun]:
+        """
+        Delete rows older than each table's retention period
+        """
+        now = now or datetime.utcnow()
+        runs = []
+        for table, days in self.policies.items():
+            if days is None:
+                continue
+            cutoff = (now - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+            runs.append(await self.purge(table, "timestamp < ?", (cutoff,), f"retention: {days} days"))
+        return runs
+
+    async def clear(self, data_type: str) -> int:
+        """
+        Delete every row of a data type that exists now, and reset its rollups
+        """
+        if data_type not in CLEARABLE_TABLES:
+            raise ValueError(f"Invalid data type: {data_type}")
+
+        tables = CLEARABLE_TABLES[data_type]
+        # Bound the purge by the current max rowid so events written meanwhile are kept
+        limits = await self._in_thread(self._reset_and_snapshot, tables)
+
+        deleted = 0
+        for table in tables:
+            run = await self.purge(table, "rowid <= ?", (limits[table],), f"clear: {data_type}")
+            deleted += run.deleted
+        return deleted
+
+    async def forget_email(self, email: str) -> int:
+        """
+        Delete all submissions and queued or sent report emails for an address (GDPR erasure request)
+        """
+        run = await self.purge("email_submissions", "email = ?", (email,), "erasure request")
+        await self.purge("email_outbox", "recipient = ?", (email,), "erasure request")
+        return run.deleted
+
+    async def purge(self, table: str, where: str, params: Sequence[Any], reason: str) -> PurgeRun:
+        """
+        Delete matching rows in rowid batches, yielding between batches
+        """
+        run = PurgeRun(table, reason)
+        self._record(run)
+
+        async with self._purge_lock:
+            run.status = "running"
+            run.started_at = datetime.utcnow()
+            started = time.perf_counter()
+            try:
+                while True:
+                    deleted = await self._in_thread(self._delete_batch, table, where, params)
+                    run.deleted += deleted
+                    run.batches += 1
+                    run.seconds = time.perf_counter() - started
+                    if deleted < self.batch_size:
+                        break
+                    await asyncio.sleep(self.pause)
+
+                if run.deleted:
+                    run.reclaimed_pages = await self._in_thread(self._incremental_vacuum)
+                run.status = "completed"
+            except Exception as e:
+                run.status = "failed"
+                run.error = str(e)
+                logger.error(f"Purge of {table} failed after {run.deleted} rows: {str(e)}")
+            finally:
+                run.seconds = time.perf_counter() - started
+
+        logger.info(f"Purged {run.deleted} rows from {table} ({reason}) in {run.seconds:.2f}s")
+        return run
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "policies": self.policies,
+            "batch_size": self.batch_size,
+            "interval": self.interval,
+            "running": self._task is not None and not self._task.done(),
+            "runs": [run.to_dict() for run in reversed(self.runs)],
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.enforce_policies()
+            except Exception as e:
+                logger.error(f"Retention run failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def _in_thread(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def _delete_batch(self, table: str, where: str, params: Sequence[Any]) -> int:
+        with self.database.transaction() as conn:
+            return conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)",
+                (*params, self.batch_size)
+            ).rowcount
+
+    def _reset_and_snapshot(self, tables: Sequence[str]) -> Dict[str, int]:
+        with self.database.transaction() as conn:
+            analytics_rollups.reset(conn, tables)
+            return {
+                table: conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+                for table in tables
+            }
+
+    def _incremental_vacuum(self) -> int:
+        """
+        Return free pages to the OS, a bounded number per call
+        """
+        conn = self.database.connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            return 0
+
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+        return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def _record(self, run: PurgeRun) -> None:
+        self.runs.append(run)
+        del self.runs[:-HISTORY_SIZE]
+
+
+def policies_from_env(environ: Dict[str, str]) -> Dict[str, Optional[int]]:
+    """
+    Retention days per table from RETENTION_*_DAYS settings; unset, empty or 0 keeps rows forever
+    """
+    def days(name: str) -> Optional[int]:
+        value = environ.get(name, "").strip()
+        return int(value) if value and int(value) > 0 else None
+
+    return {
+        "analytics": days("RETENTION_ANALYTICS_DAYS"),
+        "email_submissions": days("RETENTION_SUBMISSIONS_DAYS"),
+        "pdf_exports": days("RETENTION_EXPORTS_DAYS"),
+    }
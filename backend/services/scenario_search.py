@@ -0,0 +1,190 @@
+"""
+Full-text search over the business scenario catalog.
+
+The index is built once per reference data snapshot: every scenario is a
+document made of its own name and description and its business type's name
+and description, with per-field weights. Queries are scored with BM25 over
+the weighted term frequencies, so a query only touches the postings of its
+terms and the cost does not grow with the catalog.
+
+For type-ahead, the last query term also matches index terms it is a prefix
+of (found by bisecting the sorted vocabulary), at a discount to exact matches.
+"""
+import bisect
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.roi_models import BusinessScenario, BusinessTypeResponse, SearchResponse, SearchResult
+
+# Relative weight of each field's terms
+FIELD_WEIGHTS = (
+    ("scenario_name", 3.0),
+    ("business_type_name", 2.0),
+    ("scenario_description", 1.0),
+    ("business_type_description", 0.5),
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multiplier for a prefix match relative to an exact term match
+PREFIX_DISCOUNT = 0.7
+MIN_PREFIX_LENGTH = 2
+# Cap on vocabulary terms a single prefix can expand to
+MAX_PREFIX_EXPANSIONS = 50
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+
+def normalize_term(term: str) -> str:
+    """
+    Light plural folding so "subscriptions" matches "subscription"
+    """
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased, accent-folded terms. Hyphenated words yield their parts and the
+    joined word, so "E-commerce" matches "e-commerce", "ecommerce" and "commerce".
+    """
+    folded = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    terms = []
+    for word in _WORD.findall(folded):
+        parts = re.split(r"[-']", word)
+        terms.extend(normalize_term(part) for part in parts)
+        if len(parts) > 1:
+            terms.append(normalize_term("".join(parts)))
+    return terms
+
+
+class ScenarioSearchIndex:
+    """
+    Inverted index with BM25 scoring over one snapshot of the scenario catalog
+    """
+
+    def __init__(
+        self,
+        business_types: Sequence[Dict[str, Any]],
+        business_type_models: Sequence[BusinessTypeResponse]
+    ):
+        # One document per scenario: (business type model, scenario model, category, business type id)
+        self.documents: List[Tuple[BusinessTypeResponse, BusinessScenario, str, str]] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+
+        lengths = []
+        for bt, bt_model in zip(business_types, business_type_models):
+            for scenario, scenario_model in zip(bt["scenarios"], bt_model.scenarios):
+                doc_id = len(self.documents)
+                self.documents.append((bt_model, scenario_model, bt_model.category.value, bt["id"]))
+
+                fields = {
+                    "scenario_name": scenario["name"],
+                    "business_type_name": bt["name"],
+                    "scenario_description": scenario["description"],
+                    "business_type_description": bt["description"],
+                }
+                frequencies: Counter = Counter()
+                length = 0.0
+                for field, weight in FIELD_WEIGHTS:
+                    terms = tokenize(fields[field])
+                    length += weight * len(terms)
+                    for term in terms:
+                        frequencies[term] += weight
+                lengths.append(length)
+                for term, frequency in frequencies.items():
+                    self.postings[term].append((doc_id, frequency))
+
+        count = len(self.documents)
+        average_length = (sum(lengths) / count) if count else 0.0
+        # Per-document part of the BM25 denominator
+        self._length_norms = [
+            BM25_K1 * (1 - BM25_B + BM25_B * (length / average_length if average_length else 0.0))
+            for length in lengths
+        ]
+        self._idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        self._vocabulary = sorted(self.postings)
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        business_type: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT
+    ) -> SearchResponse:
+        """
+        Rank scenarios for a query, optionally filtered by category and business type
+        """
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+        filters: Dict[str, Any] = {}
+        if category:
+            filters["category"] = category
+        if business_type:
+            filters["business_type"] = business_type
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        # A query still being typed ends mid-word; its last term may be a prefix
+        prefix_term = terms[-1] if terms and query[-1:].isalnum() else None
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            best: Dict[int, float] = {}
+            for candidate, factor in self._expand(term, term == prefix_term):
+                idf = self._idf[candidate]
+                for doc_id, frequency in self.postings[candidate]:
+                    score = factor * idf * frequency * (BM25_K1 + 1) / (frequency + self._length_norms[doc_id])
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            for doc_id, score in best.items():
+                scores[doc_id] += score
+
+        ranked = []
+        for doc_id, score in scores.items():
+            _, _, doc_category, doc_business_type = self.documents[doc_id]
+            if category and doc_category != category:
+                continue
+            if business_type and doc_business_type != business_type:
+                continue
+            ranked.append((score, doc_id))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+
+        top_score = ranked[0][0] if ranked else 0.0
+        results = [
+            SearchResult(
+                business_type=self.documents[doc_id][0],
+                scenario=self.documents[doc_id][1],
+                # Relative to the best match, so the top result scores 1
+                relevance_score=round(score / top_score, 4)
+            )
+            for score, doc_id in ranked[:limit]
+        ]
+        return SearchResponse(results=results, total=len(ranked), query=query, filters_applied=filters)
+
+    def _expand(self, term: str, allow_prefix: bool) -> List[Tuple[str, float]]:
+        """
+        Index terms matching a query term, with their score factor
+        """
+        matches = [(term, 1.0)] if term in self.postings else []
+        if allow_prefix and len(term) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for candidate in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    matches.append((candidate, PREFIX_DISCOUNT))
+        return matches
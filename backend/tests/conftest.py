@@ -1,6 +1,7 @@
 import pytest
 import os
 import sys
+import uuid
 from fastapi.testclient import TestClient
 
 # Add the backend directory to the Python path
@@ -13,6 +14,38 @@ def client():
     from main import app
     return TestClient(app)
 
+@pytest.fixture(scope="session")
+def snapshot():
+    """The bundled reference data"""
+    from services.reference_data import ReferenceDataRegistry
+    return ReferenceDataRegistry().snapshot()
+
+@pytest.fixture(scope="session")
+def plan(snapshot):
+    """Calculation plan for the US micro SaaS case"""
+    return snapshot.get_plan("US", "saas", "micro_saas")
+
+def make_request(**overrides):
+    """Build a calculation request for the US print-on-demand scenario"""
+    from models.roi_models import ROICalculationRequest
+    values = {
+        "country": "US", "business_type": "ecommerce", "scenario": "print_on_demand",
+        "monthly_revenue": 5000, "operating_expenses": 0
+    }
+    return ROICalculationRequest(**{**values, **overrides})
+
+def insert_events(database, events):
+    """Insert events and fold them into the rollups as the write queue does"""
+    from services import analytics_rollups
+    with database.transaction() as conn:
+        for table, row in events:
+            columns = ["id", *row]
+            conn.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                (str(uuid.uuid4()), *row.values())
+            )
+        analytics_rollups.apply_events(conn, events)
+
 @pytest.fixture
 def mock_data():
     """Provide mock data for tests"""
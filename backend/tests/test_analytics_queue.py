@@ -0,0 +1,86 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+from services.analytics_queue import AnalyticsWriteQueue
+from services.database import Database
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Migrated analytics database in a temporary directory"""
+    database = Database(str(tmp_path / "analytics.db"))
+    database.migrate()
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def db_path(database):
+    return database.path
+
+
+def count_rows(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def log_calculation(queue, index):
+    return queue.log_calculation(
+        country_code="US", business_type="saas", scenario_id="micro_saas",
+        calculation_data={"monthly_revenue": index}, session_id="s",
+        ip_address="127.0.0.1", user_agent="test"
+    )
+
+
+@pytest.mark.asyncio
+async def test_events_are_written_in_batches(database, db_path):
+    """Test queued events are flushed in batches and serialized by the writer"""
+    queue = AnalyticsWriteQueue(database, batch_size=50, flush_interval=0.01)
+    await queue.start()
+
+    for index in range(120):
+        log_calculation(queue, index)
+    queue.log_pdf_export(calculation_id="c", export_type="standard", file_size=10, session_id="s")
+    await asyncio.sleep(0.1)
+
+    assert count_rows(db_path, "analytics") == 120
+    assert count_rows(db_path, "pdf_exports") == 1
+    assert queue.stats()["batches"] < 121
+
+    conn = sqlite3.connect(db_path)
+    stored = conn.execute("SELECT calculation_data FROM analytics LIMIT 1").fetchone()[0]
+    conn.close()
+    assert "monthly_revenue" in json.loads(stored)
+
+    await queue.stop()
+
+
+def test_full_queue_drops_and_counts(database, db_path):
+    """Test a full queue drops new events instead of blocking"""
+    queue = AnalyticsWriteQueue(database, max_size=5)
+
+    results = [log_calculation(queue, index) for index in range(8)]
+
+    assert results.count(False) == 3
+    assert queue.stats()["dropped"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_pending_events(database, db_path):
+    """Test shutdown flushes everything queued, including events from before start"""
+    queue = AnalyticsWriteQueue(database, batch_size=1000, flush_interval=60)
+    log_calculation(queue, 0)
+    await queue.start()
+    for index in range(1, 10):
+        log_calculation(queue, index)
+
+    await queue.stop()
+
+    assert count_rows(db_path, "analytics") == 10
+    assert not log_calculation(queue, 11)
+    assert queue.stats()["written"] == 10
@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+
+import pytest
+from services import analytics_rollups
+from services.analytics_service import AnalyticsService
+from services.database import Database
+from tests.conftest import insert_events
+
+CALCULATIONS = [
+    {"timestamp": "2025-01-01 10:15:00", "country_code": "US", "business_type": "saas",
+     "scenario_id": "micro_saas", "session_id": "a", "roi_percentage": 30.0},
+    {"timestamp": "2025-01-01 11:30:00", "country_code": "US", "business_type": "saas",
+     "scenario_id": "micro_saas", "session_id": "a", "roi_percentage": 50.0},
+    {"timestamp": "2025-01-03 10:00:00", "country_code": "GB", "business_type": "ecommerce",
+     "scenario_id": "dropshipping", "session_id": "b", "roi_percentage": None},
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Migrated temporary database with sample events"""
+    database = Database(str(tmp_path / "analytics.db"))
+    database.migrate()
+    insert_events(database, [("analytics", row) for row in CALCULATIONS] + [
+        ("email_submissions", {"timestamp": "2025-01-01 12:00:00", "email": "x@y.z", "calculation_id": "c"}),
+    ])
+    yield database
+    database.close()
+
+
+def test_summary_from_rollups(database):
+    """Test the dashboard summary is answered from the rollup tables"""
+    summary = AnalyticsService(database).get_analytics_summary()
+
+    assert summary.total_calculations == 3
+    assert summary.unique_visitors == 2
+    assert summary.popular_countries[0] == {"country_code": "US", "count": 2}
+    assert summary.popular_scenarios[0] == {"business_type": "saas", "scenario_id": "micro_saas", "count": 2}
+    assert summary.average_roi == 40
+    assert summary.date_range["start"].day == 1 and summary.date_range["end"].day == 3
+    assert summary.conversion_metrics["email_conversion_rate"] == pytest.approx(100 / 3)
+
+
+def test_backfill_matches_incremental_rollups(database):
+    """Test rebuilding the rollups from stored events gives the same aggregates"""
+    query = "SELECT period, bucket, dimension, value, count FROM analytics_rollups ORDER BY 1, 2, 3, 4"
+    incremental = [tuple(row) for row in database.query(query)]
+
+    with database.transaction() as conn:
+        conn.execute("DELETE FROM analytics_rollups")
+        conn.execute("DELETE FROM analytics_rollup_totals")
+        analytics_rollups.backfill(conn)
+
+    assert [tuple(row) for row in database.query(query)] == incremental
+    assert AnalyticsService(database).get_analytics_summary().average_roi == 40
+
+
+def test_timeseries_buckets(database):
+    """Test hourly and daily rollups are returned oldest first"""
+    service = AnalyticsService(database)
+
+    daily = service.get_timeseries("day")
+    assert [bucket["bucket"] for bucket in daily] == ["2025-01-01", "2025-01-03"]
+    assert daily[0]["calculations"] == 2 and daily[0]["unique_visitors"] == 1
+    assert len(service.get_timeseries("hour")) == 3
+
+    with pytest.raises(ValueError):
+        service.get_timeseries("week")
+
+
+def insert_submissions(database, count):
+    insert_events(database, [
+        ("email_submissions", {
+            "timestamp": f"2025-02-{1 + index // 10:02d} 09:00:00", "email": f"user{index}@example.com",
+            "calculation_id": f"calc-{index}", "country_code": "US" if index % 2 else "GB"
+        })
+        for index in range(count)
+    ])
+
+
+def test_keyset_pagination_walks_all_rows(database):
+    """Test following cursors visits every row once, newest first"""
+    insert_submissions(database, 25)
+    service = AnalyticsService(database)
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = service.list_rows("email_submissions", limit=10, cursor=cursor, country_code="US")
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert len(seen) == 12
+    assert len({row["id"] for row in seen}) == 12
+    keys = [(row["timestamp"], row["id"]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_listing_rejects_bad_input(database):
+    """Test invalid cursors, filters and page sizes raise ValueError"""
+    service = AnalyticsService(database)
+
+    with pytest.raises(ValueError):
+        service.list_rows("email_submissions", cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        service.list_rows("pdf_exports", country_code="US")
+    with pytest.raises(ValueError):
+        service.list_rows("email_submissions", limit=0)
+
+
+def test_stream_rows_as_ndjson_and_csv(database):
+    """Test streamed exports contain every filtered row"""
+    insert_submissions(database, 1200)
+    service = AnalyticsService(database)
+
+    chunks = list(service.stream_rows("email_submissions", "ndjson", start="2025-02-01"))
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert len(chunks) > 1
+    assert len(lines) == 1200
+    assert json.loads(lines[0])["timestamp"] >= json.loads(lines[-1])["timestamp"]
+
+    rows = list(csv.reader(io.StringIO(b"".join(service.stream_rows("email_submissions", "csv")).decode("utf-8"))))
+    assert rows[0][0] == "id"
+    assert len(rows) == 1 + 1201
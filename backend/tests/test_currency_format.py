@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from utils import currency_format
+from utils.currency_format import CurrencyFormatter, CurrencyFormatterRegistry
+
+NBSP = "\xa0"
+
+
+@pytest.fixture
+def registry(snapshot):
+    """A fresh formatter registry over the bundled currencies"""
+    return CurrencyFormatterRegistry(snapshot.currency_formatters.currencies)
+
+
+def test_default_layout():
+    """Test symbols, signs and decimal places in the en-US layout"""
+    usd = CurrencyFormatter("USD", "$")
+    assert usd.format(1234.5) == "$1,234.50"
+    assert usd.format(-5) == "-$5.00"
+    assert usd.format(-0.004) == "$0.00"
+    assert CurrencyFormatter("JPY", "¥", 0).format(1234567.6) == "¥1,234,568"
+    assert CurrencyFormatter("CHF", "CHF").format(1234) == f"CHF{NBSP}1,234.00"
+
+
+def test_format_many_matches_format():
+    """Test bulk formatting of an array gives the same strings as one-by-one formatting"""
+    formatter = CurrencyFormatter("EUR", "€")
+    amounts = np.array([[0.0, 1e6], [-2500.125, 99.999]])
+
+    assert formatter.format_many(amounts) == [formatter.format(value) for value in amounts.ravel()]
+    with pytest.raises(ValueError):
+        formatter.format_many([1.0, float("nan")])
+    with pytest.raises(ValueError):
+        formatter.format(float("inf"))
+
+
+def test_custom_layout_regroups_and_translates():
+    """Test layouts with other separators and non-uniform digit grouping"""
+    layout = {
+        "prefixes": ("\xa4", "-\xa4"),
+        "suffixes": ("", ""),
+        "group": ".",
+        "decimal": ",",
+        "grouping": (3, 2),
+    }
+    formatter = CurrencyFormatter("INR", "₹", 2, "xx_XX", layout)
+
+    assert formatter.format(12345678.9) == "₹1.23.45.678,90"
+    assert formatter.format(-999) == "-₹999,00"
+
+    suffixed = CurrencyFormatter("EUR", "€", 2, "xx_XX", {**layout, "prefixes": ("", "-"),
+                                                          "suffixes": (" \xa4", " \xa4"),
+                                                          "grouping": (1000, 1000)})
+    assert suffixed.format(-1234.5) == "-1234,50 €"
+
+
+def test_registry_caches_formatters(registry):
+    """Test formatters are created once per currency and locale"""
+    usd = registry.get("usd")
+    assert usd is registry.get("USD", "en_US")
+    assert registry.format_many([10, -10], "KRW") == ["₩10", "-₩10"]
+    assert registry.stats()["formatters"] == 2
+
+
+def test_registry_rejects_unknown_input(registry):
+    """Test unknown currencies and malformed locales raise ValueError"""
+    with pytest.raises(ValueError):
+        registry.get("XYZ")
+    with pytest.raises(ValueError):
+        registry.get("USD", "not a locale")
+
+
+def test_registry_cache_is_bounded(registry, monkeypatch):
+    """Test formatters beyond the cache limit are still returned but not kept"""
+    monkeypatch.setattr(currency_format, "MAX_CACHED_FORMATTERS", 1)
+
+    registry.get("USD")
+    registry.get("EUR")
+
+    assert registry.stats()["formatters"] == 1
+
+
+def test_plans_use_registry_formatters(snapshot):
+    """Test compiled plans share the snapshot's default-locale formatters"""
+    plan = snapshot.get_plan("DE", "saas", "micro_saas")
+    assert plan.country.formatter is snapshot.currency_formatters.get("EUR")
+
+
+def test_babel_locale_layout(registry):
+    """Test locale patterns and separators come from Babel when it is installed"""
+    pytest.importorskip("babel")
+
+    assert registry.get("EUR", "de_DE").format(1234.5) == f"1.234,50{NBSP}€"
+    assert registry.get("INR", "en_IN").format(1234567) == "₹12,34,567.00"
+    with pytest.raises(ValueError):
+        registry.get("USD", "zz_ZZ")
@@ -0,0 +1,47 @@
+import threading
+
+from services.database import MIGRATIONS, Database
+
+
+def test_migrate_is_idempotent_and_versioned(tmp_path):
+    """Test migrations run once, set user_version and enable WAL"""
+    database = Database(str(tmp_path / "analytics.db"))
+
+    assert database.migrate() == MIGRATIONS[-1][0]
+    assert database.migrate() == MIGRATIONS[-1][0]
+    assert database.query_one("PRAGMA journal_mode")[0] == "wal"
+
+    indexes = {row["name"] for row in database.query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_analytics_timestamp", "idx_analytics_country_code", "idx_pdf_exports_timestamp_id"} <= indexes
+    database.close()
+
+
+def test_connections_are_per_thread(tmp_path):
+    """Test each thread reuses its own connection"""
+    database = Database(str(tmp_path / "analytics.db"))
+    main_connection = database.connection()
+    other = []
+
+    thread = threading.Thread(target=lambda: other.append(database.connection()))
+    thread.start()
+    thread.join()
+
+    assert database.connection() is main_connection
+    assert other[0] is not main_connection
+    database.close()
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    """Test a failing transaction leaves no partial writes"""
+    database = Database(str(tmp_path / "analytics.db"))
+    database.migrate()
+
+    try:
+        with database.transaction() as conn:
+            conn.execute("INSERT INTO pdf_exports (id, calculation_id) VALUES ('a', 'c')")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    assert database.query_one("SELECT COUNT(*) FROM pdf_exports")[0] == 0
+    database.close()
@@ -0,0 +1,139 @@
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+from models.roi_models import EmailConfig
+from services.database import Database
+from services.email_queue import DEAD, SENT, EmailDeliveryQueue, is_permanent_failure, roi_report_message
+
+CONFIG = EmailConfig(
+    smtp_host="localhost", smtp_port=2525, smtp_username="", smtp_password="", from_email="reports@example.com"
+)
+
+
+class FakeSMTP:
+    """SMTP stand-in that records messages and fails recipients on demand"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.messages = []
+        self.closed = False
+
+    def send_message(self, message):
+        failure = self.failures.pop(message["To"], None)
+        if failure is not None:
+            raise failure
+        self.messages.append(message)
+
+    def noop(self):
+        return 250, b"OK"
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    """Queue over a migrated database with a fake relay and a controllable clock"""
+    database = Database(str(tmp_path / "email.db"))
+    database.migrate()
+    now = [datetime(2025, 1, 1, 12, 0, 0)]
+    failures = {}
+    connections = []
+
+    def connect():
+        connections.append(FakeSMTP(failures))
+        return connections[-1]
+
+    queue = EmailDeliveryQueue(
+        database, CONFIG, batch_size=10, max_attempts=3, base_delay=30,
+        smtp_factory=connect, clock=lambda: now[0]
+    )
+    yield queue, database, now, failures, connections
+    database.close()
+
+
+def status(database, delivery_id):
+    return database.query_one("SELECT status, attempts FROM email_outbox WHERE id = ?", (delivery_id,))
+
+
+@pytest.mark.asyncio
+async def test_batch_is_sent_over_one_connection(outbox):
+    """Test a batch reuses one SMTP session and records each delivery"""
+    queue, database, _, _, connections = outbox
+    ids = [await queue.enqueue(f"user{index}@example.com", "Report", "Body") for index in range(3)]
+
+    assert queue.deliver_due() == 3
+    assert len(connections) == 1 and len(connections[0].messages) == 3
+    assert connections[0].messages[0]["From"] == "AmplifyROI Calculator <reports@example.com>"
+    assert [status(database, delivery_id)["status"] for delivery_id in ids] == [SENT] * 3
+    assert queue.get_delivery(ids[0])["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_retry_with_backoff(outbox, monkeypatch):
+    """Test a 4xx reply schedules a later retry and a dropped connection is reopened"""
+    queue, database, now, failures, connections = outbox
+    # Retry at the end of the jitter window
+    monkeypatch.setattr("services.email_queue.random.uniform", lambda low, high: high)
+    failures["slow@example.com"] = smtplib.SMTPResponseException(451, b"Try again later")
+    failures["drop@example.com"] = smtplib.SMTPServerDisconnected("Connection lost")
+    slow = await queue.enqueue("slow@example.com", "Report", "Body")
+    dropped = await queue.enqueue("drop@example.com", "Report", "Body")
+
+    queue.deliver_due()
+    assert tuple(status(database, slow)) == ("queued", 1)
+    assert tuple(status(database, dropped)) == ("queued", 1)
+    # Not due again until the backoff has passed
+    assert queue.deliver_due() == 0
+
+    now[0] += timedelta(seconds=31)
+    assert queue.deliver_due() == 2
+    assert tuple(status(database, slow)) == (SENT, 2)
+    assert len(connections) == 2
+
+
+def test_backoff_uses_full_jitter(outbox):
+    """Test retry delays span the whole window and double up to the cap"""
+    queue = outbox[0]
+    delays = [queue._backoff(1) for _ in range(200)]
+    assert 0 <= min(delays) < 15 <= max(delays) <= 30
+    assert all(queue._backoff(20) <= queue.max_delay for _ in range(20))
+
+
+@pytest.mark.asyncio
+async def test_permanent_failures_are_dead_lettered(outbox):
+    """Test 5xx rejections and exhausted retries end up as dead letters that can be requeued"""
+    queue, database, now, failures, _ = outbox
+    failures["nobody@example.com"] = smtplib.SMTPRecipientsRefused({"nobody@example.com": (550, b"No such user")})
+    rejected = await queue.enqueue("nobody@example.com", "Report", "Body")
+
+    queue.deliver_due()
+    assert tuple(status(database, rejected)) == (DEAD, 1)
+    assert queue.dead_letters()[0]["id"] == rejected
+
+    assert queue.requeue(rejected)
+    assert queue.deliver_due() == 1
+    assert status(database, rejected)["status"] == SENT
+
+    flaky = await queue.enqueue("flaky@example.com", "Report", "Body")
+    for _ in range(3):
+        failures["flaky@example.com"] = smtplib.SMTPResponseException(421, b"Busy")
+        queue.deliver_due()
+        now[0] += timedelta(hours=1)
+    assert tuple(status(database, flaky)) == (DEAD, 3)
+    assert queue.stats()["outbox"] == {SENT: 1, DEAD: 1}
+
+
+def test_failure_classification_and_message():
+    """Test which SMTP errors are permanent and the report summary text"""
+    assert is_permanent_failure(smtplib.SMTPDataError(554, b"Rejected"))
+    assert not is_permanent_failure(smtplib.SMTPAuthenticationError(535, b"Bad credentials"))
+    assert not is_permanent_failure(ConnectionResetError())
+
+    subject, body = roi_report_message("Ada", {"metrics": {"roi_percentage": 42.5, "npv": 12000}})
+    assert subject == "Your AmplifyROI report"
+    assert "Hi Ada," in body and "- ROI: 42.50%" in body and "- Net present value: 12,000.00" in body
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from calculations.fx import FXRateTable
+from calculations.roi_calculator import ROICalculator
+from tests.conftest import make_request
+
+
+# German micro SaaS inputs, reported in euros or converted
+DE_SAAS = {
+    "country": "DE", "business_type": "saas", "scenario": "micro_saas",
+    "monthly_revenue": 20000, "operating_expenses": 3000, "initial_investment": 50000
+}
+
+
+@pytest.fixture
+def table():
+    """A small rate table quoted against USD"""
+    return FXRateTable({"EUR": 0.8, "JPY": 160, "GBP": 0.75}, version="test", as_of="2025-01-01")
+
+
+def test_rates_cross_through_base(table):
+    """Test cross rates, the implicit base rate and unsupported currencies"""
+    assert table.currencies == ("EUR", "GBP", "JPY", "USD")
+    assert table.rate("usd", "EUR") == pytest.approx(0.8)
+    assert table.rate("EUR", "JPY") == pytest.approx(200)
+    assert table.rates(["GBP", "EUR"], ["EUR", "EUR"]).tolist() == pytest.approx([0.8 / 0.75, 1.0])
+    assert table.supports("gbp") and not table.supports("CHF")
+    with pytest.raises(ValueError):
+        table.rate("USD", "CHF")
+
+
+def test_convert_scales_rows(table):
+    """Test a (rows, months) array is converted with one factor per row"""
+    amounts = np.ones((2, 3))
+
+    converted = table.convert(amounts, ["USD", "EUR"], ["JPY", "USD"])
+
+    assert converted.tolist() == [[160.0] * 3, [1.25] * 3]
+    assert table.convert([10.0, 10.0], ["EUR", "EUR"], ["EUR", "GBP"]).tolist() == pytest.approx([10.0, 9.375])
+
+
+def test_invalid_tables_rejected():
+    """Test the base must be quoted at 1 and every rate must be positive"""
+    with pytest.raises(ValueError):
+        FXRateTable({"USD": 2.0})
+    with pytest.raises(ValueError):
+        FXRateTable({"EUR": 0.0})
+    assert FXRateTable.from_dict({}).currencies == ("USD",)
+
+
+def test_bundled_table_covers_catalog_currencies(snapshot):
+    """Test every country's currency can be used as a report currency"""
+    assert snapshot.fx_rates.version
+    for country in snapshot.countries:
+        assert snapshot.fx_rates.supports(country["currency"]["code"])
+
+
+def test_converted_plans_are_shared(snapshot):
+    """Test a plan is converted once per report currency and the local currency needs no conversion"""
+    plan = snapshot.get_plan("DE", "saas", "micro_saas", "USD")
+
+    assert plan is snapshot.get_plan("DE", "saas", "micro_saas", "USD")
+    assert plan.conversion.rate == pytest.approx(snapshot.fx_rates.rate("EUR", "USD"))
+    assert plan.report_currency_code == "USD" and plan.currency_code == "EUR"
+    assert plan.scenario is snapshot.get_plan("DE", "saas", "micro_saas").scenario
+    assert snapshot.get_plan("DE", "saas", "micro_saas", "EUR").conversion is None
+    with pytest.raises(ValueError):
+        snapshot.get_plan("DE", "saas", "micro_saas", "XYZ")
+
+
+def test_results_reported_in_report_currency(snapshot):
+    """Test monetary results are converted while ratios and inputs stay as calculated"""
+    calculator = ROICalculator()
+    local_request = make_request(**DE_SAAS)
+    report_request = make_request(**DE_SAAS, report_currency="jpy")
+    local_plan = snapshot.get_plan("DE", "saas", "micro_saas")
+    report_plan = snapshot.get_plan("DE", "saas", "micro_saas", report_request.report_currency)
+    rate = report_plan.conversion.rate
+
+    local, converted = calculator.calculate_batch([(local_request, local_plan), (report_request, report_plan)])
+
+    assert converted.currency_code == "JPY"
+    assert converted.currency_conversion.exchange_rate == rate
+    assert converted.currency_conversion.rates_version == snapshot.fx_rates.version
+    assert local.currency_conversion is None
+    assert converted.metrics.net_profit == pytest.approx(local.metrics.net_profit * rate)
+    assert converted.metrics.npv == pytest.approx(local.metrics.npv * rate)
+    assert converted.tax_calculation.total_tax == pytest.approx(local.tax_calculation.total_tax * rate)
+    assert converted.metrics.roi_percentage == pytest.approx(local.metrics.roi_percentage)
+    assert converted.metrics.irr == pytest.approx(local.metrics.irr)
+    assert converted.tax_calculation.effective_tax_rate == pytest.approx(local.tax_calculation.effective_tax_rate)
+    assert converted.monthly_projections[-1].cumulative_profit == pytest.approx(
+        local.monthly_projections[-1].cumulative_profit * rate
+    )
+    assert converted.expense_breakdown[0].amount == pytest.approx(local.expense_breakdown[0].amount * rate)
+    assert converted.insights == local.insights
+    assert converted.input_summary["monthly_revenue"] == 20000
+    assert converted.formatted_values["net_profit"].startswith("¥")
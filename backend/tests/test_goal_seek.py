@@ -0,0 +1,68 @@
+import pytest
+from calculations.goal_seek import GoalSeeker, illinois_root
+from calculations.roi_calculator import ROICalculator
+from models.roi_models import GoalSeekRequest, ROICalculationRequest
+
+
+def make_request(**overrides):
+    """Build a goal seek request around a US micro SaaS calculation"""
+    base = ROICalculationRequest(
+        country="US", business_type="saas", scenario="micro_saas",
+        monthly_revenue=5000, operating_expenses=2000,
+        initial_investment=50000, timeframe_months=24
+    )
+    return GoalSeekRequest(base_calculation=base, **overrides)
+
+
+def test_illinois_root_finds_bracketed_root():
+    """Test the bracketed solver converges on a smooth function"""
+    root, residual, converged, iterations = illinois_root(
+        lambda x: x ** 3 - 2, 0.0, 2.0, -2.0, 6.0, 1e-12, 1e-12
+    )
+
+    assert converged
+    assert root == pytest.approx(2 ** (1 / 3))
+    assert iterations < 50
+
+
+def test_solves_revenue_for_payback_target(plan):
+    """Test the solved revenue pays back in the requested number of months"""
+    calculator = ROICalculator()
+    request = make_request(target_metric="payback_period_months", target_value=6, variable="monthly_revenue")
+    response = GoalSeeker(calculator).run(request, plan)
+
+    assert response.reachable and response.converged
+    assert response.solved_value > response.base_value
+
+    # Re-evaluate the solved input on its own
+    changed = request.base_calculation.model_copy(update={"monthly_revenue": response.solved_value})
+    prepared = calculator._prepare_input_data(changed, plan.scenario)
+    metrics = calculator.calculate_metric_arrays([prepared], [24])
+    assert metrics["payback_period_months"][0] == pytest.approx(6, abs=1e-4)
+
+
+def test_solves_costs_for_break_even_npv(plan):
+    """Test the maximum operating expenses that keep NPV at zero"""
+    request = make_request(target_metric="npv", target_value=0, variable="operating_expenses")
+    response = GoalSeeker(ROICalculator()).run(request, plan)
+
+    assert response.converged
+    assert response.achieved_value == pytest.approx(0, abs=1e-3)
+    assert response.solved_value > 2000
+
+
+def test_unreachable_target_reports_range(plan):
+    """Test targets outside the search range are reported rather than guessed"""
+    request = make_request(target_metric="roi_percentage", target_value=1e6, variable="gross_margin")
+    response = GoalSeeker(ROICalculator()).run(request, plan)
+
+    assert not response.reachable
+    assert response.solved_value is None
+    assert response.achievable_range["max"] < 1e6
+
+
+def test_unit_economics_variables_rejected(plan):
+    """Test inputs that cannot move the target metric are rejected"""
+    request = make_request(target_metric="npv", target_value=0, variable="customer_acquisition_cost")
+    with pytest.raises(ValueError):
+        GoalSeeker(ROICalculator()).run(request, plan)
@@ -0,0 +1,49 @@
+import json
+
+from services.reference_data import ReferenceDataRegistry
+from utils.http_cache import CachedPayload, cached_json_response, etag_matches
+
+
+def test_etag_is_content_hash():
+    """Test identical bodies share an ETag and different bodies do not"""
+    assert CachedPayload(b'{"a":1}').etag == CachedPayload(b'{"a":1}').etag
+    assert CachedPayload(b'{"a":1}').etag != CachedPayload(b'{"a":2}').etag
+
+
+def test_etag_matching():
+    """Test If-None-Match handling for lists, weak tags and wildcards"""
+    etag = CachedPayload(b"[]").etag
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_cached_json_response():
+    """Test full responses carry cache headers and matching requests get 304"""
+    payload = CachedPayload(b'{"ok":true}')
+
+    response = cached_json_response(payload)
+    assert response.status_code == 200
+    assert response.body == payload.body
+    assert response.headers["etag"] == payload.etag
+    assert "max-age" in response.headers["cache-control"]
+
+    not_modified = cached_json_response(payload, payload.etag)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == payload.etag
+
+
+def test_catalog_payloads_match_models():
+    """Test pre-serialized catalog bodies equal the response model dumps"""
+    snapshot = ReferenceDataRegistry().snapshot()
+
+    countries = json.loads(snapshot.countries_payload.body)
+    assert countries == [c.model_dump(mode="json") for c in snapshot.country_models]
+    assert json.loads(snapshot.country_payloads_by_code["US"].body)["code"] == "US"
+
+    business_types = json.loads(snapshot.business_types_payload.body)
+    assert [bt["id"] for bt in business_types] == list(snapshot.business_types_by_id)
+    assert json.loads(snapshot.business_type_payloads_by_id["saas"].body)["id"] == "saas"
@@ -0,0 +1,33 @@
+import pytest
+from utils.hyperloglog import HyperLogLog
+
+
+def test_estimate_within_error_bounds():
+    """Test the estimate stays close to the true distinct count"""
+    sketch = HyperLogLog()
+    sketch.update(f"session-{i}" for i in range(50000))
+    sketch.update(f"session-{i}" for i in range(1000))
+
+    assert sketch.count() == pytest.approx(50000, rel=0.05)
+
+
+def test_small_counts_are_exact_enough():
+    """Test linear counting keeps small cardinalities accurate"""
+    sketch = HyperLogLog()
+    sketch.update(["a", "b", "c", "a"])
+
+    assert sketch.count() == 3
+
+
+def test_merge_and_round_trip():
+    """Test merged sketches estimate the union and survive serialization"""
+    first, second = HyperLogLog(), HyperLogLog()
+    first.update(str(i) for i in range(0, 6000))
+    second.update(str(i) for i in range(4000, 10000))
+
+    restored = HyperLogLog.from_bytes(first.to_bytes())
+    restored.merge(second)
+
+    assert restored.count() == pytest.approx(10000, rel=0.05)
+    with pytest.raises(ValueError):
+        restored.merge(HyperLogLog(precision=10))
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from calculations import insight_rules
+from calculations.insight_rules import RULES, Condition, InsightEngine, InsightRule
+
+
+def make_columns(**overrides):
+    """Rule columns for three results: strong, weak and mid-range"""
+    columns = {
+        "roi_percentage": [150.0, 10.0, 35.0],
+        "payback_period_months": [4.0, np.nan, 20.0],
+        "gross_margin": [0.8, 0.2, 0.45],
+        "growth_rate": [0.15, -0.01, 0.03],
+        "churn_rate": [0.0, 0.2, 0.05],
+        "clv": [2000.0, 100.0, 500.0],
+        "cac": [100.0, 0.0, 250.0],
+        "initial_investment": [10000.0, 500000.0, 0.0],
+        "monthly_revenue": [5000.0, 1000.0, 0.0],
+    }
+    columns.update(overrides)
+    return {name: np.array(values, dtype=float) for name, values in columns.items()}
+
+
+def test_threshold_and_plan_rules_in_order(snapshot):
+    """Test each row gets the messages of the rules that fire, in table order"""
+    us_saas = snapshot.get_plan("US", "saas", "micro_saas")
+    jp_box = snapshot.get_plan("JP", "ecommerce", "subscription_box")
+
+    strong, weak, mid = InsightEngine().messages(make_columns(), [us_saas, jp_box, us_saas])
+
+    assert strong["insights"] == [
+        "Excellent ROI of 150.0% indicates a highly profitable investment.",
+        "Fast payback period of 4.0 months indicates quick capital recovery.",
+        "High gross margin suggests strong pricing power and efficient operations.",
+        "High growth rate projections amplify long-term returns significantly.",
+        "Operating in United States with 21.0% corporate tax rate affects after-tax returns.",
+    ]
+    assert strong["recommendations"] == [
+        "Consider increasing marketing spend to accelerate growth with strong unit economics."
+    ]
+    assert strong["risk_factors"] == []
+
+    # No payback means no payback insight; no CAC means no CLV:CAC advice
+    assert weak["insights"][0].startswith("Low ROI of 10.0%")
+    assert not any("payback" in message for message in weak["insights"])
+    assert not any("CLV:CAC" in message for message in weak["recommendations"])
+    assert weak["recommendations"][-1] == "Focus on reducing churn rate to maximize subscription value."
+    assert weak["risk_factors"] == [
+        "High initial investment relative to revenue creates capital intensity risk.",
+        "Low gross margins provide little buffer for cost increases.",
+        "High churn rate poses risk to customer retention and CLV calculations.",
+        "Currency volatility may affect international business operations.",
+    ]
+
+    assert mid["insights"][:2] == [
+        "Moderate ROI of 35.0% suggests acceptable returns.",
+        "Extended payback period of 20.0 months requires patience.",
+    ]
+    assert "Improve customer lifetime value" in mid["recommendations"][2]
+    assert mid["risk_factors"] == []
+
+
+def test_plan_messages_are_rendered_once(snapshot):
+    """Test a plan's static messages are reused across batches"""
+    engine = InsightEngine()
+    plan = snapshot.get_plan("DE", "saas", "micro_saas")
+
+    first = engine.messages(make_columns(), [plan] * 3)
+    second = engine.messages(make_columns(), [plan] * 3)
+
+    assert first[0]["insights"][-1] is second[2]["insights"][-1]
+    assert engine.evaluate(make_columns(), plan).shape == (3, len(RULES))
+
+
+def test_summarize_reports_majority_rules(snapshot):
+    """Test simulated paths report rules firing in most paths, with median values"""
+    plan = snapshot.get_plan("US", "saas", "micro_saas")
+    paths = 1000
+    roi = np.linspace(60, 130, paths)
+    columns = make_columns(
+        roi_percentage=roi,
+        payback_period_months=np.full(paths, 8.0),
+        **{name: np.full(paths, values[0]) for name, values in make_columns().items()
+           if name not in ("roi_percentage", "payback_period_months")}
+    )
+
+    summary = InsightEngine().summarize(columns, plan)
+
+    assert summary["insights"][0] == "Strong ROI of 80.0% shows good investment potential."
+    assert summary["insights"][1] == "Reasonable payback period of 8.0 months."
+    assert not any(message.startswith("Excellent") for message in summary["insights"])
+
+
+def test_localized_messages_fall_back_to_english(snapshot, monkeypatch):
+    """Test a locale only needs the messages it translates"""
+    monkeypatch.setitem(insight_rules.MESSAGES, "de", {
+        "roi_excellent": "Hervorragender ROI von {roi_percentage:.1f}%."
+    })
+    plan = snapshot.get_plan("US", "saas", "micro_saas")
+
+    strong = InsightEngine(locale="de").messages(make_columns(), [plan] * 3)[0]
+
+    assert strong["insights"][0] == "Hervorragender ROI von 150.0%."
+    assert strong["insights"][1].startswith("Fast payback period")
+
+
+def test_invalid_rules_rejected():
+    """Test rules without messages or with unknown operators fail at compile time"""
+    with pytest.raises(ValueError):
+        InsightEngine(rules=[InsightRule("unknown_rule", "insights")])
+    with pytest.raises(ValueError):
+        InsightEngine(rules=[InsightRule("roi_low", "insights", (Condition("roi_percentage", "==", 0),))])
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from calculations.irr_solver import annualized_irr_percentage, npv_with_derivative, solve_irr
+
+
+def npv(cash_flows, rate):
+    """Reference NPV by direct discounting"""
+    return sum(cf / (1 + rate) ** k for k, cf in enumerate(cash_flows))
+
+
+def test_horner_npv_and_derivative():
+    """Test Horner evaluation against direct discounting and a finite difference"""
+    cash_flows = np.array([[-1000.0, 300.0, 400.0, 500.0, 200.0]])
+    rate = np.array([0.05])
+
+    value, slope = npv_with_derivative(cash_flows, rate)
+    assert value[0] == pytest.approx(npv(cash_flows[0], 0.05))
+
+    h = 1e-6
+    numeric = (npv(cash_flows[0], 0.05 + h) - npv(cash_flows[0], 0.05 - h)) / (2 * h)
+    assert slope[0] == pytest.approx(numeric, rel=1e-6)
+
+
+def test_solve_irr_batch():
+    """Test a batch of cash flow vectors is solved in one call"""
+    cash_flows = np.array([
+        [-1000.0, 100.0, 100.0, 100.0, 100.0, 1100.0],  # 10% coupon bond
+        [-100.0, 10.0, 10.0, 10.0, 0.0, 0.0],            # loses money, zero-padded
+        [-5000.0, 2500.0, 2500.0, 2500.0, 0.0, 0.0],
+    ])
+
+    result = solve_irr(cash_flows)
+
+    assert result.converged.all()
+    assert result.rates[0] == pytest.approx(0.10)
+    assert result.rates[1] < 0
+    for row, rate in zip(cash_flows, result.rates):
+        assert npv(row, rate) == pytest.approx(0, abs=1e-6)
+
+
+def test_solve_irr_reports_unbracketed_rows():
+    """Test rows without a sign change are flagged instead of guessed"""
+    cash_flows = np.array([
+        [100.0, 10.0, 10.0],       # never negative
+        [-1000.0, -100.0, -100.0],  # never turns positive
+        [-100.0, 60.0, 60.0],
+    ])
+
+    result = solve_irr(cash_flows)
+
+    assert result.bracketed.tolist() == [False, False, True]
+    assert result.converged.tolist() == [False, False, True]
+    assert np.isnan(result.rates[:2]).all()
+    assert not np.isnan(result.rates[2])
+
+
+def test_annualized_irr_percentage():
+    """Test periodic rates convert to the annual percentage in responses"""
+    assert annualized_irr_percentage(np.array([0.01]))[0] == pytest.approx(12.0)
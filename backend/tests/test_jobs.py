@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from models.roi_models import JobStatus, WhatIfVariation
+from services.database import Database
+from services.jobs import InMemoryJobStore, JobFile, JobManager, JobQueueFull, SQLiteJobStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each job store backend"""
+    if request.param == "memory":
+        yield InMemoryJobStore()
+        return
+    database = Database(str(tmp_path / "jobs.db"))
+    database.migrate()
+    yield SQLiteJobStore(database)
+    database.close()
+
+
+async def wait_finished(manager, job_id):
+    for _ in range(200):
+        job = await manager.get(job_id)
+        if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return job
+        await asyncio.sleep(0.005)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_job_reports_progress_and_result(store):
+    """Test a job moves through its states and stores a JSON result"""
+    manager = JobManager(store)
+    release = asyncio.Event()
+
+    async def work(job):
+        job.progress(0.5, "Halfway")
+        await release.wait()
+        return WhatIfVariation(name="Price rise", changes={"average_order_value": 12.5})
+
+    submitted = manager.submit("what_if", work)
+    assert submitted.status == JobStatus.QUEUED
+
+    await asyncio.sleep(0.01)
+    running = await manager.get(submitted.id)
+    assert running.status == JobStatus.RUNNING and running.progress == 0.5 and running.message == "Halfway"
+
+    release.set()
+    finished = await wait_finished(manager, submitted.id)
+    assert finished.status == JobStatus.SUCCEEDED and finished.progress == 1.0
+    assert finished.result["changes"] == {"average_order_value": 12.5}
+    assert finished.result_url == f"/api/jobs/{submitted.id}/result"
+    assert finished.expires_at > finished.finished_at
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_file_results_and_failures(store):
+    """Test file results are recorded and errors only expose ValueError messages"""
+    manager = JobManager(store)
+
+    async def export(job):
+        return JobFile("/tmp/report.pdf", "application/pdf", "report.pdf")
+
+    async def invalid(job):
+        raise ValueError("Unknown variable")
+
+    async def broken(job):
+        raise RuntimeError("database password is hunter2")
+
+    exported = await wait_finished(manager, manager.submit("pdf_export", export).id)
+    assert exported.result_file == "/tmp/report.pdf" and exported.media_type == "application/pdf"
+
+    assert (await wait_finished(manager, manager.submit("goal_seek", invalid).id)).error == "Unknown variable"
+    failed = await wait_finished(manager, manager.submit("roi_batch", broken).id)
+    assert failed.status == JobStatus.FAILED and failed.error == "Job failed"
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_bounded_queue(store):
+    """Test queued and running jobs can be cancelled by their own worker and the queue is bounded"""
+    manager = JobManager(store, max_concurrent=1, max_queued=2)
+
+    async def forever(job):
+        await asyncio.Event().wait()
+
+    running = manager.submit("simulation", forever)
+    queued = manager.submit("simulation", forever)
+    with pytest.raises(JobQueueFull):
+        manager.submit("simulation", forever)
+    await asyncio.sleep(0.01)
+
+    # Another worker sharing the store can report on the job but doesn't run it
+    other_worker = JobManager(store)
+    assert manager.owns(running.id) and not other_worker.owns(running.id)
+    assert (await other_worker.cancel(running.id)).status == JobStatus.RUNNING
+
+    assert (await manager.cancel(queued.id)).status == JobStatus.CANCELLED
+    assert (await manager.cancel(running.id)).status == JobStatus.CANCELLED
+    stats = await manager.stats()
+    assert stats["active"] == 0 and stats["cancelled"] == 2
+    await manager.stop()
+    await other_worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_discards_expired_jobs(store):
+    """Test finished jobs are removed once their result TTL has passed"""
+    now = [datetime(2025, 1, 1)]
+    manager = JobManager(store, result_ttl=60, clock=lambda: now[0])
+
+    async def work(job):
+        return {"ok": True}
+
+    job = await wait_finished(manager, manager.submit("what_if", work).id)
+    assert await manager.cleanup() == 0
+
+    now[0] += timedelta(seconds=61)
+    assert await manager.cleanup() == 1
+    assert await manager.get(job.id) is None
+    await manager.stop()
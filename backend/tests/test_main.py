@@ -119,6 +119,29 @@ def test_scenarios_search():
     assert "results" in data
     assert isinstance(data["results"], list)
 
+def test_batch_isolates_failing_items(monkeypatch):
+    """Test a failing vectorized pass only fails the items that fail on their own"""
+    import main
+
+    calculate_batch = main.roi_calculator.calculate_batch
+
+    def flaky(items, include_projections=True):
+        if any(request.monthly_revenue == 6666 for request, _ in items):
+            raise ArithmeticError("boom")
+        return calculate_batch(items, include_projections)
+
+    monkeypatch.setattr(main.roi_calculator, "calculate_batch", flaky)
+    base = {"country": "US", "business_type": "saas", "scenario": "micro_saas", "monthly_revenue": 5000}
+
+    response = client.post("/api/calculate-roi/batch", json={
+        "requests": [base, {**base, "monthly_revenue": 6666}, {**base, "monthly_revenue": 7000}]
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (2, 1)
+    assert [item["success"] for item in data["results"]] == [True, False, True]
+    assert data["results"][1]["error"] == "Internal server error"
+
 def test_cors_headers():
     """Test that CORS headers are properly set"""
     response = client.options("/api/health")
@@ -0,0 +1,72 @@
+import pytest
+from calculations.monte_carlo import (
+    MonteCarloSimulator, derive_scenario_distributions, validate_distribution
+)
+from calculations.roi_calculator import ROICalculator
+from models.roi_models import (
+    DistributionSpec, DistributionType, ROICalculationRequest, SimulationRequest
+)
+
+
+def make_request(**overrides):
+    """Build a small simulation request around a US micro SaaS calculation"""
+    values = {
+        "base_calculation": ROICalculationRequest(
+            country="US", business_type="saas", scenario="micro_saas",
+            monthly_revenue=5000, operating_expenses=2000,
+            initial_investment=50000, timeframe_months=24
+        ),
+        "paths": 500,
+        "chunk_size": 200,
+        "seed": 42,
+    }
+    values.update(overrides)
+    return SimulationRequest(**values)
+
+
+def test_simulation_is_reproducible_with_seed(plan):
+    """Test the same seed gives identical results regardless of chunking"""
+    simulator = MonteCarloSimulator(ROICalculator())
+    first = simulator.run(make_request(), plan)
+    second = simulator.run(make_request(), plan)
+
+    assert first.roi_percentage == second.roi_percentage
+    assert first.monthly_bands == second.monthly_bands
+    assert 0 <= first.probability_of_payback <= 1
+    assert first.roi_percentage.percentiles["p5"] <= first.roi_percentage.percentiles["p95"]
+
+
+def test_simulation_bands_cover_timeframe(plan):
+    """Test monthly bands span the timeframe and use a bounded sample"""
+    response = MonteCarloSimulator(ROICalculator()).run(make_request(), plan)
+
+    assert len(response.monthly_bands) == 24
+    assert response.band_sample_size == 500
+    assert set(response.monthly_bands[0].cumulative_profit) == {"p5", "p25", "p50", "p75", "p95"}
+
+
+def test_derived_distributions_peak_at_base_value():
+    """Test scenario ranges become triangular distributions around the base input"""
+    distributions = derive_scenario_distributions(
+        {"monthly_revenue": 5000, "cac": 50, "aov": 30},
+        {"revenue": (1000, 20000), "cac": (80, 200)}
+    )
+
+    assert set(distributions) == {"monthly_revenue", "customer_acquisition_cost"}
+    revenue = distributions["monthly_revenue"]
+    assert revenue.distribution == DistributionType.TRIANGULAR
+    assert (revenue.low, revenue.mode, revenue.high) == (1000, 5000, 20000)
+    # The range widens to include a base value outside it
+    assert distributions["customer_acquisition_cost"].low == 50
+
+
+def test_validate_distribution_rejects_bad_specs():
+    """Test unsupported inputs and incomplete parameters are rejected"""
+    with pytest.raises(ValueError):
+        validate_distribution("tax_rate", DistributionSpec(distribution="normal", mean=0.2, std=0.01))
+
+    with pytest.raises(ValueError):
+        validate_distribution("growth_rate", DistributionSpec(distribution="normal", mean=0.05))
+
+    with pytest.raises(ValueError):
+        validate_distribution("monthly_revenue", DistributionSpec(distribution="lognormal", mean=0, std=10))
@@ -0,0 +1,187 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from services import pdf_worker
+from services.pdf_worker import (
+    PDFQueueFull, PDFReportRenderer, PDFRendererUnavailable, PDFRenderTimeout, render_report, report_cache_key
+)
+
+HAS_REPORTLAB = importlib.util.find_spec("reportlab") is not None
+
+REPORT = {
+    "calculation_id": "calc-1",
+    "calculation_data": {"roi_percentage": 42.0},
+    "country_data": {"code": "US"},
+    "business_data": {"business_type": "saas"},
+    "export_format": "standard",
+    "include_charts": True,
+    "include_projections": True,
+}
+
+
+class FakeRender:
+    """Render function that writes a small file, optionally waiting for a release"""
+
+    def __init__(self, release=None):
+        self.calls = 0
+        self.release = release
+
+    def __call__(self, output_path, report):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        with open(output_path, "wb") as handle:
+            handle.write(b"%PDF-1.4 " + report["export_format"].encode())
+
+
+def make_renderer(tmp_path, render, **options):
+    return PDFReportRenderer(
+        str(tmp_path / "reports"), render=render,
+        executor_factory=lambda workers: ThreadPoolExecutor(max_workers=workers), **options
+    )
+
+
+def test_cache_key_covers_content_and_flags():
+    """Test the key ignores field order and the calculation id but not render flags"""
+    reordered = dict(reversed(list(REPORT.items())))
+    assert report_cache_key(reordered) == report_cache_key(REPORT)
+    assert report_cache_key({**REPORT, "calculation_id": "calc-2"}) == report_cache_key(REPORT)
+    assert report_cache_key({**REPORT, "include_charts": False}) != report_cache_key(REPORT)
+
+
+@pytest.mark.asyncio
+async def test_repeat_report_is_served_from_disk(tmp_path):
+    """Test the second identical export reuses the rendered file"""
+    render = FakeRender()
+    renderer = make_renderer(tmp_path, render)
+
+    path, cached = await renderer.get_report(REPORT)
+    assert not cached and path.read_bytes() == b"%PDF-1.4 standard"
+
+    again, cached = await renderer.get_report(REPORT)
+    assert cached and again == path
+    assert render.calls == 1
+    assert not list(path.parent.glob("*.tmp"))
+    await renderer.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reports_share_a_render(tmp_path):
+    """Test identical in-flight requests wait on one render"""
+    release = threading.Event()
+    render = FakeRender(release)
+    renderer = make_renderer(tmp_path, render)
+
+    tasks = [asyncio.create_task(renderer.get_report(REPORT)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert render.calls == 1
+    assert len({path for path, _ in results}) == 1
+    assert renderer.stats()["shared"] == 2
+    await renderer.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_timeout_still_caches(tmp_path):
+    """Test new renders are rejected at capacity and a timed-out render lands in the cache"""
+    release = threading.Event()
+    renderer = make_renderer(tmp_path, FakeRender(release), max_pending=1, timeout=0.05)
+
+    with pytest.raises(PDFRenderTimeout):
+        await renderer.get_report(REPORT)
+    with pytest.raises(PDFQueueFull):
+        await renderer.get_report({**REPORT, "export_format": "detailed"})
+
+    release.set()
+    for _ in range(100):
+        if not renderer.stats()["pending"]:
+            break
+        await asyncio.sleep(0.01)
+
+    _, cached = await renderer.get_report(REPORT)
+    assert cached
+    await renderer.stop()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_removes_expired_reports(tmp_path):
+    """Test reports older than the TTL are deleted and no longer served"""
+    now = [time.time()]
+    renderer = make_renderer(tmp_path, FakeRender(), ttl_seconds=60, clock=lambda: now[0])
+    path, _ = await renderer.get_report(REPORT)
+    (path.parent / "stale.tmp").write_bytes(b"")
+    os.utime(path.parent / "stale.tmp", (now[0] - 120, now[0] - 120))
+
+    assert renderer.cleanup() == 1
+    now[0] += 120
+    assert renderer.cleanup() == 1
+    assert not path.exists()
+    await renderer.stop()
+
+
+def test_render_report_passes_render_flags(tmp_path, monkeypatch):
+    """Test every cache key field reaches the PDF service"""
+    calls = []
+
+    class RecordingService:
+        def generate_roi_report(self, output_path, *data, **options):
+            calls.append((output_path, data, options))
+
+    monkeypatch.setattr(pdf_worker, "_pdf_service", RecordingService())
+    render_report(str(tmp_path / "report.pdf"), {**REPORT, "export_format": "summary", "include_charts": False})
+
+    assert calls == [(
+        str(tmp_path / "report.pdf"),
+        (REPORT["calculation_data"], REPORT["country_data"], REPORT["business_data"]),
+        {"export_format": "summary", "include_charts": False, "include_projections": True},
+    )]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(HAS_REPORTLAB, reason="reportlab is installed")
+async def test_default_renderer_without_reportlab_is_unavailable(tmp_path):
+    """Test the real renderer reports a missing library up front instead of failing in the worker"""
+    renderer = PDFReportRenderer(
+        str(tmp_path / "reports"), executor_factory=lambda workers: ThreadPoolExecutor(max_workers=workers)
+    )
+
+    assert not renderer.available and not renderer.stats()["available"]
+    with pytest.raises(PDFRendererUnavailable):
+        await renderer.get_report(REPORT)
+    assert renderer.stats()["misses"] == 0
+    await renderer.stop()
+
+
+@pytest.mark.asyncio
+async def test_default_renderer_writes_pdf(tmp_path):
+    """Test the real renderer produces a PDF for each export format"""
+    pytest.importorskip("reportlab")
+    renderer = PDFReportRenderer(
+        str(tmp_path / "reports"), executor_factory=lambda workers: ThreadPoolExecutor(max_workers=workers)
+    )
+    report = {**REPORT, "calculation_data": {
+        "metrics": {"roi_percentage": 42.0, "net_profit": 1200.0, "payback_period_months": None},
+        "tax_calculation": {"corporate_tax": 250.0},
+        "expense_breakdown": [{"category": "Marketing & Advertising", "amount": 300.0, "percentage": 25.0}],
+        "monthly_projections": [
+            {"month": month, "revenue": 1000.0, "expenses": 900.0, "profit": 100.0, "cumulative_profit": 100.0 * month}
+            for month in range(1, 13)
+        ],
+        "insights": ["Strong ROI <of> 42%"],
+        "currency_code": "USD",
+    }}
+
+    standard, _ = await renderer.get_report(report)
+    summary, _ = await renderer.get_report({**report, "export_format": "summary", "include_charts": False})
+
+    assert renderer.available
+    assert standard.read_bytes().startswith(b"%PDF") and summary.read_bytes().startswith(b"%PDF")
+    assert summary.stat().st_size < standard.stat().st_size
+    await renderer.stop()
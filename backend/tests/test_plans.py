@@ -0,0 +1,97 @@
+import copy
+
+import pytest
+from calculations.plans import INDUSTRY_BENCHMARKS, PlanFeature, compile_plan
+from calculations.roi_calculator import ROICalculator
+from tests.conftest import make_request
+
+
+def test_every_combination_is_compiled(snapshot):
+    """Test one plan exists per (country, business type, scenario) and they share components"""
+    assert len(snapshot.plans) == len(snapshot.countries) * len(snapshot.scenarios_by_key)
+
+    plan = snapshot.get_plan("DE", "saas", "micro_saas")
+    assert plan.key == ("DE", "saas", "micro_saas")
+    assert plan.currency_code == "EUR"
+    assert plan.country is snapshot.get_plan("DE", "startup", "seed_stage").country
+    assert plan.scenario is snapshot.get_plan("US", "saas", "micro_saas").scenario
+    assert snapshot.get_plan("DE", "saas", "pre_seed") is None
+
+
+def test_plan_holds_resolved_reference_data(snapshot):
+    """Test defaults, tax rates and benchmarks are lifted out of the raw dicts"""
+    plan = snapshot.get_plan("FR", "ecommerce", "subscription_box")
+    metrics = snapshot.get_scenario("ecommerce", "subscription_box")["metrics"]
+    tax_rates = snapshot.get_country("FR")["tax_rates"]
+
+    assert plan.scenario.revenue_default == metrics["revenue"]["default"]
+    assert plan.scenario.marketing_percentage == metrics["marketing_budget"]["percentage"]
+    assert plan.scenario.fulfillment_ratio == metrics["fulfillment_cost"]
+    assert plan.scenario.churn_rate == metrics["churn_rate"]
+    assert plan.scenario.ranges["aov"] == (metrics["aov"]["min"], metrics["aov"]["max"])
+    assert plan.country.tax_rates.tolist() == [tax_rates["corporate_tax"], tax_rates["vat"], tax_rates["payroll_tax"]]
+    assert plan.scenario.benchmarks == INDUSTRY_BENCHMARKS["ecommerce"]
+    assert plan.features == PlanFeature.SUBSCRIPTION
+
+    # Scenarios without churn or fulfillment fall back to zero
+    startup = snapshot.get_plan("US", "startup", "pre_seed").scenario
+    assert (startup.churn_rate, startup.fulfillment_ratio) == (0.0, 0.0)
+
+
+def test_plans_are_immutable(snapshot):
+    """Test plans shared across requests cannot be modified"""
+    plan = snapshot.get_plan("US", "saas", "micro_saas")
+
+    with pytest.raises(AttributeError):
+        plan.scenario.gross_margin = 0.1
+    with pytest.raises(AttributeError):
+        plan.extra = 1
+    with pytest.raises(ValueError):
+        plan.country.tax_rates[0] = 0.5
+    with pytest.raises(TypeError):
+        plan.scenario.benchmarks["average_roi"] = 0
+
+
+def test_prepared_inputs_use_scenario_defaults(snapshot):
+    """Test preparation from a plan reproduces the scenario's defaults"""
+    plan = snapshot.get_plan("US", "ecommerce", "print_on_demand")
+    metrics = snapshot.get_scenario("ecommerce", "print_on_demand")["metrics"]
+
+    # Zero revenue means "use the scenario default", which validation would reject
+    request = make_request().model_copy(update={"monthly_revenue": 0})
+    prepared = ROICalculator()._prepare_input_data(request, plan.scenario)
+
+    revenue = metrics["revenue"]["default"]
+    assert prepared["monthly_revenue"] == revenue
+    assert prepared["gross_margin"] == metrics["gross_margin"]
+    assert prepared["marketing_spend"] == pytest.approx(revenue * metrics["marketing_budget"]["percentage"])
+    assert prepared["operating_expenses"] == pytest.approx(revenue * metrics["operating_expenses"])
+    assert prepared["fulfillment_costs"] == pytest.approx(revenue * metrics["fulfillment_cost"])
+    assert prepared["payment_processing_cost"] == pytest.approx(revenue * 0.029)
+    assert prepared["clv"] == metrics["aov"]["default"] * 12
+    assert prepared["payment_terms"] == metrics["payment_terms"]
+
+
+def test_prepared_inputs_apply_request_overrides(snapshot):
+    """Test request values win over plan defaults and derived costs follow them"""
+    plan = snapshot.get_plan("US", "ecommerce", "print_on_demand")
+    request = make_request(monthly_revenue=20000, gross_margin=0.5, churn_rate=0.1, fulfillment_costs=750)
+
+    prepared = ROICalculator()._prepare_input_data(request, plan.scenario)
+
+    assert prepared["monthly_revenue"] == 20000
+    assert prepared["cogs"] == pytest.approx(10000)
+    assert prepared["marketing_spend"] == pytest.approx(20000 * plan.scenario.marketing_percentage)
+    assert prepared["fulfillment_costs"] == 750
+    assert prepared["clv"] == pytest.approx(plan.scenario.aov * 0.5 / 0.1)
+
+
+def test_country_features(snapshot):
+    """Test the feature mask flags inflation and currency risks"""
+    assert snapshot.get_plan("US", "saas", "micro_saas").features == PlanFeature.NONE
+    assert snapshot.get_plan("JP", "saas", "micro_saas").features == PlanFeature.CURRENCY_RISK
+
+    country = copy.deepcopy(snapshot.get_country("GB"))
+    country["economic_indicators"]["inflation_2025"] = 0.08
+    plan = compile_plan(country, "saas", snapshot.get_scenario("saas", "micro_saas"))
+    assert plan.features == PlanFeature.HIGH_INFLATION
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from calculations.projection_engine import (
+    calculate_batch_metrics, calculate_batch_taxes, project_batch, project_monthly, stack_inputs,
+    tax_rate_array
+)
+from calculations.roi_calculator import EXPENSE_CATEGORIES, ROICalculator
+
+
+@pytest.fixture
+def input_data():
+    """Prepared calculator inputs for a growing business"""
+    return {
+        "monthly_revenue": 10000.0,
+        "initial_investment": 25000.0,
+        "gross_margin": 0.6,
+        "marketing_spend": 1500.0,
+        "operating_expenses": 2000.0,
+        "fulfillment_costs": 300.0,
+        "payment_processing_cost": 290.0,
+        "employee_costs": 1000.0,
+        "growth_rate": 0.05,
+    }
+
+
+def naive_projections(input_data, timeframe_months):
+    """Reference month-by-month loop"""
+    rows = []
+    cumulative = -input_data["initial_investment"]
+    for month in range(1, timeframe_months + 1):
+        growth = (1 + input_data["growth_rate"]) ** (month - 1)
+        revenue = input_data["monthly_revenue"] * growth
+        expenses = (
+            revenue * (1 - input_data["gross_margin"])
+            + (input_data["marketing_spend"] + input_data["fulfillment_costs"]
+               + input_data["payment_processing_cost"]) * growth
+            + input_data["operating_expenses"] + input_data["employee_costs"]
+        )
+        cumulative += revenue - expenses
+        rows.append((revenue, expenses, revenue - expenses, cumulative))
+    return np.array(rows)
+
+
+def test_projection_columns_match_monthly_loop(input_data):
+    """Test the vectorized columns agree with the month-by-month formula"""
+    projections = project_monthly(input_data, 36)
+    expected = naive_projections(input_data, 36)
+
+    assert len(projections) == 36
+    assert projections.month[0] == 1 and projections.month[-1] == 36
+    np.testing.assert_allclose(projections.revenue, expected[:, 0])
+    np.testing.assert_allclose(projections.expenses, expected[:, 1])
+    np.testing.assert_allclose(projections.profit, expected[:, 2])
+    np.testing.assert_allclose(projections.cumulative_profit, expected[:, 3])
+    np.testing.assert_allclose(projections.roi, expected[:, 3] / 25000.0 * 100)
+
+
+def test_single_month_projection(input_data):
+    """Test a one month timeframe has no growth applied"""
+    projections = project_monthly(input_data, 1)
+    assert projections.growth_factor.tolist() == [1.0]
+    assert projections.revenue.tolist() == [10000.0]
+
+
+def test_metrics_read_from_arrays(input_data):
+    """Test payback, NPV and breakdown totals derived from the columns"""
+    calculator = ROICalculator()
+    projections = calculator._calculate_monthly_projections([input_data], [24])
+    investments = np.array([input_data["initial_investment"]])
+
+    metrics = calculator._calculate_roi_metrics(projections, investments)
+    assert metrics["total_revenue"][0] == pytest.approx(projections.revenue.sum())
+    assert metrics["net_profit"][0] == pytest.approx(projections.profit.sum())
+
+    payback = metrics["payback_period_months"][0]
+    month = int(payback)
+    assert projections.cumulative_profit[0, month - 1] < 0 <= projections.cumulative_profit[0, month]
+
+    discount = (1 + calculator.DISCOUNT_RATE / 12) ** np.arange(1, 25)
+    assert metrics["npv"][0] == pytest.approx(-25000.0 + np.sum(projections.profit / discount))
+
+    totals = np.array([getattr(projections, column).sum() for _, column, _ in EXPENSE_CATEGORIES])
+    breakdown = calculator._generate_expense_breakdown(totals, float(metrics["total_expenses"][0]))
+    assert sum(item.amount for item in breakdown) == pytest.approx(metrics["total_expenses"][0])
+    assert sum(item.percentage for item in breakdown) == pytest.approx(100.0)
+
+
+def test_batch_rows_match_single_projections(input_data):
+    """Test each row of a mixed-timeframe batch equals its own projection"""
+    slow = dict(input_data, growth_rate=0.0, initial_investment=0.0)
+    rows = [input_data, slow, dict(input_data, monthly_revenue=50000.0)]
+    timeframes = [24, 6, 120]
+
+    batch = project_batch(stack_inputs(rows), timeframes)
+    assert batch.revenue.shape == (3, 120)
+
+    for i, (row, timeframe) in enumerate(zip(rows, timeframes)):
+        single = project_monthly(row, timeframe)
+        trimmed = batch.row(i)
+        np.testing.assert_allclose(trimmed.profit, single.profit)
+        np.testing.assert_allclose(trimmed.cumulative_profit, single.cumulative_profit)
+        np.testing.assert_allclose(trimmed.roi, single.roi)
+        assert not batch.revenue[i, timeframe:].any()
+
+
+def test_batch_metrics_and_taxes(input_data):
+    """Test vectorized metrics agree per row and mark missing paybacks as NaN"""
+    losing = dict(input_data, monthly_revenue=1000.0, growth_rate=0.0)
+    rows = [input_data, losing]
+    batch = project_batch(stack_inputs(rows), [24, 12])
+    investments = np.array([25000.0, 25000.0])
+
+    metrics = calculate_batch_metrics(batch, investments, 0.10)
+    single = calculate_batch_metrics(project_batch(stack_inputs([input_data]), [24]), investments[:1], 0.10)
+    for name, values in single.items():
+        assert metrics[name][0] == pytest.approx(values[0])
+    assert np.isnan(metrics["payback_period_months"][1])
+    assert metrics["net_profit"][1] < 0
+
+    rates = [{"corporate_tax": 0.21, "vat": 0, "payroll_tax": 0.1}, {"corporate_tax": 0.25, "vat": 0.2}]
+    taxes = calculate_batch_taxes(batch, tax_rate_array(rates), np.array([1000.0, 1000.0]))
+    assert taxes["payroll_tax"].tolist() == pytest.approx([1000.0 * 24 * 0.1, 0.0])
+    assert taxes["vat_tax"][1] == pytest.approx(batch.revenue[1].sum() * 0.2)
+    assert taxes["corporate_tax"][1] == 0
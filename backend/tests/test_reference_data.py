@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+
+import pytest
+from services.reference_data import ReferenceDataRegistry, DATA_DIR
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Copy the reference data files into a scratch directory"""
+    for name in ("countries.json", "business_scenarios.json", "fx_rates.json"):
+        shutil.copy(DATA_DIR / name, tmp_path / name)
+    return tmp_path
+
+
+def test_snapshot_indexes():
+    """Test countries, business types and scenarios are indexed by key"""
+    snapshot = ReferenceDataRegistry().snapshot()
+
+    assert snapshot.get_country("US")["currency"]["code"] == "USD"
+    assert snapshot.country_models_by_code["GB"].name == "United Kingdom"
+    assert snapshot.get_business_type("saas")["name"]
+    assert snapshot.get_scenario("saas", "micro_saas")["metrics"]["gross_margin"] > 0
+    assert snapshot.get_scenario("saas", "pre_seed") is None
+    assert len(snapshot.scenarios_by_key) == sum(len(bt["scenarios"]) for bt in snapshot.business_types)
+
+
+def test_snapshot_is_reused_until_files_change(data_dir):
+    """Test the files are only parsed again after their mtime changes"""
+    registry = ReferenceDataRegistry(data_dir, check_interval=0)
+    first = registry.snapshot()
+    assert registry.snapshot() is first
+
+    path = data_dir / "countries.json"
+    data = json.loads(path.read_text())
+    data["countries"] = data["countries"][:1]
+    path.write_text(json.dumps(data))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    second = registry.snapshot()
+    assert second is not first
+    assert len(second.countries) == 1
+    assert second.version != first.version
+
+
+def test_invalid_reload_keeps_previous_snapshot(data_dir):
+    """Test a reload that fails validation keeps serving the old data"""
+    registry = ReferenceDataRegistry(data_dir, check_interval=0)
+    first = registry.snapshot()
+
+    path = data_dir / "countries.json"
+    path.write_text(json.dumps({"countries": [{"code": "XX"}]}))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert registry.snapshot() is first
+
+
+def test_fx_rate_changes_reload_snapshot(data_dir):
+    """Test editing the FX rate table produces a new snapshot version"""
+    registry = ReferenceDataRegistry(data_dir, check_interval=0)
+    first = registry.snapshot()
+
+    path = data_dir / "fx_rates.json"
+    data = json.loads(path.read_text())
+    data["version"] = "next"
+    data["rates"]["EUR"] = 0.5
+    path.write_text(json.dumps(data))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    second = registry.snapshot()
+    assert second.version != first.version
+    assert second.fx_rates.version == "next"
+    assert second.get_plan("US", "saas", "micro_saas", "EUR").conversion.rate == 0.5
@@ -0,0 +1,123 @@
+import json
+from datetime import datetime
+
+import pytest
+from calculations.projection_engine import project_batch, stack_inputs
+from calculations.roi_calculator import ROICalculator
+from models.roi_models import (
+    BreakdownItem, MonthlyProjection, ROIBatchItem, ROIBatchResponse, ROIMetrics, ROIResponse, TaxCalculation
+)
+from utils import response_encoding
+from utils.response_encoding import (
+    COLUMNAR_MEDIA_TYPE, dumps, encode_event, roi_batch_json_response, roi_json_response, roi_response_payload,
+    roi_stream, select_projection_format
+)
+
+INPUTS = {
+    "monthly_revenue": 10000.0, "initial_investment": 25000.0, "gross_margin": 0.6, "marketing_spend": 1500.0,
+    "operating_expenses": 2000.0, "fulfillment_costs": 300.0, "payment_processing_cost": 290.0,
+    "employee_costs": 1000.0, "growth_rate": 0.05,
+}
+
+
+def make_response(months=3):
+    """Small ROI response built the way the calculator builds it"""
+    return ROIResponse.model_construct(
+        calculation_id="calc-1",
+        timestamp=datetime(2025, 1, 1, 12, 0, 0),
+        input_summary={"monthly_revenue": 5000},
+        metrics=ROIMetrics(
+            roi_percentage=25.0, roi_ratio=0.25, net_profit=1000.0, gross_profit=2000.0,
+            total_revenue=15000.0, total_expenses=14000.0
+        ),
+        tax_calculation=TaxCalculation(
+            corporate_tax=100.0, vat_tax=0.0, payroll_tax=0.0, total_tax=100.0,
+            effective_tax_rate=0.1, after_tax_profit=900.0
+        ),
+        revenue_breakdown=[BreakdownItem(category="Sales", amount=15000.0, percentage=100.0, description="Product sales")],
+        expense_breakdown=[],
+        monthly_projections=[
+            MonthlyProjection.model_construct(
+                month=month, revenue=5000.0, expenses=4000.0, profit=1000.0,
+                cumulative_profit=1000.0 * month, roi=0.1 * month
+            )
+            for month in range(1, months + 1)
+        ],
+        insights=[], recommendations=[], risk_factors=[], industry_benchmarks=None,
+        currency_code="USD", formatted_values={}
+    )
+
+
+def test_rows_match_pydantic_serialization():
+    """Test the fast path produces the same document as pydantic's own encoder"""
+    response = make_response()
+    body = roi_json_response(response).body
+
+    assert json.loads(body) == json.loads(response.model_dump_json())
+
+
+def test_columnar_projections():
+    """Test projections can be sent as one array per field"""
+    payload = json.loads(dumps(roi_response_payload(make_response(), "columns")))
+
+    assert payload["monthly_projections"]["month"] == [1, 2, 3]
+    assert payload["monthly_projections"]["cumulative_profit"] == [1000.0, 2000.0, 3000.0]
+    assert set(payload["monthly_projections"]) == set(MonthlyProjection.model_fields)
+    assert payload["metrics"]["roi_percentage"] == 25.0
+
+
+def test_batch_response_encoding():
+    """Test batch results are encoded item by item, including failures"""
+    batch = ROIBatchResponse(
+        results=[
+            ROIBatchItem(index=0, success=True, result=make_response(2)),
+            ROIBatchItem(index=1, success=False, error="Invalid country code"),
+        ],
+        total=2, succeeded=1, failed=1
+    )
+    payload = json.loads(roi_batch_json_response(batch, "columns").body)
+
+    assert payload["results"][0]["result"]["monthly_projections"]["month"] == [1, 2]
+    assert payload["results"][1] == {"index": 1, "success": False, "result": None, "error": "Invalid country code"}
+
+
+def test_projection_format_selection():
+    """Test the query flag wins over the Accept header and bad values are rejected"""
+    assert select_projection_format(None, None) == "rows"
+    assert select_projection_format(None, f"{COLUMNAR_MEDIA_TYPE}, application/json") == "columns"
+    assert select_projection_format("rows", COLUMNAR_MEDIA_TYPE) == "rows"
+    with pytest.raises(ValueError):
+        select_projection_format("table")
+
+
+def test_standard_library_fallback(monkeypatch):
+    """Test encoding works without orjson installed"""
+    monkeypatch.setattr(response_encoding, "orjson", None)
+
+    assert json.loads(dumps({"at": datetime(2025, 1, 1)})) == {"at": "2025-01-01T00:00:00"}
+
+
+def test_stream_emits_summary_then_projection_chunks():
+    """Test the NDJSON stream carries the same months as the full response, in chunks"""
+    projections = project_batch(stack_inputs([INPUTS]), [30]).row(0)
+    expected = [month.model_dump() for month in ROICalculator()._build_monthly_projections(projections)]
+
+    lines = [json.loads(line) for line in roi_stream(make_response(0), projections, chunk_months=12)]
+
+    assert [line["type"] for line in lines] == ["summary", "projections", "projections", "projections", "end"]
+    assert lines[0]["data"]["total_months"] == 30 and "monthly_projections" not in lines[0]["data"]
+    assert [chunk["data"]["start_month"] for chunk in lines[1:4]] == [1, 13, 25]
+    streamed = [month for chunk in lines[1:4] for month in chunk["data"]["monthly_projections"]]
+    assert streamed == expected
+    assert lines[-1]["data"] == {"calculation_id": "calc-1"}
+
+
+def test_stream_sse_and_columnar_chunks():
+    """Test server-sent event framing and columnar projection chunks"""
+    projections = project_batch(stack_inputs([INPUTS]), [6]).row(0)
+    events = list(roi_stream(make_response(0), projections, "sse", "columns", chunk_months=6))
+
+    assert events[0].startswith(b"event: summary\ndata: {") and events[0].endswith(b"\n\n")
+    chunk = json.loads(events[1].split(b"data: ", 1)[1])
+    assert chunk["monthly_projections"]["month"] == [1, 2, 3, 4, 5, 6]
+    assert encode_event("end", {}, "ndjson") == b'{"type":"end","data":{}}\n'
@@ -0,0 +1,181 @@
+import asyncio
+import sys
+import types
+
+from models.roi_models import (
+    ROICalculationRequest, ROIMetrics, ROIResponse, TaxCalculation
+)
+from services.result_cache import (
+    LocalCacheBackend, RedisCacheBackend, ResultCache, canonical_request_key
+)
+
+
+def make_request(**overrides):
+    """Build a US micro SaaS calculation request"""
+    values = {
+        "country": "US", "business_type": "saas", "scenario": "micro_saas",
+        "monthly_revenue": 5000, "operating_expenses": 1000,
+    }
+    values.update(overrides)
+    return ROICalculationRequest(**values)
+
+
+def make_result(calculation_id="cached"):
+    """Build a minimal ROIResponse"""
+    return ROIResponse(
+        calculation_id=calculation_id,
+        input_summary={},
+        metrics=ROIMetrics(
+            roi_percentage=25, roi_ratio=0.25, net_profit=1000, gross_profit=1000,
+            total_revenue=5000, total_expenses=4000
+        ),
+        tax_calculation=TaxCalculation(
+            corporate_tax=0, vat_tax=0, payroll_tax=0, total_tax=0,
+            effective_tax_rate=0, after_tax_profit=1000
+        ),
+        revenue_breakdown=[],
+        expense_breakdown=[],
+        monthly_projections=[],
+        currency_code="USD"
+    )
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis client methods the backend uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode("utf-8")
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakePipeline:
+    """Buffers writes until execute(), like a non-transactional redis pipeline"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+
+    def execute(self):
+        for command in self.commands:
+            self.client.set(*command)
+
+
+def test_canonical_key_ignores_spelling_but_not_values():
+    """Test equivalent requests share a key while inputs and data version change it"""
+    key = canonical_request_key(make_request(), "v1")
+
+    assert canonical_request_key(make_request(monthly_revenue=5000.0, operating_expenses=1000), "v1") == key
+    assert canonical_request_key(make_request(monthly_revenue=5001), "v1") != key
+    assert canonical_request_key(make_request(), "v2") != key
+    assert canonical_request_key(make_request(), "v1", include_projections=False) != key
+
+
+def test_hit_mints_fresh_id_and_counts():
+    """Test cache hits reuse the result with a new id and update the counters"""
+    cache = ResultCache(LocalCacheBackend())
+    assert cache.get("key") is None
+
+    cache.set("key", make_result())
+    hit = cache.get("key")
+
+    assert hit.calculation_id != "cached"
+    assert hit.metrics == make_result().metrics
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_local_backend_evicts_lru_and_expires():
+    """Test the least recently used entry is evicted and entries expire after the TTL"""
+    now = [0.0]
+    backend = LocalCacheBackend(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    backend.set("a", make_result("a"))
+    backend.set("b", make_result("b"))
+    backend.get("a")
+    backend.set("c", make_result("c"))
+
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+    assert backend.evictions == 1
+
+    now[0] = 11.0
+    assert backend.get("a") is None
+    assert backend.expirations == 1
+
+
+def test_redis_backend_round_trip():
+    """Test the shared backend serializes results and clears its own keys"""
+    client = FakeRedis()
+    client.data["other"] = b"keep"
+    cache = ResultCache(RedisCacheBackend(client=client))
+
+    cache.set("key", make_result())
+    assert cache.get("key").metrics.roi_percentage == 25
+    assert cache.clear() == 1
+    assert "other" in client.data
+
+
+def test_backend_errors_are_misses():
+    """Test a failing backend never breaks the calculation path"""
+    class BrokenBackend(LocalCacheBackend):
+        def get(self, key):
+            raise ConnectionError("down")
+
+    cache = ResultCache(BrokenBackend())
+    assert cache.get("key") is None
+    assert cache.stats()["errors"] == 1
+
+
+def test_redis_backend_sets_socket_timeouts(monkeypatch):
+    """Test the client is created with connect and read timeouts"""
+    calls = []
+    fake_redis = types.SimpleNamespace(Redis=types.SimpleNamespace(
+        from_url=lambda url, **kwargs: calls.append((url, kwargs)) or FakeRedis()
+    ))
+    monkeypatch.setitem(sys.modules, "redis", fake_redis)
+
+    RedisCacheBackend("redis://cache:6379/0", timeout=0.1)
+
+    assert calls == [("redis://cache:6379/0", {"socket_connect_timeout": 0.1, "socket_timeout": 0.1})]
+
+
+def test_timeouts_are_misses_off_the_event_loop():
+    """Test a timed out batch lookup counts every key as a miss without raising"""
+    class SlowRedis(FakeRedis):
+        def mget(self, keys):
+            raise TimeoutError("Timeout reading from socket")
+
+    cache = ResultCache(RedisCacheBackend(client=SlowRedis()))
+
+    assert asyncio.run(cache.get_many_async(["a", "b"])) == [None, None]
+    stats = cache.stats()
+    assert (stats["misses"], stats["errors"]) == (2, 1)
+
+
+def test_many_round_trip():
+    """Test batch writes and reads through the async helpers"""
+    cache = ResultCache(RedisCacheBackend(client=FakeRedis()))
+
+    asyncio.run(cache.set_many_async([("a", make_result("a")), ("b", make_result("b"))]))
+    found = asyncio.run(cache.get_many_async(["a", "missing", "b"]))
+
+    assert [result is not None for result in found] == [True, False, True]
+    assert cache.stats()["hits"] == 2
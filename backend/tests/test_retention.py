@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from services.analytics_service import AnalyticsService
+from services.database import Database
+from services.retention import RetentionManager, policies_from_env
+from tests.conftest import insert_events
+
+POLICIES = {"analytics": 30, "email_submissions": None, "pdf_exports": None}
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Migrated temporary database with old and recent calculations"""
+    database = Database(str(tmp_path / "analytics.db"))
+    database.migrate()
+    insert_events(database, [
+        ("analytics", {"timestamp": f"2025-01-01 10:{index % 60:02d}:00", "country_code": "US",
+                       "session_id": f"s{index}"})
+        for index in range(25)
+    ] + [
+        ("analytics", {"timestamp": "2025-03-01 10:00:00", "country_code": "GB", "session_id": "new"}),
+        ("email_submissions", {"timestamp": "2025-01-01 12:00:00", "email": "x@y.z", "calculation_id": "c"}),
+        ("email_submissions", {"timestamp": "2025-01-02 12:00:00", "email": "x@y.z", "calculation_id": "d"}),
+        ("email_submissions", {"timestamp": "2025-01-02 12:00:00", "email": "a@b.c", "calculation_id": "e"}),
+    ])
+    yield database
+    database.close()
+
+
+def count(database, table):
+    return database.query_one(f"SELECT COUNT(*) FROM {table}")[0]
+
+
+@pytest.mark.asyncio
+async def test_enforce_policies_purges_in_batches(database):
+    """Test rows past their retention period are deleted in several small batches"""
+    manager = RetentionManager(database, POLICIES, batch_size=10, pause=0)
+
+    runs = await manager.enforce_policies(now=datetime(2025, 3, 15))
+
+    assert len(runs) == 1
+    assert runs[0].status == "completed" and runs[0].deleted == 25 and runs[0].batches == 3
+    assert count(database, "analytics") == 1
+    assert count(database, "email_submissions") == 3
+    # Rollups keep the history of purged events
+    assert AnalyticsService(database).get_analytics_summary().total_calculations == 26
+    assert manager.stats()["runs"][0]["deleted"] == 25
+
+
+@pytest.mark.asyncio
+async def test_purges_queue_behind_running_purge(database):
+    """Test a purge waiting for the purge lock is reported as queued until it starts"""
+    manager = RetentionManager(database, POLICIES, batch_size=10, pause=0)
+
+    async with manager._purge_lock:
+        waiting = asyncio.create_task(manager.purge("analytics", "country_code = ?", ("GB",), "test"))
+        await asyncio.sleep(0)
+        assert manager.stats()["runs"][0]["status"] == "queued"
+
+    run = await waiting
+    assert run.status == "completed" and run.deleted == 1
+
+
+@pytest.mark.asyncio
+async def test_clear_resets_rollups(database):
+    """Test clearing a data type deletes its rows and the rollups derived from them"""
+    manager = RetentionManager(database, POLICIES, batch_size=10, pause=0)
+
+    assert await manager.clear("analytics") == 26
+    summary = AnalyticsService(database).get_analytics_summary()
+    assert summary.total_calculations == 0 and summary.popular_countries == []
+    assert count(database, "email_submissions") == 3
+
+    with pytest.raises(ValueError):
+        await manager.clear("everything")
+
+
+@pytest.mark.asyncio
+async def test_forget_email(database):
+    """Test an erasure request deletes only that address's submissions"""
+    manager = RetentionManager(database, POLICIES, pause=0)
+    database.execute(
+        "INSERT INTO email_outbox (id, created_at, recipient, payload, status, next_attempt_at) "
+        "VALUES ('m', '2025-01-01 12:00:00', 'x@y.z', '{}', 'sent', '2025-01-01 12:00:00')"
+    )
+
+    assert await manager.forget_email("x@y.z") == 2
+    assert [row["email"] for row in database.query("SELECT email FROM email_submissions")] == ["a@b.c"]
+    assert count(database, "email_outbox") == 0
+
+
+@pytest.mark.asyncio
+async def test_incremental_vacuum_reclaims_pages(tmp_path):
+    """Test a purge returns freed pages on databases created with incremental auto-vacuum"""
+    database = Database(str(tmp_path / "analytics.db"))
+    database.migrate()
+    insert_events(database, [
+        ("analytics", {"timestamp": "2025-01-01 10:00:00", "calculation_data": "x" * 2000})
+        for _ in range(200)
+    ])
+    manager = RetentionManager(database, POLICIES, batch_size=50, pause=0)
+
+    run = await manager.clear("analytics")
+    assert run == 200
+    assert manager.runs[-1].reclaimed_pages > 0
+    database.close()
+
+
+def test_policies_from_env():
+    """Test purges only run for tables an operator opted in, and 0 or empty keeps rows forever"""
+    assert policies_from_env({}) == {"analytics": None, "email_submissions": None, "pdf_exports": None}
+    assert policies_from_env({"RETENTION_ANALYTICS_DAYS": "0", "RETENTION_SUBMISSIONS_DAYS": "30"}) == {
+        "analytics": None, "email_submissions": 30, "pdf_exports": None
+    }
+    assert policies_from_env({"RETENTION_ANALYTICS_DAYS": " 90 ", "RETENTION_EXPORTS_DAYS": ""}) == {
+        "analytics": 90, "email_submissions": None, "pdf_exports": None
+    }
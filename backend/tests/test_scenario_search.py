@@ -0,0 +1,50 @@
+import pytest
+from services.scenario_search import tokenize
+
+
+@pytest.fixture(scope="module")
+def index(snapshot):
+    """Search index over the bundled scenario catalog"""
+    return snapshot.search_index
+
+
+def test_tokenize_folds_case_accents_plurals_and_hyphens():
+    """Test terms are normalized the same way for documents and queries"""
+    assert tokenize("E-commerce Subscriptions") == ["e", "commerce", "ecommerce", "subscription"]
+    assert tokenize("Café companies") == ["cafe", "company"]
+
+
+def test_results_are_ranked_by_relevance(index):
+    """Test a name match outranks description-only matches and scores are relative"""
+    response = index.search("subscription box")
+
+    assert response.results[0].scenario.id == "subscription_box"
+    assert response.results[0].relevance_score == 1.0
+    scores = [result.relevance_score for result in response.results]
+    assert scores == sorted(scores, reverse=True)
+    assert response.total >= len(response.results)
+
+
+def test_prefix_matches_for_type_ahead(index):
+    """Test an unfinished last word matches by prefix, but not once it is complete"""
+    assert index.search("micro sa").results[0].scenario.id == "micro_saas"
+    assert index.search("dropship").results[0].scenario.id == "dropshipping_startup"
+    assert index.search("dropship ").total == 0
+
+
+def test_filters_and_limit(index):
+    """Test category and business type filters and the result limit"""
+    response = index.search("saas", category="industry", business_type="saas", limit=2)
+
+    assert len(response.results) == 2
+    assert all(result.business_type.id == "saas" for result in response.results)
+    assert response.filters_applied == {"category": "industry", "business_type": "saas"}
+    assert index.search("saas", business_type="ecommerce").total == 0
+    with pytest.raises(ValueError):
+        index.search("saas", limit=0)
+
+
+def test_no_match(index):
+    """Test unknown words and empty queries return nothing"""
+    assert index.search("zzzz").total == 0
+    assert index.search("   ").results == []
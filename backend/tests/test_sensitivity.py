@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from calculations.projection_engine import calculate_batch_metrics, project_batch, stack_inputs
+from calculations.roi_calculator import ROICalculator
+from calculations.sensitivity import SENSITIVITY_PARAMETERS, SensitivityAnalyzer
+from models.roi_models import ROICalculationRequest, SensitivityRequest
+
+
+def make_request(**overrides):
+    """Build a sensitivity request around a US micro SaaS calculation"""
+    base = ROICalculationRequest(
+        country="US", business_type="saas", scenario="micro_saas",
+        monthly_revenue=5000, operating_expenses=2000,
+        initial_investment=50000, timeframe_months=24
+    )
+    return SensitivityRequest(base_calculation=base, **overrides)
+
+
+def test_results_ranked_by_roi_swing(plan):
+    """Test every input is perturbed and results are sorted largest swing first"""
+    response = SensitivityAnalyzer(ROICalculator()).run(make_request(), plan)
+
+    assert {result.parameter for result in response.results} == set(SENSITIVITY_PARAMETERS)
+    swings = [result.roi_swing for result in response.results]
+    assert swings == sorted(swings, reverse=True)
+    assert response.currency_code == "USD"
+
+
+def test_perturbation_matches_single_projection(plan):
+    """Test a batched perturbation equals projecting the changed input on its own"""
+    calculator = ROICalculator()
+    request = make_request(variation_percent=20, parameters=["monthly_revenue"])
+    response = SensitivityAnalyzer(calculator).run(request, plan)
+    result = response.results[0]
+
+    assert result.high_value == pytest.approx(6000)
+    changed = request.base_calculation.model_copy(update={"monthly_revenue": 6000})
+    prepared = calculator._prepare_input_data(changed, plan.scenario)
+    projections = project_batch(stack_inputs([prepared]), [24])
+    metrics = calculate_batch_metrics(projections, np.array([50000.0]), calculator.DISCOUNT_RATE)
+
+    expected = metrics["roi_percentage"][0] - response.base_metrics["roi_percentage"]
+    assert result.high_deltas["roi_percentage"] == pytest.approx(expected)
+
+
+def test_bounded_inputs_are_clipped(plan):
+    """Test rates with a natural ceiling are not perturbed past it"""
+    request = make_request(variation_percent=90, parameters=["gross_margin"])
+    response = SensitivityAnalyzer(ROICalculator()).run(request, plan)
+
+    assert response.results[0].high_value == 1.0
+
+
+def test_unknown_parameter_rejected(plan):
+    """Test unsupported inputs raise a ValueError"""
+    with pytest.raises(ValueError):
+        SensitivityAnalyzer(ROICalculator()).run(make_request(parameters=["tax_rate"]), plan)
@@ -0,0 +1,80 @@
+import pytest
+from calculations.what_if import apply_variation, compare_results, summarize_variations
+from models.roi_models import (
+    ROICalculationRequest, ROIMetrics, ROIResponse, TaxCalculation, WhatIfResult, WhatIfVariation
+)
+
+
+def make_result(roi, net_profit, npv=None, payback=None):
+    """Build a minimal ROIResponse with the given headline metrics"""
+    return ROIResponse(
+        calculation_id="test",
+        input_summary={},
+        metrics=ROIMetrics(
+            roi_percentage=roi, roi_ratio=roi / 100, net_profit=net_profit, gross_profit=net_profit,
+            total_revenue=100000, total_expenses=100000 - net_profit,
+            payback_period_months=payback, npv=npv
+        ),
+        tax_calculation=TaxCalculation(
+            corporate_tax=0, vat_tax=0, payroll_tax=0, total_tax=0,
+            effective_tax_rate=0, after_tax_profit=net_profit
+        ),
+        revenue_breakdown=[],
+        expense_breakdown=[],
+        monthly_projections=[],
+        currency_code="USD"
+    )
+
+
+def test_apply_variation_overlays_changes():
+    """Test variation changes override base fields and are re-validated"""
+    base = ROICalculationRequest(
+        country="US", business_type="saas", scenario="micro_saas",
+        monthly_revenue=5000, operating_expenses=1000
+    )
+    variation = WhatIfVariation(name="Double revenue", changes={"monthly_revenue": 10000})
+
+    changed = apply_variation(base, variation)
+    assert changed.monthly_revenue == 10000
+    assert changed.operating_expenses == 1000
+
+    with pytest.raises(ValueError):
+        apply_variation(base, WhatIfVariation(name="Bad", changes={"monthly_revenue": -1}))
+
+
+def test_apply_variation_rejects_unknown_fields():
+    """Test a misspelled change is reported instead of silently ignored"""
+    base = ROICalculationRequest(
+        country="US", business_type="saas", scenario="micro_saas",
+        monthly_revenue=5000, operating_expenses=1000
+    )
+
+    with pytest.raises(ValueError, match="Unknown field: monthly_revenu$"):
+        apply_variation(base, WhatIfVariation(name="Typo", changes={"monthly_revenu": 10000}))
+
+
+def test_compare_results_deltas():
+    """Test deltas are reported only for metrics both results have"""
+    base = make_result(roi=20, net_profit=10000, npv=5000, payback=None)
+    better = make_result(roi=30, net_profit=15000, npv=7500, payback=8.0)
+
+    comparison = compare_results(base, better)
+    assert comparison["roi_percentage_change"] == pytest.approx(10)
+    assert comparison["roi_percentage_change_percent"] == pytest.approx(50)
+    assert comparison["npv_change"] == pytest.approx(2500)
+    assert comparison["after_tax_profit_change"] == pytest.approx(5000)
+    assert "payback_period_months_change" not in comparison
+
+
+def test_summarize_variations_ranks_by_roi():
+    """Test the summary names the best and worst variations"""
+    base = make_result(roi=20, net_profit=10000)
+    results = [
+        WhatIfResult(variation=WhatIfVariation(name=name, changes={}), result=make_result(roi, 0), comparison={})
+        for name, roi in (("cut costs", 35), ("raise prices", 25), ("slow growth", 5))
+    ]
+
+    summary = summarize_variations(base, results)
+    assert summary["best_variation"] == "cut costs"
+    assert summary["worst_variation"] == "slow growth"
+    assert summary["improving_variations"] == ["cut costs", "raise prices"]
@@ -0,0 +1,207 @@
+"""
+Currency formatting for ROI results and the currency endpoints.
+
+A ``CurrencyFormatterRegistry`` holds one ``CurrencyFormatter`` per
+(currency, locale). It is built from the currency data in ``countries.json``
+(symbol and decimal places) and, when Babel is installed, the locale's
+currency pattern and separators. Formatters are created on first use and
+cached. Each one precomputes its prefixes, suffixes and separators, so
+formatting an array of values is one rounding pass plus one string format
+per value.
+
+Without Babel every locale uses the en-US layout ("$1,234.50", "-$5.00").
+"""
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from babel import Locale, UnknownLocaleError
+    from babel.numbers import get_decimal_symbol, get_group_symbol
+except ImportError:  # Optional dependency; without it every locale uses the en-US layout
+    Locale = None
+
+DEFAULT_LOCALE = "en_US"
+MAX_BULK_AMOUNTS = 1000
+# Locale strings come from clients, so only this many formatters are kept
+MAX_CACHED_FORMATTERS = 1024
+
+# Currency sign placeholder in CLDR number patterns
+CURRENCY_SIGN = "\xa4"
+NO_BREAK_SPACE = "\xa0"
+
+_LOCALE_PATTERN = re.compile(r"^[A-Za-z]{2,3}(?:[_-][A-Za-z0-9]{2,8}){0,3}$")
+
+# en-US layout, used for every locale when Babel is not installed
+_DEFAULT_LAYOUT = {
+    "prefixes": (CURRENCY_SIGN, "-" + CURRENCY_SIGN),
+    "suffixes": ("", ""),
+    "group": ",",
+    "decimal": ".",
+    "grouping": (3, 3),
+}
+
+
+def _locale_layout(locale: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Canonical locale name and currency layout; raises ValueError for unknown locales
+    """
+    if not _LOCALE_PATTERN.match(locale):
+        raise ValueError(f"Invalid locale: {locale}")
+    if Locale is None:
+        return DEFAULT_LOCALE, _DEFAULT_LAYOUT
+
+    try:
+        parsed = Locale.parse(locale.replace("-", "_"))
+    except (UnknownLocaleError, ValueError):
+        raise ValueError(f"Unknown locale: {locale}")
+
+    pattern = parsed.currency_formats["standard"]
+    return str(parsed), {
+        "prefixes": tuple(pattern.prefix),
+        "suffixes": tuple(pattern.suffix),
+        "group": get_group_symbol(parsed),
+        "decimal": get_decimal_symbol(parsed),
+        "grouping": tuple(pattern.grouping),
+    }
+
+
+def _place_symbol(affix: str, symbol: str, before_number: bool) -> str:
+    """
+    Substitute the symbol into a pattern affix, spacing a letter symbol away from the digits
+    """
+    if CURRENCY_SIGN not in affix:
+        return affix
+    touches_number = affix.endswith(CURRENCY_SIGN) if before_number else affix.startswith(CURRENCY_SIGN)
+    edge = symbol[-1:] if before_number else symbol[:1]
+    if touches_number and edge.isalpha():
+        symbol = symbol + NO_BREAK_SPACE if before_number else NO_BREAK_SPACE + symbol
+    return affix.replace(CURRENCY_SIGN, symbol)
+
+
+class CurrencyFormatter:
+    """
+    Formats amounts in one currency for one locale
+    """
+
+    __slots__ = (
+        "currency_code", "locale", "decimal_places", "_prefixes", "_suffixes", "_spec", "_translation", "_grouping"
+    )
+
+    def __init__(
+        self,
+        currency_code: str,
+        symbol: str,
+        decimal_places: int = 2,
+        locale: str = DEFAULT_LOCALE,
+        layout: Optional[Mapping[str, Any]] = None
+    ):
+        layout = layout or _DEFAULT_LAYOUT
+        self.currency_code = currency_code
+        self.locale = locale
+        self.decimal_places = int(decimal_places)
+        # Index 0 for non-negative amounts, 1 for negative ones
+        self._prefixes = tuple(_place_symbol(affix, symbol, True) for affix in layout["prefixes"])
+        self._suffixes = tuple(_place_symbol(affix, symbol, False) for affix in layout["suffixes"])
+        separators = {",": layout["group"], ".": layout["decimal"]}
+        self._translation = str.maketrans(separators) if separators != {",": ",", ".": "."} else None
+        # CLDR marks patterns without digit grouping with an oversized group
+        primary, secondary = layout["grouping"]
+        grouped = primary < 100
+        self._spec = f"{',' if grouped else ''}.{self.decimal_places}f"
+        self._grouping = (primary, secondary) if grouped and (primary, secondary) != (3, 3) else None
+
+    @classmethod
+    def for_locale(cls, currency_code: str, symbol: str, decimal_places: int, locale: str) -> "CurrencyFormatter":
+        canonical, layout = _locale_layout(locale)
+        return cls(currency_code, symbol, decimal_places, canonical, layout)
+
+    def format(self, value: float) -> str:
+        return self.format_many([value])[0]
+
+    def format_many(self, values: Iterable[float]) -> List[str]:
+        """
+        Format an array of amounts; non-finite amounts raise ValueError
+        """
+        amounts = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=float).ravel()
+        if not np.isfinite(amounts).all():
+            raise ValueError("Amounts must be finite numbers")
+
+        rounded = np.round(amounts, self.decimal_places)
+        # Amounts that round to zero are shown unsigned
+        negative = (rounded < 0).tolist()
+        magnitudes = np.abs(rounded).tolist()
+
+        spec, prefixes, suffixes = self._spec, self._prefixes, self._suffixes
+        numbers = [format(value, spec) for value in magnitudes]
+        if self._grouping is not None:
+            numbers = [self._regroup(number) for number in numbers]
+        if self._translation is not None:
+            numbers = [number.translate(self._translation) for number in numbers]
+        return [prefixes[sign] + number + suffixes[sign] for number, sign in zip(numbers, negative)]
+
+    def _regroup(self, number: str) -> str:
+        """
+        Re-apply digit grouping for patterns whose groups are not all three digits (e.g. 12,34,567)
+        """
+        integer, dot, fraction = number.partition(".")
+        digits = integer.replace(",", "")
+        primary, secondary = self._grouping
+        if len(digits) <= primary:
+            return number
+        head, tail = digits[:-primary], digits[-primary:]
+        groups = []
+        while len(head) > secondary:
+            groups.insert(0, head[-secondary:])
+            head = head[:-secondary]
+        groups.insert(0, head)
+        return ",".join(groups + [tail]) + dot + fraction
+
+
+class CurrencyFormatterRegistry:
+    """
+    Formatters for the catalog's currencies, created per (currency, locale) on first use
+    """
+
+    def __init__(self, currencies: Mapping[str, Mapping[str, Any]], default_locale: str = DEFAULT_LOCALE):
+        self.currencies = dict(currencies)
+        self.default_locale = default_locale
+        self._formatters: Dict[Tuple[str, str], CurrencyFormatter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_countries(
+        cls,
+        countries: Sequence[Dict[str, Any]],
+        default_locale: str = DEFAULT_LOCALE
+    ) -> "CurrencyFormatterRegistry":
+        return cls({country["currency"]["code"]: country["currency"] for country in countries}, default_locale)
+
+    def get(self, currency_code: str, locale: Optional[str] = None) -> CurrencyFormatter:
+        """
+        The cached formatter for a currency and locale; raises ValueError if either is unknown
+        """
+        key = (currency_code.upper(), locale or self.default_locale)
+        formatter = self._formatters.get(key)
+        if formatter is not None:
+            return formatter
+
+        currency = self.currencies.get(key[0])
+        if currency is None:
+            raise ValueError(f"Unsupported currency: {currency_code}")
+
+        formatter = CurrencyFormatter.for_locale(
+            key[0], currency["symbol"], currency.get("decimal_places", 2), key[1]
+        )
+        with self._lock:
+            if len(self._formatters) >= MAX_CACHED_FORMATTERS:
+                return formatter
+            return self._formatters.setdefault(key, formatter)
+
+    def format_many(self, values: Iterable[float], currency_code: str, locale: Optional[str] = None) -> List[str]:
+        return self.get(currency_code, locale).format_many(values)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"currencies": len(self.currencies), "formatters": len(self._formatters), "babel": Locale is not None}
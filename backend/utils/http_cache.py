@@ -0,0 +1,57 @@
+"""
+Pre-serialized JSON payloads with strong ETags and conditional GET support.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi.responses import Response
+
+DEFAULT_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+
+
+class CachedPayload:
+    """
+    JSON body serialized once, together with its content-hash ETag
+    """
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, RFC 7232)
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
+
+
+def cached_json_response(
+    payload: CachedPayload,
+    if_none_match: Optional[str] = None,
+    cache_control: str = DEFAULT_CACHE_CONTROL
+) -> Response:
+    """
+    Serve a cached payload, answering 304 when the client already has it
+    """
+    headers = {"ETag": payload.etag, "Cache-Control": cache_control}
+
+    if etag_matches(if_none_match, payload.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=payload.body, media_type="application/json", headers=headers)
@@ -0,0 +1,150 @@
+"""
+Fast JSON encoding for ROI calculation responses.
+
+Endpoints return these as ready-made ``Response`` objects, so FastAPI skips
+its second validation pass against ``response_model`` (which stays on the
+route for the OpenAPI schema). Bodies are encoded with orjson when it is
+installed and the standard library otherwise.
+
+Monthly projections can be sent in a compact columnar form,
+``{"month": [...], "revenue": [...], ...}``, selected with
+``?projection_format=columns`` or ``Accept: application/vnd.amplifyroi.columnar+json``.
+
+Streaming responses are sequences of events, either NDJSON lines
+(``{"type": ..., "data": ...}``) or server-sent events, so clients can render
+the summary before the projections have been encoded.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi.responses import Response
+
+from models.roi_models import MonthlyProjection, ROIBatchResponse, ROIResponse
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; the standard library encoder is the fallback
+    orjson = None
+
+PROJECTION_FORMATS = ("rows", "columns")
+COLUMNAR_MEDIA_TYPE = "application/vnd.amplifyroi.columnar+json"
+PROJECTION_FIELDS = tuple(MonthlyProjection.model_fields)
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+DEFAULT_STREAM_CHUNK_MONTHS = 12
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode JSON-compatible content (datetimes allowed) to compact UTF-8 bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def select_projection_format(requested: Optional[str], accept: Optional[str] = None) -> str:
+    """
+    Resolve the projection layout from the query flag, then the Accept header
+    """
+    if requested:
+        if requested not in PROJECTION_FORMATS:
+            raise ValueError(f"projection_format must be one of {', '.join(PROJECTION_FORMATS)}")
+        return requested
+    if accept and COLUMNAR_MEDIA_TYPE in accept:
+        return "columns"
+    return "rows"
+
+
+def roi_response_payload(response: ROIResponse, projection_format: str = "rows") -> Dict[str, Any]:
+    """
+    Plain-data form of a response, with projections as rows or columns
+    """
+    if projection_format != "columns":
+        return response.model_dump()
+
+    payload = response.model_dump(exclude={"monthly_projections"})
+    projections = response.monthly_projections
+    payload["monthly_projections"] = {
+        field: [getattr(projection, field) for projection in projections]
+        for field in PROJECTION_FIELDS
+    }
+    return payload
+
+
+def roi_json_response(response: ROIResponse, projection_format: str = "rows") -> Response:
+    return _json_response(roi_response_payload(response, projection_format))
+
+
+def roi_batch_json_response(batch: ROIBatchResponse, projection_format: str = "rows") -> Response:
+    payload = {
+        "results": [
+            {
+                "index": item.index,
+                "success": item.success,
+                "result": roi_response_payload(item.result, projection_format) if item.result is not None else None,
+                "error": item.error,
+            }
+            for item in batch.results
+        ],
+        "total": batch.total,
+        "succeeded": batch.succeeded,
+        "failed": batch.failed,
+    }
+    return _json_response(payload)
+
+
+def _json_response(payload: Dict[str, Any]) -> Response:
+    # The layout may depend on Accept, so shared caches must key on it
+    return Response(content=dumps(payload), media_type="application/json", headers={"Vary": "Accept"})
+
+
+def encode_event(event: str, data: Dict[str, Any], stream_format: str = "ndjson") -> bytes:
+    """
+    One stream event as an NDJSON line or a server-sent event
+    """
+    if stream_format == "sse":
+        return b"event: " + event.encode("ascii") + b"\ndata: " + dumps(data) + b"\n\n"
+    return dumps({"type": event, "data": data}) + b"\n"
+
+
+def projection_chunk(projections: Any, start: int, end: int, projection_format: str = "rows") -> Dict[str, Any]:
+    """
+    Months ``start`` to ``end`` (exclusive) of a request's projection columns
+    """
+    columns = {field: getattr(projections, field)[start:end].tolist() for field in PROJECTION_FIELDS}
+    if projection_format == "columns":
+        monthly_projections: Any = columns
+    else:
+        monthly_projections = [dict(zip(PROJECTION_FIELDS, values)) for values in zip(*columns.values())]
+    return {"start_month": start + 1, "monthly_projections": monthly_projections}
+
+
+def roi_stream(
+    summary: ROIResponse,
+    projections: Any,
+    stream_format: str = "ndjson",
+    projection_format: str = "rows",
+    chunk_months: int = DEFAULT_STREAM_CHUNK_MONTHS
+) -> Iterator[bytes]:
+    """
+    Summary event, then projection chunks encoded as they are consumed, then an end event
+    """
+    total_months = len(projections.month)
+    payload = roi_response_payload(summary)
+    payload.pop("monthly_projections", None)
+    payload["total_months"] = total_months
+    yield encode_event("summary", payload, stream_format)
+
+    for start in range(0, total_months, chunk_months):
+        chunk = projection_chunk(projections, start, min(start + chunk_months, total_months), projection_format)
+        yield encode_event("projections", chunk, stream_format)
+
+    yield encode_event("end", {"calculation_id": summary.calculation_id}, stream_format)